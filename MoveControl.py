@@ -1,3 +1,6 @@
+from typing import Dict, Tuple, Sequence, Any, Optional
+
+
 class MoveControl:
     PELCOD_HEAD = 0xFF
     HEAD_GO_LEFT = 0x04
@@ -6,84 +9,244 @@ class MoveControl:
     HEAD_GO_DOWN = 0x08
     HEAD_STOP = 0x00
 
+    MAX_SPEED = 0x3F
+    TURBO_SPEED = 0xFF  # 水平加速档，垂直方向不支持
+
+    # 动作名 -> (水平方向, 垂直方向)：1 为向右/向上，-1 为向左/向下
+    MOTIONS = {
+        'up': (0, 1), 'down': (0, -1), 'left': (-1, 0), 'right': (1, 0),
+        'up_left': (-1, 1), 'up_right': (1, 1), 'down_left': (-1, -1), 'down_right': (1, -1),
+        'stop': (0, 0),
+    }
+    _MOTION_NAMES = {direction: name for name, direction in MOTIONS.items()}
+
     CMD_HORIZONTAL_ABS = 0x4B
     CMD_VERTICAL_ABS = 0x4D
 
+    FRAME_SIZE = 7
+
     def __init__(self, address: int = 0x01):
         if not 0x01 <= address <= 0xFF:
             raise ValueError(f"设备地址必须在0x01到0xFF之间")
 
         self.address = address
-        self._speed = 0x20
+        self.pan_speed = 0x20
+        self.tilt_speed = 0x20
+        self.horizontal_range = (0.0, 360.0)  # 线缆缠绕范围超过一圈的云台可扩展到 360° 以上
+        self.vertical_range = (-90.0, 90.0)  # 可越过天顶的云台可扩展到 90° 以上
+
+        # (水平速度, 垂直速度) -> {动作名: 帧}，每个实例各自缓存，地址改变时清空
+        self._motion_frame_cache: Dict[Tuple[int, int], Dict[str, bytes]] = {}
+        self._motion_frames = {}
+        self._rebuild_frames()
 
     def set_address(self, address: int) -> bool:
         if not 0x01 <= address <= 0xFF:
             return False
 
         self.address = address
+        self._rebuild_frames()
+        return True
+
+    def _rebuild_frames(self):
+        self._motion_frame_cache.clear()
+        self._motion_frames = self._frames_for(self.pan_speed, self.tilt_speed)
+
+    def _frames_for(self, pan_speed: int, tilt_speed: int) -> Dict[str, bytes]:
+        # 某一速度组合下的全部运动帧，首次用到时生成并缓存
+        key = (pan_speed, tilt_speed)
+        frames = self._motion_frame_cache.get(key)
+        if frames is None:
+            self._check_pan_speed(pan_speed)
+            self._check_tilt_speed(tilt_speed)
+            frames = {}
+            for name, (pan, tilt) in self.MOTIONS.items():
+                frames[name] = self._build_frame(0x00, self._motion_bits(pan, tilt),
+                                                 pan_speed if pan else 0x00,
+                                                 tilt_speed if tilt else 0x00)
+            self._motion_frame_cache[key] = frames
+        return frames
+
+    def _motion_bits(self, pan: int, tilt: int) -> int:
+        # 一帧同时决定两轴的运动状态，两轴方向位可同时置位（斜向转动）
+        cmd2 = self.HEAD_STOP
+        if pan > 0:
+            cmd2 |= self.HEAD_GO_RIGHT
+        elif pan < 0:
+            cmd2 |= self.HEAD_GO_LEFT
+        if tilt > 0:
+            cmd2 |= self.HEAD_GO_UP
+        elif tilt < 0:
+            cmd2 |= self.HEAD_GO_DOWN
+        return cmd2
+
+    def _check_pan_speed(self, speed: int):
+        if not (0x00 <= speed <= self.MAX_SPEED or speed == self.TURBO_SPEED):
+            raise ValueError(f"水平速度必须在0x00到0x{self.MAX_SPEED:02X}之间或为0xFF(加速)")
+
+    def _check_tilt_speed(self, speed: int):
+        if not 0x00 <= speed <= self.MAX_SPEED:
+            raise ValueError(f"垂直速度必须在0x00到0x{self.MAX_SPEED:02X}之间")
+
+    def set_pan_speed(self, speed: int) -> bool:
+        try:
+            self._check_pan_speed(speed)
+        except ValueError:
+            return False
+
+        self.pan_speed = speed
+        self._rebuild_frames()
+        return True
+
+    def set_tilt_speed(self, speed: int) -> bool:
+        try:
+            self._check_tilt_speed(speed)
+        except ValueError:
+            return False
+
+        self.tilt_speed = speed
+        self._rebuild_frames()
         return True
 
-    def _calculate_checksum(self, data_bytes: list) -> int:
-        return sum(data_bytes) & 0xFF
+    def _motion_frame(self, name: str, pan_speed: Optional[int], tilt_speed: Optional[int]) -> bytes:
+        # 未指定的速度使用 pan_speed/tilt_speed
+        if pan_speed is None and tilt_speed is None:
+            return self._motion_frames[name]
+
+        pan_speed = self.pan_speed if pan_speed is None else pan_speed
+        tilt_speed = self.tilt_speed if tilt_speed is None else tilt_speed
+        return self._frames_for(pan_speed, tilt_speed)[name]
+
+    def _build_frame(self, cmd1: int, cmd2: int, data1: int, data2: int) -> bytes:
+        buf = bytearray(self.FRAME_SIZE)
+        self._encode_frame_into(buf, 0, cmd1, cmd2, data1, data2)
+        return bytes(buf)
+
+    def _encode_frame_into(self, buf, offset: int, cmd1: int, cmd2: int,
+                           data1: int = 0, data2: int = 0):
+        buf[offset] = self.PELCOD_HEAD
+        buf[offset + 1] = self.address
+        buf[offset + 2] = cmd1
+        buf[offset + 3] = cmd2
+        buf[offset + 4] = data1
+        buf[offset + 5] = data2
+        buf[offset + 6] = (self.address + cmd1 + cmd2 + data1 + data2) & 0xFF
 
     def _create_command_frame(self, cmd1: int, cmd2: int, data1: int = 0, data2: int = 0) -> bytes:
-        frame = [
-            self.PELCOD_HEAD,
-            self.address,
-            cmd1,
-            cmd2,
-            data1,
-            data2
-        ]
+        # 直接由元组生成 bytes，只分配返回的帧本身，不经过共享缓冲区，多线程同时调用也安全
+        address = self.address
+        return bytes((self.PELCOD_HEAD, address, cmd1, cmd2, data1, data2,
+                      (address + cmd1 + cmd2 + data1 + data2) & 0xFF))
 
-        checksum = self._calculate_checksum(frame[1:])
-        frame.append(checksum)
 
-        return bytes(frame)
+    def move_up(self, speed: Optional[int] = None) -> bytes:
+        return self._motion_frame('up', None, speed)
 
+    def move_down(self, speed: Optional[int] = None) -> bytes:
+        return self._motion_frame('down', None, speed)
 
-    def move_up(self) -> bytes:
-        return self._create_command_frame(0x00, self.HEAD_GO_UP, 0x00, self._speed)
+    def move_left(self, speed: Optional[int] = None) -> bytes:
+        return self._motion_frame('left', speed, None)
 
-    def move_down(self) -> bytes:
-        return self._create_command_frame(0x00, self.HEAD_GO_DOWN, 0x00, self._speed)
+    def move_right(self, speed: Optional[int] = None) -> bytes:
+        return self._motion_frame('right', speed, None)
 
-    def move_left(self) -> bytes:
-        return self._create_command_frame(0x00, self.HEAD_GO_LEFT, self._speed, 0x00)
+    def move_up_left(self, pan_speed: Optional[int] = None, tilt_speed: Optional[int] = None) -> bytes:
+        return self._motion_frame('up_left', pan_speed, tilt_speed)
 
-    def move_right(self) -> bytes:
-        return self._create_command_frame(0x00, self.HEAD_GO_RIGHT, self._speed, 0x00)
+    def move_up_right(self, pan_speed: Optional[int] = None, tilt_speed: Optional[int] = None) -> bytes:
+        return self._motion_frame('up_right', pan_speed, tilt_speed)
+
+    def move_down_left(self, pan_speed: Optional[int] = None, tilt_speed: Optional[int] = None) -> bytes:
+        return self._motion_frame('down_left', pan_speed, tilt_speed)
+
+    def move_down_right(self, pan_speed: Optional[int] = None, tilt_speed: Optional[int] = None) -> bytes:
+        return self._motion_frame('down_right', pan_speed, tilt_speed)
 
     def stop(self) -> bytes:
-        return self._create_command_frame(0x00, self.HEAD_STOP, 0x00, 0x00)
+        return self._motion_frames['stop']
 
+    def move(self, pan_speed: int, tilt_speed: int) -> bytes:
+        # 两轴同时变速转动，一帧同时设置水平与垂直方向位：
+        # pan_speed 正值向右、负值向左，tilt_speed 正值向上、负值向下，0 为该轴停止
+        name = self._MOTION_NAMES[(pan_speed > 0) - (pan_speed < 0), (tilt_speed > 0) - (tilt_speed < 0)]
+        return self._frames_for(abs(pan_speed), abs(tilt_speed))[name]
 
-    def set_horizontal_angle(self, angle: float) -> bytes:
-        if angle < 0 or angle > 360:
-            raise ValueError(f"水平角度必须在0-360度之间")
 
-        encoded = int(angle * 100)
+    def set_horizontal_range(self, minimum: float, maximum: float) -> bool:
+        # 编码为16位、单位0.01°，最大655.35°
+        if not 0 <= minimum < maximum <= 655.35:
+            return False
 
-        data1 = (encoded >> 8) & 0xFF
-        data2 = encoded & 0xFF
+        self.horizontal_range = (float(minimum), float(maximum))
+        return True
 
-        return self._create_command_frame(0x00, self.CMD_HORIZONTAL_ABS, data1, data2)
+    def _encode_horizontal_angle(self, angle: float) -> int:
+        minimum, maximum = self.horizontal_range
+        if angle < minimum or angle > maximum:
+            raise ValueError(f"水平角度必须在{minimum:g}-{maximum:g}度之间")
 
-    def set_vertical_angle(self, angle: float) -> bytes:
-        if angle < -90 or angle > 90:
-            raise ValueError(f"垂直角度必须在-90到+90度之间")
+        return int(angle * 100)
+
+    def set_vertical_range(self, minimum: float, maximum: float) -> bool:
+        if not -180 <= minimum < maximum <= 180:
+            return False
+
+        self.vertical_range = (float(minimum), float(maximum))
+        return True
+
+    def _encode_vertical_angle(self, angle: float) -> int:
+        minimum, maximum = self.vertical_range
+        if angle < minimum or angle > maximum:
+            raise ValueError(f"垂直角度必须在{minimum:g}到{maximum:+g}度之间")
 
         if angle >= 0:
             encoded = int(angle * 100)
         else:
             encoded = 36000 - int(-angle * 100)
 
-        encoded = max(0, min(encoded, 36000))
+        return max(0, min(encoded, 36000))
 
-        data1 = (encoded >> 8) & 0xFF
-        data2 = encoded & 0xFF
+    def set_horizontal_angle(self, angle: float) -> bytes:
+        # 跟踪时每次都会调用，帧直接在这里生成，省去一次方法调用
+        encoded = self._encode_horizontal_angle(angle)
+        high = encoded >> 8
+        low = encoded & 0xFF
+        address = self.address
+        return bytes((self.PELCOD_HEAD, address, 0x00, self.CMD_HORIZONTAL_ABS, high, low,
+                      (address + self.CMD_HORIZONTAL_ABS + high + low) & 0xFF))
 
-        return self._create_command_frame(0x00, self.CMD_VERTICAL_ABS, data1, data2)
+    def set_vertical_angle(self, angle: float) -> bytes:
+        encoded = self._encode_vertical_angle(angle)
+        high = encoded >> 8
+        low = encoded & 0xFF
+        address = self.address
+        return bytes((self.PELCOD_HEAD, address, 0x00, self.CMD_VERTICAL_ABS, high, low,
+                      (address + self.CMD_VERTICAL_ABS + high + low) & 0xFF))
+
+    def build_batch(self, commands: Sequence[Tuple[Any, ...]]) -> bytes:
+        # commands 形如 [('stop',), ('horizontal', 123.4), ('vertical', 45.0)]
+        # 返回首尾相接的多帧数据，可一次 write 发出
+        buf = bytearray(self.FRAME_SIZE * len(commands))
+        offset = 0
+
+        for command in commands:
+            name = command[0]
+            if name == 'horizontal':
+                encoded = self._encode_horizontal_angle(command[1])
+                self._encode_frame_into(buf, offset, 0x00, self.CMD_HORIZONTAL_ABS,
+                                        (encoded >> 8) & 0xFF, encoded & 0xFF)
+            elif name == 'vertical':
+                encoded = self._encode_vertical_angle(command[1])
+                self._encode_frame_into(buf, offset, 0x00, self.CMD_VERTICAL_ABS,
+                                        (encoded >> 8) & 0xFF, encoded & 0xFF)
+            elif name in self._motion_frames:
+                buf[offset:offset + self.FRAME_SIZE] = self._motion_frames[name]
+            else:
+                raise ValueError(f"未知命令: {name}")
+            offset += self.FRAME_SIZE
+
+        return bytes(buf)
 
     def get_version(self) -> str:
-        return "PELCO-D MoveControl v1.2 (修正垂直角度方向)"
\ No newline at end of file
+        return "PELCO-D MoveControl v1.7 (可设置水平/垂直速度、斜向转动)"
\ No newline at end of file
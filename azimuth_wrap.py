@@ -0,0 +1,87 @@
+from typing import List, Optional, Tuple
+
+# 0x4B 绝对水平角为 16 位、单位 0.01°，可表示的最大角度
+MAX_ENCODED_AZIMUTH = 655.35
+
+
+def azimuth_difference(azimuth: float, reference: float) -> float:
+    # 方位差 azimuth - reference，归入 [-180, 180)
+    return (azimuth - reference + 180) % 360 - 180
+
+
+class AzimuthWrap:
+    # 记录云台水平角的累计位置（可超出 0~360），在线缆缠绕限位内为目标方位选择转动最少的合法角度
+
+    def __init__(self, limits: Tuple[float, float] = (0.0, 360.0), hold: float = 15.0):
+        self.limits = (0.0, 360.0)
+        self.set_limits(*limits)
+        self.hold = hold  # 目标越过限位不超过该角度时停在限位上，而不是反向绕一整圈(°)
+        self.position = None  # 最近一次发出的水平角
+        self.measured = None  # 最近一次反馈的水平角
+        self.total_rotation = 0.0  # 累计转动角度(°)
+        self.unwinds = 0  # 单次转动超过180°（被限位逼迫反向绕行）的次数
+
+    def set_limits(self, minimum: float, maximum: float) -> bool:
+        if not 0 <= minimum < maximum <= MAX_ENCODED_AZIMUTH:
+            return False
+
+        self.limits = (float(minimum), float(maximum))
+        return True
+
+    def reset(self):
+        self.position = None
+        self.measured = None
+        self.total_rotation = 0.0
+        self.unwinds = 0
+
+    def reference(self) -> Optional[float]:
+        # 云台当前所在的水平角：优先用已发出的命令，启动后尚未发命令时用反馈角度
+        return self.position if self.position is not None else self.measured
+
+    def contains(self, angle: float) -> bool:
+        return self.limits[0] <= angle <= self.limits[1]
+
+    def candidates(self, azimuth: float) -> List[float]:
+        # 限位内与 azimuth 同方向的所有水平角
+        low, high = self.limits
+        angle = low + (azimuth - low) % 360
+        result = []
+        while angle <= high:
+            result.append(angle)
+            angle += 360
+        return result
+
+    def resolve(self, azimuth: float) -> float:
+        candidates = self.candidates(azimuth)
+        reference = self.reference()
+
+        if not candidates:
+            # 方位落在限位之外的死区：停在较近的限位上
+            low, high = self.limits
+            return min((low, high), key=lambda limit: abs(azimuth_difference(azimuth, limit)))
+
+        if reference is None:
+            return candidates[0]
+
+        # 沿最短方向继续转动会越过限位时：越过得不多就停在限位上，否则反向回绕
+        low, high = self.limits
+        continued = reference + azimuth_difference(azimuth, reference)
+        if high < continued <= high + self.hold:
+            return high
+        if low - self.hold <= continued < low:
+            return low
+        return min(candidates, key=lambda angle: abs(angle - reference))
+
+    def commit(self, angle: float):
+        # 命令发出后调用，累计转动量
+        reference = self.reference()
+        if reference is not None:
+            step = abs(angle - reference)
+            self.total_rotation += step
+            if step > 180:
+                self.unwinds += 1
+        self.position = angle
+
+    def observe(self, angle: float):
+        # 云台水平角反馈
+        self.measured = angle
@@ -0,0 +1,1742 @@
+import re
+import sys
+import math
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+
+from MoveControl import MoveControl
+from get_angle import GetAngle, PelcoDFramer
+
+
+def _timeit(func, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number * 1e9  # ns/次
+
+
+def _print_row(name: str, before_ns: float, after_ns: float):
+    speedup = before_ns / after_ns if after_ns > 0 else float('inf')
+    print(f"{name:<24}{before_ns:>12.0f}{after_ns:>12.0f}{speedup:>10.1f}x")
+
+
+class _LegacyMoveControl:
+    # v1.2 的逐帧构建方式，仅用于对比
+    def __init__(self, address: int = 0x01):
+        self.address = address
+        self._speed = 0x20
+
+    def _create_command_frame(self, cmd1, cmd2, data1=0, data2=0) -> bytes:
+        frame = [0xFF, self.address, cmd1, cmd2, data1, data2]
+        checksum = sum(frame[1:]) & 0xFF
+        frame.append(checksum)
+        return bytes(frame)
+
+    def move_up(self) -> bytes:
+        return self._create_command_frame(0x00, 0x10, 0x00, self._speed)
+
+    def move_right(self) -> bytes:
+        return self._create_command_frame(0x00, 0x02, self._speed, 0x00)
+
+    def stop(self) -> bytes:
+        return self._create_command_frame(0x00, 0x00, 0x00, 0x00)
+
+    def set_horizontal_angle(self, angle: float) -> bytes:
+        if angle < 0 or angle > 360:
+            raise ValueError(f"水平角度必须在0-360度之间")
+        encoded = int(angle * 100)
+        return self._create_command_frame(0x00, 0x4B, (encoded >> 8) & 0xFF, encoded & 0xFF)
+
+
+def bench_frames(number: int):
+    legacy = _LegacyMoveControl(0x01)
+    current = MoveControl(0x01)
+
+    for angle in (0.0, 90.0, 180.0, 271.35, 360.0):
+        assert legacy.set_horizontal_angle(angle) == current.set_horizontal_angle(angle)
+    assert legacy.move_up() == current.move_up()
+    assert legacy.stop() == current.stop()
+
+    print(f"PELCO-D 帧生成 (每项 {number} 次, 单位 ns/帧)")
+    print(f"{'项目':<24}{'优化前':>12}{'优化后':>12}{'加速':>11}")
+    _print_row("stop()", _timeit(legacy.stop, number), _timeit(current.stop, number))
+    _print_row("move_up()", _timeit(legacy.move_up, number), _timeit(current.move_up, number))
+    _print_row("set_horizontal_angle()",
+               _timeit(lambda: legacy.set_horizontal_angle(123.45), number),
+               _timeit(lambda: current.set_horizontal_angle(123.45), number))
+    _print_row("move_up(0x10)",
+               _timeit(lambda: legacy._create_command_frame(0x00, 0x10, 0x00, 0x10), number),
+               _timeit(lambda: current.move_up(0x10), number))
+
+    # 两轴同时转动：原来只能分别发右、上两帧，现在一帧斜向命令
+    assert current.move_up_right() == b'\xff\x01\x00\x12\x20\x20\x53'
+    _print_row("右+上 -> move_up_right()",
+               _timeit(lambda: legacy.move_right() + legacy.move_up(), number),
+               _timeit(current.move_up_right, number))
+    for baudrate in (2400, 9600):
+        print(f"两轴速度更新在 {baudrate}bps 下的线上时间: "
+              f"{14 * 10 / baudrate * 1e3:.1f}ms -> {7 * 10 / baudrate * 1e3:.1f}ms")
+
+
+def bench_batch(number: int):
+    controller = MoveControl(0x01)
+    command_queue = queue.Queue()
+    writes = []
+
+    def separate():
+        command_queue.put((controller.stop(), ""))
+        command_queue.put((controller.set_horizontal_angle(123.45), ""))
+        command_queue.put((controller.set_vertical_angle(-30.5), ""))
+        while not command_queue.empty():
+            writes.append(command_queue.get_nowait()[0])
+
+    def batched():
+        command_queue.put((controller.build_batch([
+            ('stop',), ('horizontal', 123.45), ('vertical', -30.5)]), ""))
+        while not command_queue.empty():
+            writes.append(command_queue.get_nowait()[0])
+
+    number = max(1, number // 10)
+    print(f"跟踪周期命令入队+出队 (每项 {number} 次, 单位 ns/周期)")
+    print(f"{'项目':<24}{'3帧分发':>12}{'合并1帧':>12}{'加速':>11}")
+    _print_row("stop+水平+垂直", _timeit(separate, number), _timeit(batched, number))
+    print(f"每周期串口写入次数: 3 -> 1")
+
+
+class _LoopbackSerial:
+    # 记录每次写入时刻的假串口，不产生任何应答
+    def __init__(self):
+        self.write_times = []
+        self.in_waiting = 0
+
+    def write(self, data: bytes) -> int:
+        self.write_times.append(time.perf_counter())
+        return len(data)
+
+    def read(self, size: int = 1) -> bytes:
+        return b''
+
+    def reset_input_buffer(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _FakeRotator:
+    # 按波特率模拟应答到达时刻的假云台，应答 0x51/0x53 角度查询
+    def __init__(self, baudrate: int = 9600, turnaround: float = 0.005,
+                 horizontal_raw: int = 12345, vertical_raw: int = 33000):
+        self.byte_time = 10.0 / baudrate
+        self.turnaround = turnaround
+        self.raw = {0x51: horizontal_raw, 0x53: vertical_raw}
+        self._line_free = 0.0
+        self._pending = []
+        self._rx = bytearray()
+
+    def _reply(self, frame: bytes) -> bytes:
+        value = self.raw.get(frame[3])
+        if value is None:
+            return b''
+        body = [frame[1], 0x00, frame[3] + 0x08, (value >> 8) & 0xFF, value & 0xFF]
+        return bytes([0xFF] + body + [sum(body) & 0xFF])
+
+    def write(self, data: bytes) -> int:
+        now = time.perf_counter()
+        tx_done = now + len(data) * self.byte_time
+        for offset in range(0, len(data), 7):
+            reply = self._reply(data[offset:offset + 7])
+            if reply:
+                start = max(tx_done + self.turnaround, self._line_free)
+                self._line_free = start + len(reply) * self.byte_time
+                self._pending.append((self._line_free, reply))
+        return len(data)
+
+    def _collect(self):
+        now = time.perf_counter()
+        while self._pending and self._pending[0][0] <= now:
+            self._rx += self._pending.pop(0)[1]
+
+    @property
+    def in_waiting(self) -> int:
+        self._collect()
+        return len(self._rx)
+
+    def read(self, size: int = 1) -> bytes:
+        self._collect()
+        data = bytes(self._rx[:size])
+        del self._rx[:size]
+        return data
+
+    def reset_input_buffer(self):
+        self._collect()
+        self._rx.clear()
+
+    def close(self):
+        pass
+
+
+class _FakeBus(_FakeRotator):
+    # 一条 RS-485 总线上的多台假云台，按帧中的地址应答；主机发送与云台应答共用总线（半双工），
+    # 主机在应答传输期间写入时记为一次冲突
+    def __init__(self, baudrate: int = 9600, turnaround: float = 0.005):
+        super().__init__(baudrate, turnaround)
+        self.baudrate = baudrate
+        self.collisions = 0
+
+    def write(self, data: bytes) -> int:
+        now = time.perf_counter()
+        if any(arrival - len(reply) * self.byte_time < now < arrival for arrival, reply in self._pending):
+            self.collisions += 1
+        start = max(now, self._line_free)
+        self._line_free = start + len(data) * self.byte_time
+        for offset in range(0, len(data), 7):
+            reply = self._reply(data[offset:offset + 7])
+            if reply:
+                reply_start = self._line_free + self.turnaround
+                self._line_free = reply_start + len(reply) * self.byte_time
+                self._pending.append((self._line_free, reply))
+        return len(data)
+
+
+def bench_angle_query(number: int):
+    samples = max(10, min(number // 5000, 100))
+    timings = {}
+
+    for pipelined in (False, True):
+        querier = GetAngle()
+        querier.set_serial_port(_FakeRotator())
+        querier.set_pipelined(pipelined)
+
+        start = time.perf_counter()
+        for _ in range(samples):
+            result = querier.query_angles()
+            assert result['success']
+        timings[pipelined] = (time.perf_counter() - start) / samples * 1e6
+
+    print(f"一次水平+垂直位置采样耗时 (9600bps 模拟云台, {samples} 次, 单位 us)")
+    print(f"{'项目':<24}{'顺序查询':>12}{'流水线':>12}{'加速':>11}")
+    _print_row("query_angles()", timings[False], timings[True])
+
+
+def _run_bus(count: int, duration: float, target_rate: float = 5.0):
+    from bus_scheduler import BusScheduler
+
+    # 主云台按 target_rate 发跟踪命令（调度器的最高命令频率），同时分发给其余云台
+    bus = _FakeBus()
+    scheduler = BusScheduler(bus)
+    for index in range(count):
+        scheduler.add_device(0x01 + index, (0.5 * index, 0.0))
+    primary = scheduler.devices[0].move_controller
+
+    start = time.time()
+    next_target = start
+    now = start
+    while now - start < duration:
+        if now >= next_target:
+            horizontal = 100.0 + 2.0 * (now - start)
+            batch = primary.build_batch([('stop',), ('horizontal', horizontal), ('vertical', 45.0)])
+            scheduler.enqueue(batch, replace=True)
+            for command_bytes, description in scheduler.fan_out(horizontal, 45.0):
+                scheduler.enqueue(command_bytes, description, replace=True)
+            next_target += 1.0 / target_rate
+
+        scheduler.service(time.time())
+        now = time.time()
+        wait = scheduler.time_until_next_event(now)
+        wait = next_target - now if wait is None else min(wait, next_target - now)
+        if wait > 0:
+            time.sleep(wait)
+        now = time.time()
+
+    return scheduler, bus
+
+
+def bench_bus(number: int):
+    duration = 3.0
+    print(f"单总线多云台调度 (9600bps, 每台每{0.38 * 1000:.0f}ms查询一次, 主云台跟踪命令5Hz并分发, 各运行{duration:.0f}s)")
+    print(f"{'云台数':<8}{'命令/s(最低~最高)':>20}{'反馈/s(最低~最高)':>20}{'最长反馈间隔s':>16}"
+          f"{'替换':>6}{'总线占用':>10}{'冲突':>6}")
+    for count in (1, 2, 4, 6, 8):
+        scheduler, bus = _run_bus(count, duration)
+        stats = list(scheduler.snapshot().values())
+        commands = [item['command_rate'] for item in stats]
+        feedback = [item['feedback_rate'] for item in stats]
+        print(f"{count:<8}{min(commands):>12.2f} ~{max(commands):>5.2f}{min(feedback):>12.2f} ~{max(feedback):>5.2f}"
+              f"{max(item['max_gap'] for item in stats):>16.2f}{sum(item['replaced'] for item in stats):>6d}"
+              f"{scheduler.utilization():>10.0%}{bus.collisions:>6d}")
+    print()
+    print(scheduler.format_report())
+
+
+def _synthetic_capture(frame_count: int) -> bytes:
+    # 交替的水平/垂直应答，每隔若干帧插入噪声字节，以及一个校验有效的回显帧，
+    # 其中间的 0xFF 开头的 7 个字节恰好也是一帧有效的水平应答（分帧器不会把它当作帧）
+    rotator = _FakeRotator()
+    chunks = []
+    for i in range(frame_count):
+        rotator.raw[0x51] = (i * 37) % 36000
+        rotator.raw[0x53] = (i * 53) % 36000
+        chunks.append(rotator._reply(bytes([0xFF, 0x01, 0x00, 0x51 if i % 2 == 0 else 0x53, 0, 0, 0])))
+        if i % 50 == 0:
+            chunks.append(b'\x00\xFF\x13')
+        if i % 50 == 25:
+            chunks.append(bytes([0xFF, 0x01, 0x00, 0x4B, 0xFF, 0x01, 0x4C, 0x59, 0x00, 0x00, 0xA6]))
+    return b''.join(chunks)
+
+
+def bench_capture_decode(number: int):
+    from capture_decoder import decode_capture
+
+    frame_count = max(1000, number)
+    capture = _synthetic_capture(frame_count)
+    querier = GetAngle()
+
+    def per_frame():
+        framer = PelcoDFramer(0x01)
+        angles = []
+        for offset in range(0, len(capture), 4096):
+            for frame in framer.feed(capture[offset:offset + 4096]):
+                if frame[3] not in (0x59, 0x5B):
+                    continue
+                angles.append(querier._parse_response(frame, frame[3], frame[3] == 0x5B))
+        return angles
+
+    start = time.perf_counter()
+    expected = per_frame()
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = decode_capture(capture, address=0x01)
+    after = time.perf_counter() - start
+
+    assert len(expected) == len(decoded['angle'])
+    assert all(abs(a - b) < 1e-9 for a, b in zip(expected, decoded['angle'].tolist()))
+
+    print(f"录制数据批量解码 ({frame_count} 帧, {len(capture)} 字节, 单位 ms)")
+    print(f"{'项目':<24}{'逐帧解析':>12}{'NumPy':>12}{'加速':>11}")
+    _print_row("解码全部帧", before * 1e3, after * 1e3)
+
+
+# TrackingDataEx 样本：包含 Orbitron 文档示例与一次过境中的典型输出
+_ORBITRON_SAMPLES = [
+    'SN"ISS (ZARYA)" AZ234.4 EL-64.7 DN130168053 UP121749014 RA1350.2 RR-7.42 DMFM UMFM '
+    'LO-74.0059 LA40.7128 AL10.0 TU00:12:34 TL00:45:12 AOS12:34:56',
+    'SN"ISS" AZ234.4 EL-64.7 DN130168053 UP121749014 RA1350.2 RR-7.42',
+    'SN"NOAA 19" AZ12.9 EL3.1 DN137100000 UP0 DMFM UMFM',
+    'SN"SO-50" AZ187.3 EL41.8 DN436795000 UP145850000 DMFM UMFM',
+    'SN"AO-91" AZ301.0 EL-2.4 DN145960000 UP435250000 DMFM UMFM',
+]
+
+
+def _orbitron_corpus(size: int):
+    corpus = list(_ORBITRON_SAMPLES)
+    for i in range(size - len(corpus)):
+        az = (i * 0.37) % 360
+        el = 85.0 * ((i % 600) / 300.0 - 1.0)
+        rr = -7.0 + (i % 1400) / 100.0
+        corpus.append(f'SN"ISS (ZARYA)" AZ{az:.1f} EL{el:.1f} DN145800000 UP145990000 '
+                      f'RA{400 + i % 2000:.1f} RR{rr:.2f} DMFM UMFM')
+    return corpus
+
+
+def _legacy_parse_tracking_data_ex(raw_data: str):
+    # 优化前的 OrbitronParser.parse_tracking_data_ex，仅用于对比
+    if not raw_data or raw_data.strip() == "":
+        return {"status": "no_data", "raw": raw_data}
+    result = {"status": "tracking", "raw": raw_data, "errors": []}
+    pattern = r'(\w+)(?:"([^"]*)"|([^"\s]+))?'
+    for field, quoted_val, unquoted_val in re.findall(pattern, raw_data):
+        field = field.upper()
+        value = quoted_val if quoted_val else unquoted_val
+        if not value:
+            continue
+        if field in ["AZ", "EL", "RA", "RR", "LO", "LA", "AL"]:
+            try:
+                result[field.lower()] = float(value)
+            except ValueError:
+                result[field.lower()] = 0.0
+        elif field in ["DN", "UP"]:
+            try:
+                result[field.lower() + "_freq"] = int(float(value))
+            except ValueError:
+                result[field.lower() + "_freq"] = 0
+        elif field in ["SN", "UM", "DM", "AOS"]:
+            result[field.lower()] = value
+        elif field in ["TU", "TL"]:
+            result[field.lower() + "_time"] = value
+        else:
+            result[field.lower()] = value
+    if not result.get("sn") and "SN" in raw_data:
+        sn_match = re.search(r'SN"([^"]+)"', raw_data)
+        if sn_match:
+            result["sn"] = sn_match.group(1)
+    if "az" not in result:
+        az_match = re.search(r'AZ([-\d.]+)', raw_data)
+        if az_match:
+            result["az"] = float(az_match.group(1))
+    if "el" not in result:
+        el_match = re.search(r'EL([-\d.]+)', raw_data)
+        if el_match:
+            result["el"] = float(el_match.group(1))
+    return result
+
+
+def _legacy_parse_tracking_data(raw_data: str):
+    result = {"status": "tracking", "raw": raw_data}
+    for part in raw_data.split():
+        if part.startswith("SN"):
+            result["sn"] = part[2:]
+        elif part.startswith("AZ"):
+            result["az"] = float(part[2:])
+        elif part.startswith("EL"):
+            result["el"] = float(part[2:])
+    return result
+
+
+def bench_orbitron_parse(number: int):
+    from orbitron_module import OrbitronParser
+
+    corpus = _orbitron_corpus(max(100, number // 20))
+    parse = OrbitronParser.parse_tracking_data_ex
+
+    for raw in corpus:
+        legacy = _legacy_parse_tracking_data_ex(raw)
+        current = parse(raw)
+        assert (legacy["sn"], legacy["az"], legacy["el"]) == (current["sn"], current["az"], current["el"])
+
+    tracking_corpus = [raw.replace('"', '') for raw in corpus]
+
+    def legacy_ex():
+        for raw in corpus:
+            _legacy_parse_tracking_data_ex(raw)
+
+    def legacy_tick():
+        for raw, raw_td in zip(corpus, tracking_corpus):
+            _legacy_parse_tracking_data_ex(raw)
+            _legacy_parse_tracking_data(raw_td)
+
+    def current_ex():
+        for raw in corpus:
+            parse(raw)
+
+    # 三项交替测量，机器负载的波动对前后两种方式的影响相同
+    rounds = [[_timeit(func, 1) for func in (legacy_ex, legacy_tick, current_ex)] for _ in range(7)]
+    legacy_ex_ns, legacy_tick_ns, current_ns = (min(column) / len(corpus) for column in zip(*rounds))
+
+    print(f"Orbitron 数据解析 ({len(corpus)} 条样本, 单位 ns/条)")
+    print(f"{'项目':<24}{'优化前':>12}{'优化后':>12}{'加速':>11}")
+    _print_row("TrackingDataEx", legacy_ex_ns, current_ns)
+    _print_row("每次轮询(跳过TrackingData)", legacy_tick_ns, current_ns)
+
+
+class _RepeatingSource:
+    # 按顺序返回样本的数据源，每条样本重复 repeat 次（轮询快于 Orbitron 更新）
+    def __init__(self, corpus, repeat: int):
+        self.samples = [raw for raw in corpus for _ in range(repeat)]
+        self.index = 0
+
+    def connect(self):
+        self.index = 0
+
+    def disconnect(self):
+        pass
+
+    def request(self, item: str) -> str:
+        raw = self.samples[self.index % len(self.samples)]
+        if item == "TrackingDataEx":
+            self.index += 1
+            return raw
+        return raw.replace('"', '')
+
+
+def bench_orbitron_poll(number: int):
+    from orbitron_module import OrbitronDDE
+
+    corpus = _orbitron_corpus(max(100, number // 100))
+    repeat = 4
+    timings = {}
+    changed = 0
+
+    for cache_size in (0, 16):
+        orbitron = OrbitronDDE(skip_tracking_data=True, source=_RepeatingSource(corpus, repeat))
+        orbitron.parse_cache_size = cache_size
+        orbitron.connect()
+
+        polls = len(corpus) * repeat
+        start = time.perf_counter()
+        changed = 0
+        for _ in range(polls):
+            if orbitron.get_satellite_info()["changed"]:
+                changed += 1
+        timings[cache_size] = (time.perf_counter() - start) / polls * 1e9
+
+    print(f"Orbitron 轮询 (每条数据重复 {repeat} 次, {len(corpus) * repeat} 次轮询, 单位 ns/次)")
+    print(f"{'项目':<24}{'无缓存':>12}{'LRU缓存':>12}{'加速':>11}")
+    _print_row("get_satellite_info()", timings[0], timings[16])
+    print(f"changed=True 的样本: {changed}/{len(corpus) * repeat}")
+
+
+class _FakeDDEServer:
+    # 本地假 DDE 服务：服务线程按 update_period 更新 TrackingDataEx，
+    # 每次请求经队列往返服务线程，模拟 DDE 事务的一次跨进程往返
+    def __init__(self, update_period: float):
+        self.update_period = update_period
+        self.update_times = {}
+        self.request_count = 0
+        self._requests = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._current = ""
+        self._push_callback = None
+
+    def connect(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def disconnect(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    def request(self, item: str) -> str:
+        reply = queue.Queue(maxsize=1)
+        self._requests.put((item, reply))
+        return reply.get(timeout=1.0)
+
+    def _serve(self):
+        seq = 0
+        next_update = time.perf_counter()
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            if now >= next_update:
+                seq += 1
+                self._current = f'SN"BENCH-{seq}" AZ{seq * 0.5 % 360:.1f} EL{45 + seq % 40:.1f}'
+                self.update_times[seq] = now
+                next_update += self.update_period
+                callback = self._push_callback
+                if callback is not None:
+                    callback(self._current)
+            try:
+                item, reply = self._requests.get(timeout=max(0.0, next_update - time.perf_counter()))
+            except queue.Empty:
+                continue
+            self.request_count += 1
+            reply.put(self._current if item == "TrackingDataEx" else self._current.replace('"', ''))
+
+
+class _FakePushSource(_FakeDDEServer):
+    # 提供 subscribe() 的数据源（如 UDP/TCP 的 SocketSource），每条更新立即回调；
+    # pywin32 的 DDE 客户端不支持 advise，DDE 数据源没有这条路径
+    def subscribe(self, item: str, callback):
+        if item == "TrackingDataEx":
+            self._push_callback = callback
+
+
+def bench_orbitron_push(number: int):
+    from orbitron_module import OrbitronDDE
+
+    update_period = 0.1  # Orbitron 自身更新周期
+    poll_interval = 0.53  # OrbitronWorker 轮询周期（跟踪周期），与更新周期错开相位
+    duration = 3.0
+    rows = {}
+
+    def run(server, use_push):
+        orbitron = OrbitronDDE(skip_tracking_data=True, source=server)
+        orbitron.connect()
+        received = []
+        stop = threading.Event()
+
+        def on_data(info):
+            if info.get("status") == "tracking":
+                received.append((time.perf_counter(), int(info["satellite"].split("-")[1])))
+
+        cpu_start = time.process_time()
+        if use_push:
+            timer = threading.Timer(duration, stop.set)
+            timer.start()
+            orbitron.push_loop(on_data, stop)
+        else:
+            end = time.perf_counter() + duration
+            while time.perf_counter() < end:
+                info = orbitron.get_satellite_info()
+                if info.get("changed", True):
+                    on_data(info)
+                time.sleep(poll_interval)
+        cpu = (time.process_time() - cpu_start) / duration * 100
+        orbitron.disconnect()
+
+        # 每次更新到“使用方首次拿到该条或更新的数据”之间的时间
+        latencies = []
+        for seq, updated in server.update_times.items():
+            seen = next((t for t, s in received if s >= seq), None)
+            if seen is not None:
+                latencies.append((seen - updated) * 1e3)
+        latencies.sort()
+        median = latencies[len(latencies) // 2] if latencies else float('nan')
+        return median, len(received), server.request_count / duration, cpu
+
+    rows["DDE按跟踪周期轮询"] = run(_FakeDDEServer(update_period), False)
+    rows["DDE会话内轮询50ms"] = run(_FakeDDEServer(update_period), True)
+    rows["套接字数据源推送"] = run(_FakePushSource(update_period), True)
+
+    print(f"Orbitron 数据到达延迟 (假数据源更新周期 {update_period * 1e3:.0f}ms, "
+          f"轮询周期 {poll_interval * 1e3:.0f}ms, 各运行 {duration:.0f}s)")
+    print(f"{'模式':<22}{'延迟中位数ms':>14}{'收到样本':>10}{'请求/秒':>10}{'CPU%':>8}")
+    for name, (median, samples, rate, cpu) in rows.items():
+        print(f"{name:<22}{median:>14.1f}{samples:>10}{rate:>10.1f}{cpu:>8.2f}")
+
+
+def _flat_pass(cross_track_km: float, altitude_km: float = 500.0, speed_kms: float = 7.0,
+               heading: float = 20.0, with_range: bool = False):
+    # 平地近似的过境：卫星以恒定速度直线飞过，cross_track_km 为与测站的最近水平距离，
+    # 返回 t(秒, 0 为最近点) -> (方位, 仰角[, 斜距km])；cross_track_km=0 时正好经过天顶
+    h = math.radians(heading)
+
+    def position(t: float):
+        along = speed_kms * t
+        east = along * math.sin(h) + cross_track_km * math.cos(h)
+        north = along * math.cos(h) - cross_track_km * math.sin(h)
+        ground = math.hypot(east, north)
+        azimuth = math.degrees(math.atan2(east, north)) % 360
+        elevation = math.degrees(math.atan2(altitude_km, ground))
+        if with_range:
+            return azimuth, elevation, math.hypot(ground, altitude_km)
+        return azimuth, elevation
+
+    return position
+
+
+def _pass_duration(cross_track_km: float, min_elevation: float = 10.0,
+                   altitude_km: float = 500.0, speed_kms: float = 7.0) -> float:
+    ground = altitude_km / math.tan(math.radians(min_elevation))
+    if ground <= cross_track_km:
+        return 0.0
+    return math.sqrt(ground ** 2 - cross_track_km ** 2) / speed_kms
+
+
+def _angular_error(az1: float, el1: float, az2: float, el2: float) -> float:
+    a1, e1, a2, e2 = map(math.radians, (az1, el1, az2, el2))
+    cos_angle = (math.sin(e1) * math.sin(e2) +
+                 math.cos(e1) * math.cos(e2) * math.cos(a1 - a2))
+    return math.degrees(math.acos(max(-1.0, min(1.0, cos_angle))))
+
+
+# 过境库：与测站的最近水平距离(km)，0 为正过天顶
+_PASS_LIBRARY = (0.0, 20.0, 60.0, 150.0, 300.0, 600.0)
+
+
+def bench_predictor(number: int):
+    from track_predictor import TrackPredictor
+
+    sample_period = 1.0  # Orbitron 采样周期(task_cycle)
+    output_rate = 20.0  # 目标角度输出频率(Hz)
+
+    print(f"目标角度误差 (Orbitron 每 {sample_period:.0f}s 采样, {output_rate:.0f}Hz 输出, 单位 °)")
+    print(f"{'过境(最近距离km)':<18}{'保持RMS':>10}{'保持最大':>10}{'外推RMS':>10}{'外推最大':>10}")
+
+    for offset in _PASS_LIBRARY:
+        position = _flat_pass(offset)
+        half = _pass_duration(offset)
+        predictor = TrackPredictor()
+        held = None
+        errors_hold, errors_pred = [], []
+
+        t = -half
+        next_sample = t
+        while t <= half:
+            if t >= next_sample:
+                az, el = position(t)
+                az, el = round(az, 1), round(el, 1)  # Orbitron 输出一位小数
+                held = (az, el)
+                predictor.add_sample(az, el, t)
+                next_sample += sample_period
+
+            true_az, true_el = position(t)
+            errors_hold.append(_angular_error(true_az, true_el, *held))
+            errors_pred.append(_angular_error(true_az, true_el, *predictor.predict(t)))
+            t += 1.0 / output_rate
+
+        def rms(values):
+            return math.sqrt(sum(v * v for v in values) / len(values))
+
+        print(f"{offset:<18.0f}{rms(errors_hold):>10.3f}{max(errors_hold):>10.3f}"
+              f"{rms(errors_pred):>10.3f}{max(errors_pred):>10.3f}")
+
+
+class _SimRotator:
+    # 云台模型：命令经 dead_time 后生效，两轴以 max_rate(°/s) 匀速转向目标
+    def __init__(self, azimuth: float, elevation: float, dead_time: float = 0.15,
+                 max_rate: float = 30.0):
+        self.azimuth = azimuth
+        self.elevation = elevation
+        self.dead_time = dead_time
+        self.max_rate = max_rate
+        self._target = (azimuth, elevation)
+        self._scheduled = deque()
+
+    def command(self, now: float, azimuth: float, elevation: float):
+        self._scheduled.append((now + self.dead_time, azimuth, elevation))
+
+    def step(self, now: float, dt: float):
+        while self._scheduled and self._scheduled[0][0] <= now:
+            self._target = self._scheduled.popleft()[1:]
+        limit = self.max_rate * dt
+        self.azimuth += max(-limit, min(limit, self._target[0] - self.azimuth))
+        self.elevation += max(-limit, min(limit, self._target[1] - self.elevation))
+
+
+def _simulate_tracking(position, half: float, lead_compensation: bool, dead_time: float,
+                       serial_delay: float = 0.03, feedback_period: float = 0.38):
+    from latency_monitor import LatencyMonitor
+    from track_predictor import TrackPredictor
+
+    controller = MoveControl(0x01)
+    monitor = LatencyMonitor()
+    predictor = TrackPredictor()
+    rotator = _SimRotator(*position(-half), dead_time=dead_time)
+
+    dt = 0.01
+    next_sample = next_predict = next_feedback = -half
+    last_command = (None, None)
+    lock_until = -half
+    errors = []
+
+    t = -half
+    while t <= half:
+        if t >= next_sample:
+            az, el = position(t)
+            predictor.add_sample(round(az, 1), round(el, 1), t)
+            next_sample += 1.0
+
+        if t >= next_predict:
+            lead = monitor.lead_time() if lead_compensation else 0.0
+            az, el = predictor.predict(t + lead)
+            az, el = round(az, 2), round(max(el, 0.0), 2)
+            # 模拟原 send_tracking_commands 的行为（CommandDispatcher 之前）：分辨率阈值 + 200ms 命令锁，
+            # 命令锁已在主程序中移除，这里只作为超前补偿对比的固定发送规则
+            changed = (last_command[0] is None or abs(az - last_command[0]) > 0.1 or
+                       abs(el - last_command[1]) > 0.1)
+            if changed and t >= lock_until:
+                last_command = (az, el)
+                lock_until = t + 0.2
+                batch = controller.build_batch([('stop',), ('horizontal', az), ('vertical', el)])
+                monitor.expect_command(batch, az, el)
+                monitor.command_written(batch, t, t + serial_delay - 0.002, t + serial_delay)
+                rotator.command(t + serial_delay, az, el)
+            next_predict += 0.05
+
+        rotator.step(t, dt)
+
+        if t >= next_feedback:
+            monitor.feedback(round(rotator.azimuth, 2), round(rotator.elevation, 2), t)
+            next_feedback += feedback_period
+
+        errors.append(_angular_error(*position(t), rotator.azimuth, rotator.elevation))
+        t += dt
+
+    rms = math.sqrt(sum(e * e for e in errors) / len(errors))
+    return rms, max(errors), monitor
+
+
+def bench_lead_time(number: int):
+    for dead_time in (0.15, 0.5):
+        print(f"模拟跟踪指向误差 (串口30ms, 云台死区{dead_time * 1000:.0f}ms/30°/s, "
+              f"反馈周期380ms, 单位 °)")
+        print(f"{'过境(最近距离km)':<18}{'无补偿RMS':>10}{'无补偿最大':>10}"
+              f"{'补偿RMS':>10}{'补偿最大':>10}{'估计超前ms':>12}")
+
+        for offset in _PASS_LIBRARY[2:]:
+            position = _flat_pass(offset)
+            half = _pass_duration(offset)
+            plain_rms, plain_max, _ = _simulate_tracking(position, half, False, dead_time)
+            lead_rms, lead_max, monitor = _simulate_tracking(position, half, True, dead_time)
+            print(f"{offset:<18.0f}{plain_rms:>10.3f}{plain_max:>10.3f}"
+                  f"{lead_rms:>10.3f}{lead_max:>10.3f}{monitor.lead_time() * 1000:>12.0f}")
+
+        print()
+        print(monitor.format_report())
+        print()
+
+
+def _simulate_dispatch(position, half: float, dispatcher, predict_rate: float,
+                       dead_time: float = 0.15, feedback_period: float = 0.38):
+    from track_predictor import TrackPredictor
+
+    # dispatcher 为 None 时模拟原方式（命令锁已在主程序中移除，这里只用于对比）：
+    # 分辨率阈值 + 200ms 命令锁，锁定期间的目标被丢弃
+    predictor = TrackPredictor()
+    rotator = _SimRotator(*position(-half), dead_time=dead_time)
+
+    dt = 0.01
+    next_sample = next_target = next_feedback = -half
+    last_target = (None, None)
+    lock_until = -half
+    commands = low_commands = 0
+    errors = []
+
+    t = -half
+    while t <= half:
+        target = None
+        if t >= next_sample:
+            az, el = round(position(t)[0], 1), round(position(t)[1], 1)
+            predictor.add_sample(az, el, t)
+            if predict_rate <= 0:
+                target = (az, el)
+            next_sample += 1.0
+
+        if predict_rate > 0 and t >= next_target:
+            az, el = predictor.predict(t)
+            target = (round(az, 2), round(max(el, 0.0), 2))
+            next_target += 1.0 / predict_rate
+
+        send = None
+        if dispatcher is None:
+            if target is not None:
+                changed = (last_target[0] is None or abs(target[0] - last_target[0]) > 0.1 or
+                           abs(target[1] - last_target[1]) > 0.1)
+                if changed:
+                    last_target = target
+                    if t >= lock_until:
+                        lock_until = t + 0.2
+                        send = target
+        elif target is not None:
+            send = dispatcher.submit(t, *target)
+        else:
+            send = dispatcher.poll(t)
+
+        if send is not None:
+            commands += 1
+            if position(t)[1] < 20:
+                low_commands += 1
+            rotator.command(t, *send)
+
+        rotator.step(t, dt)
+
+        if dispatcher is not None and t >= next_feedback:
+            dispatcher.observe(t, round(rotator.azimuth, 2), round(rotator.elevation, 2))
+            next_feedback += feedback_period
+
+        errors.append(_angular_error(*position(t), rotator.azimuth, rotator.elevation))
+        t += dt
+
+    return commands, low_commands, math.sqrt(sum(e * e for e in errors) / len(errors)), max(errors)
+
+
+def bench_dispatch(number: int):
+    from command_dispatcher import CommandDispatcher
+
+    print("跟踪命令调度对比 (云台30°/s、死区时间150ms；命令数/其中仰角<20°/RMS误差°/最大误差°)")
+    for predict_rate, label in ((20.0, "外推20Hz"), (0.0, "Orbitron 1Hz直接发送")):
+        print(f"{label}:")
+        print(f"{'最近距离km':<12}{'原方式(阈值+200ms锁)':>30}{'自适应调度':>30}")
+        totals = [[0, 0], [0, 0]]
+        for offset in _PASS_LIBRARY:
+            position = _flat_pass(offset)
+            half = _pass_duration(offset)
+            row = f"{offset:<12.0f}"
+            for index, dispatcher in enumerate((None, CommandDispatcher())):
+                commands, low, rms, worst = _simulate_dispatch(position, half, dispatcher, predict_rate)
+                totals[index][0] += commands
+                totals[index][1] += low
+                row += f"{commands:>10d}/{low:>5d}/{rms:>6.3f}/{worst:>6.2f}"
+            print(row)
+        print(f"{'合计':<12}" + "".join(f"{total:>10d}/{low:>5d}{'':>14}" for total, low in totals))
+        print()
+
+
+class _PelcoRotator(_SimRotator):
+    # 在 _SimRotator 基础上支持变速转动命令：绝对角度命令到位时冲过 overshoot(°) 才停下，
+    # 速度命令的实际转速为标称值的 speed_scale 倍
+    def __init__(self, azimuth: float, elevation: float, dead_time: float = 0.15,
+                 max_rate: float = 30.0, overshoot: float = 0.0, speed_scale: float = 1.0):
+        super().__init__(azimuth, elevation, dead_time, max_rate)
+        self.overshoot = overshoot
+        self.speed_scale = speed_scale
+        self._rates = None
+
+    def command(self, now: float, azimuth: float, elevation: float):
+        self._scheduled.append((now + self.dead_time, 'absolute', azimuth, elevation))
+
+    def velocity(self, now: float, rate_h: float, rate_v: float):
+        self._scheduled.append((now + self.dead_time, 'velocity',
+                                rate_h * self.speed_scale, rate_v * self.speed_scale))
+
+    def step(self, now: float, dt: float):
+        while self._scheduled and self._scheduled[0][0] <= now:
+            _, kind, first, second = self._scheduled.popleft()
+            if kind == 'velocity':
+                self._rates = (first, second)
+                continue
+            self._rates = None
+            self._target = tuple(
+                goal + math.copysign(self.overshoot, goal - current) if abs(goal - current) > 0.01 else goal
+                for goal, current in ((first, self.azimuth), (second, self.elevation)))
+
+        limit = self.max_rate * dt
+        if self._rates is not None:
+            self.azimuth += max(-limit, min(limit, self._rates[0] * dt))
+            self.elevation += max(-limit, min(limit, self._rates[1] * dt))
+        else:
+            self.azimuth += max(-limit, min(limit, self._target[0] - self.azimuth))
+            self.elevation += max(-limit, min(limit, self._target[1] - self.elevation))
+
+
+def _simulate_closed_loop(position, half: float, closed_loop: bool, overshoot: float,
+                          speed_scale: float, feedback_period: float = 0.38):
+    from closed_loop import ClosedLoopController
+    from command_dispatcher import CommandDispatcher
+    from track_predictor import TrackPredictor
+
+    # 外推20Hz目标；开环为 CommandDispatcher 发绝对角度，闭环每50ms按反馈修正，没有反馈时同开环
+    predictor = TrackPredictor()
+    dispatcher = CommandDispatcher()
+    controller = ClosedLoopController()
+    rotator = _PelcoRotator(*position(-half), overshoot=overshoot, speed_scale=speed_scale)
+
+    dt = 0.01
+    next_sample = next_target = next_control = next_feedback = -half
+    frames = 0
+    errors = []
+
+    t = -half
+    while t <= half:
+        if t >= next_sample:
+            az, el = position(t)
+            predictor.add_sample(round(az, 1), round(el, 1), t)
+            next_sample += 1.0
+
+        target = None
+        if t >= next_target:
+            az, el = predictor.predict(t)
+            target = (round(az, 2), round(max(el, 0.0), 2))
+            controller.set_target(t, *target)
+            next_target += 0.05
+
+        if closed_loop and controller.has_feedback(t):
+            command = None
+            if t >= next_control:
+                command = controller.update(t)
+                next_control += 0.05
+            if command is not None and command[0] == 'velocity':
+                step = controller.rate_per_step()
+                rotator.velocity(t, command[1] * step, command[2] * step)
+                frames += 1
+            elif command is not None:
+                rotator.command(t, command[1], command[2])
+                frames += 3
+        else:
+            send = dispatcher.submit(t, *target) if target is not None else dispatcher.poll(t)
+            if send is not None:
+                rotator.command(t, *send)
+                frames += 3
+
+        rotator.step(t, dt)
+
+        if t >= next_feedback:
+            measured = (round(rotator.azimuth, 2), round(rotator.elevation, 2))
+            dispatcher.observe(t, *measured)
+            controller.observe(t, *measured)
+            next_feedback += feedback_period
+
+        errors.append(_angular_error(*position(t), rotator.azimuth, rotator.elevation))
+        t += dt
+
+    return frames, math.sqrt(sum(e * e for e in errors) / len(errors)), max(errors)
+
+
+def bench_closed_loop(number: int):
+    print("开环/闭环跟踪对比 (外推20Hz、云台30°/s、死区时间150ms、反馈周期380ms；帧数/RMS误差°/最大误差°)")
+    for overshoot, speed_scale in ((0.0, 1.0), (0.3, 1.0), (0.3, 0.85)):
+        print(f"绝对角度到位冲过{overshoot:.1f}°, 实际转速为标称{speed_scale:.0%}:")
+        print(f"{'最近距离km':<12}{'开环(绝对角度)':>24}{'闭环(速度修正)':>24}")
+        for offset in _PASS_LIBRARY:
+            position = _flat_pass(offset)
+            half = _pass_duration(offset)
+            row = f"{offset:<12.0f}"
+            for closed_loop in (False, True):
+                frames, rms, worst = _simulate_closed_loop(position, half, closed_loop,
+                                                           overshoot, speed_scale)
+                row += f"{frames:>10d}/{rms:>6.3f}/{worst:>6.2f}"
+            print(row)
+        print()
+
+
+# 规划用过境库：(最近距离km, 航向°)，含过天顶、近天顶、跨越正北的过境
+_PLANNING_PASSES = ((0.0, 20.0), (10.0, 200.0), (30.0, 300.0), (30.0, 100.0),
+                    (100.0, 200.0), (300.0, 20.0), (600.0, 300.0))
+
+
+def _run_planned_pass(position, ranged, half: float, planner, slew_rate: float = 30.0):
+    from pass_planner import sky_angles
+
+    # 入境（仰角10°）前30s起每秒采样，入境后每秒发出一次命令，云台按 slew_rate 转动
+    rotator = None
+    travel = 0.0
+    errors = []
+    dt = 0.1
+    t = -half - 30.0
+    next_sample = t
+    while t <= half:
+        if t >= next_sample:
+            az, el, distance = ranged(t)
+            az, el, distance = round(az, 1), round(el, 1), round(distance, 1)
+            if planner is not None:
+                planner.add_sample(az, el, t, 'SIM', distance)
+            if t >= -half:
+                if planner is not None:
+                    command = planner.command_angles(t, az, el)
+                else:
+                    command = (az % 360, el)
+                if rotator is None:
+                    rotator = _SimRotator(*command, dead_time=0.0, max_rate=slew_rate)
+                rotator.command(t, *command)
+            next_sample += 1.0
+
+        if rotator is not None:
+            before = (rotator.azimuth, rotator.elevation)
+            rotator.step(t, dt)
+            travel += max(abs(rotator.azimuth - before[0]), abs(rotator.elevation - before[1]))
+            errors.append(_angular_error(*position(t), *sky_angles(rotator.azimuth, rotator.elevation)))
+        t += dt
+
+    return travel / slew_rate, max(errors), sum(e > 1.0 for e in errors) * dt
+
+
+def bench_pass_plan(number: int):
+    from pass_planner import PassPlanner
+
+    configs = (
+        ('直接跟踪', None),
+        ('规划 -90~+90', lambda: PassPlanner(min_elevation=10.0)),
+        ('规划 0~180(可过顶)', lambda: PassPlanner(vertical_range=(0.0, 180.0), min_elevation=10.0)),
+    )
+
+    print("过境规划对比 (云台30°/s，每秒一次命令；转动s=总转动时间，误差>1°s=指向误差超过1°的累计时间)")
+    header = f"{'过境(km/航向)':<14}{'最高仰角':>8}"
+    for name, _ in configs:
+        header += f"  {name:>16}"
+    print(header)
+    print(f"{'':<22}" + "  转动s/最大误差°/>1°s" * len(configs))
+
+    for offset, heading in _PLANNING_PASSES:
+        position = _flat_pass(offset, heading=heading)
+        ranged = _flat_pass(offset, heading=heading, with_range=True)
+        half = _pass_duration(offset)
+        row = f"{offset:>5.0f}/{heading:<8.0f}{position(0)[1]:>8.1f}"
+        modes = []
+        for _, factory in configs:
+            planner = factory() if factory else None
+            slew, worst, bad = _run_planned_pass(position, ranged, half, planner)
+            row += f"  {slew:>5.1f}/{worst:>6.1f}/{bad:>4.1f}"
+            if planner is not None and planner.plan is not None:
+                modes.append(planner.plan.mode)
+        print(row + "   " + "/".join(modes))
+
+    # add_sample 在界面线程中调用：近天顶过境（30km），入境前30s起采样，0~180 可过顶
+    print()
+    print("PassPlanner.add_sample 耗时 (近天顶过境30km, 0~180, 单位 ms/次)")
+    print(f"{'采样频率':<12}{'重新规划间隔':>12}{'中位数':>10}{'最大':>10}{'规划次数':>10}")
+    ranged = _flat_pass(30.0, heading=300.0, with_range=True)
+    half = _pass_duration(30.0)
+    for rate in (1.0, 10.0):
+        for interval in (0.0, 1.0):
+            planner = PassPlanner(vertical_range=(0.0, 180.0), min_elevation=10.0, replan_interval=interval)
+            durations = []
+            replans = 0
+            t = -half - 30.0
+            while t <= half:
+                az, el, distance = (round(value, 1) for value in ranged(t))
+                before = planner._plan_time
+                start = time.perf_counter()
+                planner.add_sample(az, el, t, 'SIM', distance)
+                durations.append((time.perf_counter() - start) * 1e3)
+                replans += planner._plan_time != before
+                t += 1.0 / rate
+            durations.sort()
+            print(f"{rate:<12.0f}{interval:>12.1f}{durations[len(durations) // 2]:>10.2f}"
+                  f"{durations[-1]:>10.2f}{replans:>10d}")
+
+
+# 一天内连续的过境：(最近距离km, 航向°)，距离为负表示从测站另一侧经过（方位顺时针变化）；
+# 其中5次跨越正北，顺时针、逆时针都有
+_DAILY_PASSES = ((600.0, 120.0), (-150.0, 70.0), (300.0, 60.0), (-400.0, 100.0), (20.0, 60.0),
+                 (150.0, 250.0), (-200.0, 60.0), (500.0, 280.0), (-80.0, 260.0), (100.0, 0.0))
+
+
+def _run_wrapped_passes(wrap, planner=None, slew_rate: float = 30.0):
+    # 云台在各过境之间停在上一次出境的位置；入境（仰角10°）前30s起每秒发出一次命令，
+    # 误差和回绕次数只统计入境之后
+    rotator = None
+    travel = 0.0
+    unwinds = 0
+    errors = []
+    dt = 0.1
+
+    for index, (offset, heading) in enumerate(_DAILY_PASSES):
+        position = _flat_pass(offset, heading=heading)
+        ranged = _flat_pass(offset, heading=heading, with_range=True)
+        half = _pass_duration(offset)
+        t = -half - 30.0
+        next_sample = t
+        before_aos = None
+        while t <= half:
+            if t >= next_sample:
+                az, el, distance = (round(value, 1) for value in ranged(t))
+                if planner is not None:
+                    planner.azimuth_reference = wrap.reference()
+                    planner.add_sample(az, el, t, f'SIM{index}', distance)
+                    horizontal, vertical = planner.command_angles(t, az, el)
+                    if not wrap.contains(horizontal):
+                        horizontal = wrap.resolve(horizontal)
+                else:
+                    horizontal, vertical = wrap.resolve(az), el
+                if t >= -half and before_aos is None:
+                    before_aos = wrap.unwinds
+                wrap.commit(horizontal)
+                if rotator is None:
+                    rotator = _SimRotator(horizontal, vertical, dead_time=0.0, max_rate=slew_rate)
+                rotator.command(t, horizontal, vertical)
+                next_sample += 1.0
+
+            if rotator is not None:
+                before = rotator.azimuth
+                rotator.step(t, dt)
+                travel += abs(rotator.azimuth - before)
+                if t >= -half:
+                    errors.append(_angular_error(*position(t), rotator.azimuth % 360, rotator.elevation))
+            t += dt
+        unwinds += wrap.unwinds - before_aos
+
+    return travel, unwinds, max(errors), sum(e > 1.0 for e in errors) * dt
+
+
+def bench_cable_wrap(number: int):
+    from azimuth_wrap import AzimuthWrap
+    from pass_planner import PassPlanner
+
+    # 原方式：方位取模后直接发送，越过限位即整圈回绕
+    configs = (
+        ('0~360 (原方式)', (0.0, 360.0), 0.0, False),
+        ('0~450 最短路径', (0.0, 450.0), 15.0, False),
+        ('0~540 最短路径', (0.0, 540.0), 15.0, False),
+        ('0~450 最短路径+过境规划', (0.0, 450.0), 15.0, True),
+        ('0~540 最短路径+过境规划', (0.0, 540.0), 15.0, True),
+    )
+
+    print(f"线缆缠绕对比 ({len(_DAILY_PASSES)}次连续过境，云台30°/s，每秒一次命令)")
+    print(f"{'水平角范围':<24}{'水平转动°':>10}{'过境中回绕':>10}{'最大误差°':>10}{'误差>1° s':>10}")
+    for name, limits, hold, planned in configs:
+        wrap = AzimuthWrap(limits, hold)
+        planner = PassPlanner(azimuth_range=limits, min_elevation=10.0,
+                              limit_hold=hold) if planned else None
+        travel, unwinds, worst, bad = _run_wrapped_passes(wrap, planner)
+        print(f"{name:<24}{travel:>10.0f}{unwinds:>10d}{worst:>10.1f}{bad:>10.1f}")
+
+
+def _legacy_serial_loop(worker):
+    # 原 SerialWorker.run 的 10ms 轮询方式
+    while worker.running:
+        if not worker.command_queue.empty():
+            command_bytes = worker.command_queue.get_nowait()[0]
+            if command_bytes is not None:
+                worker.serial_port.write(command_bytes)
+        time.sleep(0.01)
+
+
+def _measure_serial_worker(worker, loop, samples: int):
+    port = _LoopbackSerial()
+    worker.serial_port = port
+    worker.is_connected = True
+    worker.running = True
+
+    thread = threading.Thread(target=loop, args=(worker,), daemon=True)
+    thread.start()
+
+    frame = MoveControl(0x01).stop()
+    latencies = []
+    for i in range(samples):
+        # 随机相位入队，避免与轮询周期对齐
+        time.sleep(0.003 + (i % 7) * 0.001)
+        sent = time.perf_counter()
+        worker.send_command(frame)
+        while len(port.write_times) <= i:
+            time.sleep(0.0002)
+        latencies.append((port.write_times[i] - sent) * 1e6)
+
+    cpu_start = time.process_time()
+    time.sleep(1.0)
+    idle_cpu = (time.process_time() - cpu_start) * 100
+
+    worker.running = False
+    worker._wake()
+    thread.join(timeout=1.0)
+
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1], idle_cpu
+
+
+def bench_serial_latency(number: int):
+    from main import SerialWorker
+
+    samples = max(20, min(number // 1000, 500))
+
+    legacy = SerialWorker()
+    legacy_median, legacy_p99, legacy_cpu = _measure_serial_worker(
+        legacy, _legacy_serial_loop, samples)
+
+    current = SerialWorker()
+    current_median, current_p99, current_cpu = _measure_serial_worker(
+        current, SerialWorker.run, samples)
+
+    print(f"SerialWorker 入队到写入延迟 (回环假串口, {samples} 次, 单位 us)")
+    print(f"{'项目':<24}{'10ms轮询':>12}{'阻塞队列':>12}{'加速':>11}")
+    _print_row("中位数", legacy_median, current_median)
+    _print_row("P99", legacy_p99, current_p99)
+    print(f"空闲CPU占用: {legacy_cpu:.2f}% -> {current_cpu:.2f}%")
+    print()
+
+    duration = 3.0
+    legacy_polls, legacy_query, legacy_query_cpu = _measure_query_polling(True, duration)
+    current_polls, current_query, current_query_cpu = _measure_query_polling(False, duration)
+    print(f"角度查询期间的串口轮询 (9600bps 假云台, 每{0.38 * 1000:.0f}ms查询一次, 运行{duration:.0f}s)")
+    print(f"{'项目':<24}{'2ms轮询':>12}{'按应答时刻':>12}{'减少':>11}")
+    _print_row("每次查询读串口次数", legacy_polls, current_polls)
+    print(f"查询往返: {legacy_query:.1f}ms -> {current_query:.1f}ms")
+    print(f"CPU占用: {legacy_query_cpu:.2f}% -> {current_query_cpu:.2f}%")
+
+
+def _measure_query_polling(legacy: bool, duration: float):
+    from main import SerialWorker
+
+    worker = SerialWorker()
+    worker.serial_port = _BlockingRotator()
+    worker.angle_querier = GetAngle()
+    worker.angle_querier.set_serial_port(worker.serial_port)
+    worker.angle_querier.set_vertical_angle_mode('auto')
+    worker.is_connected = True
+    querier = worker.angle_querier
+
+    if legacy:
+        # 原方式：查询进行中时每 rx_poll_interval (2ms) 读一次串口
+        def legacy_timeout():
+            if querier.is_query_active():
+                return worker.rx_poll_interval
+            return max(0.0, worker.last_query_time + worker.query_interval - time.time())
+        worker._query_timeout = legacy_timeout
+
+    polls, round_trips = [0], []
+    begin_query, poll = querier.begin_query, querier.poll
+
+    def counted_begin():
+        round_trips.append(time.perf_counter())
+        return begin_query()
+
+    def counted_poll():
+        polls[0] += 1
+        result = poll()
+        if result:
+            round_trips[-1] = time.perf_counter() - round_trips[-1]
+        return result
+
+    querier.begin_query, querier.poll = counted_begin, counted_poll
+
+    thread = threading.Thread(target=worker.run, daemon=True)
+    cpu_start = time.process_time()
+    thread.start()
+    time.sleep(duration)
+    cpu = (time.process_time() - cpu_start) / duration * 100
+
+    worker.running = False
+    worker._wake()
+    thread.join(timeout=1.0)
+
+    # 最后一次查询可能未完成，只统计已完成的往返
+    finished = [value for value in round_trips if value < 1.0]
+    queries = max(1, len(finished))
+    return polls[0] / queries, sum(finished) / queries * 1000, cpu
+
+
+
+class _BlockingRotator(_FakeRotator):
+    # 单独串口上的假云台：写入按波特率阻塞到发送完毕，与真实串口的 write() 一样占用调用线程
+    def __init__(self, baudrate: int = 9600, turnaround: float = 0.005):
+        super().__init__(baudrate, turnaround)
+        self.baudrate = baudrate
+
+    def write(self, data: bytes) -> int:
+        written = super().write(data)
+        time.sleep(len(data) * self.byte_time)
+        return written
+
+
+def _run_ports(count: int, duration: float, target_rate: float = 5.0):
+    from main import SerialWorker
+    from port_health import PortHealth
+
+    # 每个串口一个 SerialWorker 线程，同一目标流按 target_rate 分发给所有串口
+    health = PortHealth()
+    workers, threads = [], []
+    for index in range(count):
+        worker = SerialWorker()
+        worker.serial_port = _BlockingRotator()
+        worker.move_controller = MoveControl(address=0x01)
+        worker.angle_querier = GetAngle()
+        worker.angle_querier.set_serial_port(worker.serial_port)
+        worker.angle_querier.set_vertical_angle_mode('auto')
+        worker.port_name = f"COM{index + 3}"
+        worker.health = health
+        health.register(worker.port_name)
+        worker.is_connected = True
+        thread = threading.Thread(target=worker.run, daemon=True)
+        thread.start()
+        workers.append(worker)
+        threads.append(thread)
+
+    health.reset()
+    start = time.time()
+    next_target = start
+    while next_target - start < duration:
+        time.sleep(max(0.0, next_target - time.time()))
+        horizontal = 100.0 + 2.0 * (next_target - start)
+        for worker in workers:
+            batch = worker.move_controller.build_batch([('stop',), ('horizontal', horizontal),
+                                                        ('vertical', 45.0)])
+            worker.send_command(batch, replace=True)
+        next_target += 1.0 / target_rate
+    stamp = time.time()
+
+    for worker, thread in zip(workers, threads):
+        worker.running = False
+        worker._wake()
+        thread.join(timeout=1.0)
+    return health, stamp
+
+
+def bench_ports(number: int):
+    duration = 3.0
+    print(f"多串口并行工作线程 (每个串口 9600bps, 每{0.38 * 1000:.0f}ms查询一次, 跟踪命令5Hz分发到所有串口, "
+          f"各运行{duration:.0f}s)")
+    print(f"{'串口数':<8}{'命令/s(最低~最高)':>20}{'排队ms(平均最高)':>18}{'最长排队ms':>12}"
+          f"{'反馈/s(最低~最高)':>20}{'失败':>6}")
+    for count in (1, 2, 4, 8):
+        health, stamp = _run_ports(count, duration)
+        stats = list(health.snapshot(stamp).values())
+        commands = [item['command_rate'] for item in stats]
+        feedback = [item['feedback_rate'] for item in stats]
+        print(f"{count:<8}{min(commands):>12.2f} ~{max(commands):>5.2f}"
+              f"{max(item['queue_average'] or 0.0 for item in stats) * 1000:>18.1f}"
+              f"{max(item['queue_max'] for item in stats) * 1000:>12.1f}"
+              f"{min(feedback):>12.2f} ~{max(feedback):>5.2f}{sum(item['failures'] for item in stats):>6d}")
+    print()
+    print(health.format_report(stamp))
+
+
+def _legacy_update_plot(tracker):
+    # 原 ZenithTracker.update_plot：每次清空坐标轴并重建全部内容后完整重绘
+    import numpy as np
+
+    ax = tracker.ax
+    ax.clear()
+    ax.patch.set_alpha(0.2)
+    ax.patch.set_facecolor('white')
+    ax.set_theta_zero_location('N')
+    ax.set_theta_direction(-1)
+    ax.set_xticks(np.radians([0, 45, 90, 135, 180, 225, 270, 315]))
+    ax.set_xticklabels(['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW'])
+    ax.set_yticks([0.25, 0.5, 0.75])
+    ax.set_yticklabels(['', '', ''])
+    ax.set_ylim(0, 1)
+
+    theta = np.linspace(0, 2 * np.pi, 100)
+    ax.plot(theta, np.ones(100), 'gray', alpha=0.5, linewidth=1)
+    for elev in [30, 60]:
+        ax.plot(theta, np.full_like(theta, 1 - elev / 90.0), 'lightgray',
+                alpha=0.4, linewidth=0.8, linestyle='--')
+
+    ax.scatter(np.radians(tracker.satellite_pos[0]), 1 - tracker.satellite_pos[1] / 90.0,
+               s=120, c='blue', alpha=0.9, edgecolors='darkblue', linewidth=1.5, zorder=10)
+    ax.scatter(np.radians(tracker.tracker_angle[0]), 1 - tracker.tracker_angle[1] / 90.0,
+               s=80, c='red', alpha=0.9, edgecolors='darkred', linewidth=1.0, zorder=11)
+    for az in [tracker.satellite_pos[0], tracker.tracker_angle[0]]:
+        ax.plot([np.radians(az)] * 2, [0, 0.97], 'gray', alpha=0.4, linewidth=0.8, linestyle=':')
+    ax.grid(True, alpha=0.4)
+    tracker.canvas.draw()
+
+
+def bench_zenith(number: int):
+    import os
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtWidgets
+    from zenith_tracker import ZenithTracker
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    samples = max(20, min(number // 2000, 200))
+    timings = {}
+    for name in ('legacy', 'blit'):
+        widget = QtWidgets.QWidget()
+        widget.resize(421, 421)
+        tracker = ZenithTracker(widget)
+        if name == 'legacy':
+            # 清空坐标轴后缓存的标记已不存在，draw_event 中不再叠加
+            tracker.markers = []
+
+        # 每个跟踪周期更新一次卫星位置和一次云台指向
+        def tick(index):
+            tracker.satellite_pos = (index * 0.7 % 360, 30 + index % 40)
+            if name == 'legacy':
+                _legacy_update_plot(tracker)
+            else:
+                tracker.update_plot()
+
+        tick(0)
+        start = time.perf_counter()
+        for index in range(samples):
+            tick(index)
+        timings[name] = (time.perf_counter() - start) / samples * 1e6
+
+    print(f"天顶图一次更新耗时 (421x421 像素, {samples} 次, 单位 us)")
+    print(f"{'项目':<24}{'清空重建':>12}{'缓存背景':>12}{'加速':>11}")
+    _print_row("update_plot()", timings['legacy'], timings['blit'])
+
+
+def _legacy_show_angle(window, result):
+    # 原 handle_angle_data：每个角度信号立即更新标签、格式化收发帧并重绘天顶图
+    from track_predictor import sky_angles
+
+    h_angle = result['horizontal_angle']
+    d_angle = result['vertical_angle']
+    window.H.setText(f"{h_angle:.1f}")
+    window.D.setText(f"{d_angle:.1f}")
+    window.TX.setText(' '.join([f'{b:02X}' for b in result['tx_horizontal']]))
+    window.RX.setText(' '.join([f'{b:02X}' for b in result['rx_horizontal']]))
+    window.tracker.set_tracker_angle(*sky_angles(h_angle, d_angle))
+
+
+def bench_ui_refresh(number: int):
+    import os
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtWidgets
+    from main import MainApp
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    window = MainApp(predict_rate=0)
+    window.ui_update_timer.stop()
+    window.show()
+    while window.tracker is None:  # 天顶图在首次绘制后于后台加载
+        app.processEvents()
+    app.processEvents()
+    tx = bytes([0xFF, 0x01, 0x00, 0x51, 0x00, 0x00, 0x52])
+
+    # 按模拟时间喂入角度反馈（每秒一次 Orbitron 数据），每个信号后处理一次界面事件（重绘），
+    # 统计每模拟1秒界面线程的耗时：原方式每个信号立即更新，现方式每100ms刷新一帧
+    def run(query_rate, coalesced):
+        seconds = 2
+        frame_time = 0.1
+        next_frame = 0.0
+        start = time.perf_counter()
+        for index in range(int(query_rate * seconds)):
+            t = index / query_rate
+            if index % max(1, int(query_rate)) == 0:
+                window.handle_orbitron_data({'status': 'tracking', 'satellite': 'ISS', 'azimuth': 100 + t,
+                                             'elevation': 40 + t / 10, 'timestamp': time.time()})
+                if not coalesced:
+                    window.update_ui_status()
+            result = {'success': True, 'horizontal_angle': 100 + t * 1.03, 'vertical_angle': 40 + t * 0.11,
+                      'timestamp': time.time(), 'tx_horizontal': tx,
+                      'rx_horizontal': bytes([0xFF, 0x01, 0x00, 0x59, 0x30, index & 0xFF, 0x00])}
+            window.handle_angle_data(result)
+            if not coalesced:
+                _legacy_show_angle(window, result)
+            elif t >= next_frame:
+                window.update_ui_status()
+                next_frame += frame_time
+            app.processEvents()
+        return (time.perf_counter() - start) / seconds * 1000
+
+    print("界面线程耗时 (每模拟1秒, 单位 ms; 原方式每个角度信号立即更新控件与天顶图, 现方式10帧/s合并刷新)")
+    print(f"{'查询频率':<12}{'立即更新':>12}{'合并刷新':>12}{'减少':>11}")
+    for query_rate in (2.6, 20, 100, 500):
+        legacy = run(query_rate, False)
+        current = run(query_rate, True)
+        print(f"{query_rate:<10g}Hz{legacy:>12.1f}{current:>12.1f}{legacy / current:>10.1f}x")
+
+    window.close()
+
+
+class _LegacyTrail:
+    # 对比用：列表保存全部轨迹点，每次更新删除旧线并重新 plot
+    def __init__(self, tracker, color):
+        self.tracker = tracker
+        self.color = color
+        self.azimuth = []
+        self.elevation = []
+        self.line = None
+
+    def append(self, azimuth, elevation):
+        import numpy as np
+
+        self.azimuth.append(azimuth)
+        self.elevation.append(elevation)
+        if self.line is not None:
+            self.line.remove()
+            self.tracker.markers.remove(self.line)
+        self.line = self.tracker.ax.plot(np.radians(self.azimuth), 1 - np.array(self.elevation) / 90.0,
+                                         color=self.color, alpha=0.4, linewidth=1.0, animated=True)[0]
+        self.tracker.markers.insert(0, self.line)
+
+
+def bench_trail(number: int):
+    import os
+    import random
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtWidgets
+    from zenith_tracker import ZenithTracker
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    rate = 20.0
+    half = 450.0
+    # 15分钟过境（仰角10°以上），每秒20次更新；云台指向滞后0.3s并带0.05°噪声，
+    # 30分钟检查点为连续跟踪两次过境而没有清空轨迹的情况
+    position = _flat_pass(50.0, speed_kms=6.3)
+    random.seed(1)
+
+    def sample(index):
+        t = index / rate - half
+        satellite = position(t)
+        azimuth, elevation = position(t - 0.3)
+        return satellite, (azimuth + random.gauss(0, 0.05), elevation + random.gauss(0, 0.05))
+
+    checkpoints = (1, 5, 10, 15, 30)
+    measured = 40
+    results = {}
+    for name in ('legacy', 'ring'):
+        widget = QtWidgets.QWidget()
+        widget.resize(421, 421)
+        tracker = ZenithTracker(widget)
+        tracker.clear_trail()
+        legacy = [_LegacyTrail(tracker, 'blue'), _LegacyTrail(tracker, 'red')] if name == 'legacy' else None
+
+        index = 0
+        rows = []
+        for minute in checkpoints:
+            end = int(minute * 60 * rate)
+            # 到检查点之前的点只记录，不计时（原方式每次都重新 plot，全部重绘太慢）
+            while index < end - measured:
+                satellite, pointing = sample(index)
+                if legacy:
+                    legacy[0].azimuth.append(satellite[0])
+                    legacy[0].elevation.append(satellite[1])
+                    legacy[1].azimuth.append(pointing[0])
+                    legacy[1].elevation.append(pointing[1])
+                else:
+                    tracker.satellite_trail.append(*satellite)
+                    tracker.tracker_trail.append(*pointing)
+                index += 1
+
+            start = time.perf_counter()
+            for _ in range(measured):
+                satellite, pointing = sample(index)
+                if legacy:
+                    legacy[0].append(*satellite)
+                    legacy[1].append(*pointing)
+                    tracker.satellite_pos, tracker.tracker_angle = satellite, pointing
+                    tracker.update_plot()
+                else:
+                    tracker.set_positions(satellite=satellite, tracker=pointing)
+                index += 1
+            elapsed = (time.perf_counter() - start) / measured * 1000
+            if legacy:
+                points = len(legacy[1].azimuth)
+                # 列表本身加上每个 float 对象
+                memory = sum(sys.getsizeof(values) + 24 * len(values)
+                             for trail in legacy for values in (trail.azimuth, trail.elevation))
+            else:
+                points = tracker.tracker_trail.count
+                memory = sum(trail.theta.nbytes + trail.r.nbytes
+                             for trail in (tracker.satellite_trail, tracker.tracker_trail))
+            rows.append((minute, points, elapsed, memory / 1024))
+        results[name] = rows
+
+    print(f"天顶图过境轨迹 (15分钟过境, 每秒{rate:.0f}次更新, 单位: 每次更新 ms / 轨迹内存 KB)")
+    print(f"{'过境时间':<10}{'列表点数':>10}{'列表+重新plot':>16}{'内存':>10}{'环形点数':>10}{'环形数组':>12}{'内存':>10}")
+    for (minute, legacy_points, legacy_ms, legacy_kb), (_, points, ring_ms, ring_kb) in zip(
+            results['legacy'], results['ring']):
+        print(f"{minute:>4d}min{'':<4}{legacy_points:>10d}{legacy_ms:>16.2f}{legacy_kb:>10.0f}"
+              f"{points:>10d}{ring_ms:>12.2f}{ring_kb:>10.0f}")
+
+
+_ZENITH_STARTUP_SCRIPT = """
+import os, sys, time, json
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+start = time.perf_counter()
+
+def rss():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+from PyQt5 import QtCore, QtWidgets
+app = QtWidgets.QApplication(sys.argv[:1])
+base_time, base_rss = time.perf_counter() - start, rss()
+if sys.argv[2] == 'app':
+    from main import MainApp
+    window = MainApp(predict_rate=0, zenith_view=sys.argv[1])
+    window.show()
+    while window.tracker is None:  # 天顶图在首次绘制后于后台加载，计入完成时间
+        app.processEvents(QtCore.QEventLoop.WaitForMoreEvents)
+else:
+    module = __import__('zenith_tracker_qt' if sys.argv[1] == 'qt' else 'zenith_tracker')
+    window = QtWidgets.QWidget()
+    window.resize(421, 421)
+    tracker = module.ZenithTracker(window)
+    tracker.set_positions(satellite=(120, 45), tracker=(115, 43))
+window.show()
+app.processEvents()
+print(json.dumps({'time': (time.perf_counter() - start - base_time) * 1000, 'rss': rss() - base_rss,
+                  'total_rss': rss()}))
+os._exit(0)
+"""
+
+
+def _zenith_startup(view: str, scope: str, runs: int = 3):
+    import json
+    import os
+    import subprocess
+
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', _ZENITH_STARTUP_SCRIPT, view, scope],
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    samples.sort(key=lambda item: item['time'])
+    return samples[len(samples) // 2]
+
+
+def bench_zenith_startup(number: int):
+    # 每次在新进程中测量：QApplication 创建之后，到窗口首次绘制完成的时间与增加的内存
+    print("天顶图实现的启动开销 (新进程, 3次取中位数; 时间为 QApplication 之后到首次绘制, 内存为增加的 RSS)")
+    print(f"{'项目':<20}{'matplotlib':>14}{'QPainter':>14}{'减少':>11}")
+    for scope, label in (('widget', "天顶图单独 (ms)"), ('app', "整个主窗口 (ms)")):
+        legacy = _zenith_startup('matplotlib', scope)
+        current = _zenith_startup('qt', scope)
+        print(f"{label:<18}{legacy['time']:>14.0f}{current['time']:>14.0f}{legacy['time'] / current['time']:>10.1f}x")
+        label = label.replace('(ms)', '(MB)')
+        print(f"{label:<18}{legacy['rss']:>14.1f}{current['rss']:>14.1f}{legacy['rss'] - current['rss']:>10.1f}MB")
+
+
+_STARTUP_SCRIPT = """
+import os, sys, time, json
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+start = time.perf_counter()
+from PyQt5 import QtCore, QtWidgets
+import main
+
+app = QtWidgets.QApplication(sys.argv[:1])
+painted = []
+
+class PaintWatcher(QtCore.QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint and not painted:
+            painted.append(time.perf_counter() - start)
+        return False
+
+if sys.argv[1] == 'eager':
+    # 原方式：构造主窗口时同步枚举串口、导入 NumPy 与 matplotlib 并创建天顶图
+    import importlib
+    ports = main.scan_serial_ports()
+    importlib.import_module('pass_planner')
+    window = main.MainApp(predict_rate=0)
+    window.first_painted = True
+    window.update_serial_ports(ports)
+    window.init_zenith_tracker(importlib.import_module('zenith_tracker'))
+else:
+    window = main.MainApp(predict_rate=0)
+watcher = PaintWatcher()
+window.installEventFilter(watcher)
+window.show()
+while not painted:
+    app.processEvents()
+while window.tracker is None or (window.startup_loader and window.startup_loader.isRunning()):
+    app.processEvents(QtCore.QEventLoop.WaitForMoreEvents)  # 与 exec_() 一样空闲时等待，不与后台线程争抢 GIL
+app.processEvents()
+print(json.dumps({'shown': painted[0] * 1000, 'ready': (time.perf_counter() - start) * 1000}))
+os._exit(0)
+"""
+
+
+def bench_startup(number: int):
+    # 每次在新进程中测量：从导入 PyQt5 开始，到主窗口首次绘制、天顶图可用的时间（不含解释器启动）
+    import json
+    import os
+    import subprocess
+
+    def measure(mode, runs=5):
+        samples = []
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, '-c', _STARTUP_SCRIPT, mode],
+                                    capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+        samples.sort(key=lambda item: item['shown'])
+        return samples[len(samples) // 2]
+
+    legacy = measure('eager')
+    current = measure('deferred')
+    print("主程序启动耗时 (新进程, 5次取中位数, 单位 ms; 原方式在构造主窗口时同步加载, 现方式首次绘制后后台加载)")
+    print(f"{'项目':<24}{'同步加载':>12}{'后台加载':>12}{'加速':>11}")
+    _print_row("窗口首次绘制", legacy['shown'], current['shown'])
+    _print_row("天顶图可用", legacy['ready'], current['ready'])
+
+BENCHMARKS = {
+    'frames': bench_frames,
+    'batch': bench_batch,
+    'serial_latency': bench_serial_latency,
+    'angle_query': bench_angle_query,
+    'capture_decode': bench_capture_decode,
+    'orbitron_parse': bench_orbitron_parse,
+    'orbitron_poll': bench_orbitron_poll,
+    'orbitron_push': bench_orbitron_push,
+    'predictor': bench_predictor,
+    'lead_time': bench_lead_time,
+    'pass_plan': bench_pass_plan,
+    'cable_wrap': bench_cable_wrap,
+    'dispatch': bench_dispatch,
+    'closed_loop': bench_closed_loop,
+    'bus': bench_bus,
+    'ports': bench_ports,
+    'zenith': bench_zenith,
+    'ui_refresh': bench_ui_refresh,
+    'trail': bench_trail,
+    'zenith_startup': bench_zenith_startup,
+    'startup': bench_startup,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="跟踪程序性能基准测试")
+    parser.add_argument('name', nargs='*',
+                        help=f"要运行的测试项 ({', '.join(BENCHMARKS)})，默认全部运行")
+    parser.add_argument('-n', '--number', type=int, default=200000, help="每项重复次数")
+    args = parser.parse_args()
+
+    names = args.name or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"未知测试项: {', '.join(unknown)}")
+
+    for name in names:
+        BENCHMARKS[name](args.number)
+        print()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from MoveControl import MoveControl
+from get_angle import GetAngle
+
+
+def follower_angles(controller: MoveControl, horizontal: float, vertical: float,
+                    offsets: Tuple[float, float]) -> Tuple[float, float]:
+    # 主云台的跟踪角度扣除跟随云台的角度差，放入该云台的水平/垂直角范围
+    h = horizontal - offsets[0]
+    v = vertical - offsets[1]
+
+    low, high = controller.horizontal_range
+    if h < low and h + 360 <= high:
+        h += 360
+    elif h > high and h - 360 >= low:
+        h -= 360
+    h = round(max(low, min(high, h)), 2)
+    low, high = controller.vertical_range
+    return h, round(max(low, min(high, v)), 2)
+
+
+class BusDevice:
+    # 总线上的一台云台：各自的命令帧生成器、角度查询器、待发命令与统计
+
+    def __init__(self, address: int, offsets: Tuple[float, float] = (0.0, 0.0)):
+        self.address = address
+        # 相对主云台的角度差，分发跟踪角度时扣除(°)
+        self.horizontal_offset, self.vertical_offset = offsets
+        self.move_controller = MoveControl(address=address)
+        self.angle_querier = GetAngle()
+        self.angle_querier.set_device_address(address)
+        self.angle_querier.set_vertical_angle_mode('auto')
+        # 总线上一次查询只占用一个应答窗口，水平/垂直查询帧连续发出
+        self.angle_querier.set_pipelined(True)
+
+        self.commands = deque()  # 待发命令 (帧, 说明, 入队时刻, 可被替换)
+        self.last_query_time = 0.0
+        self.last_was_query = False
+        self.last_feedback_time = None
+        self.stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> Dict[str, float]:
+        return {'commands': 0, 'replaced': 0, 'queries': 0, 'feedback': 0, 'failures': 0,
+                'max_wait': 0.0, 'max_gap': 0.0}
+
+    def reset_stats(self):
+        self.last_feedback_time = None
+        self.stats = self._new_stats()
+
+
+class BusScheduler:
+    # 一条 RS-485 总线上的多台 PELCO-D 云台：按地址轮流为每台云台发出一条命令或一次角度查询，
+    # 等待应答期间不写总线；跟踪命令未发出时被同一台云台的新命令替换，不会越积越多
+
+    def __init__(self, serial_port=None, query_interval: float = 0.38, rx_poll_interval: float = 0.002):
+        self.serial_port = serial_port
+        self.query_interval = query_interval  # 每台云台的角度查询周期(s)
+        self.rx_poll_interval = rx_poll_interval  # 等待应答时串口轮询间隔的下限(s)，实际按波特率取一帧的传输时间
+        self.devices: List[BusDevice] = []
+        self._by_address: Dict[int, BusDevice] = {}
+        self._turn = 0
+        self._active = None  # 正在等待角度应答的设备
+        # 串口写入不阻塞，按波特率推算已写入的字节何时发完；发完前不再写，新命令才能在排队时被替换
+        self._busy_until = 0.0
+        self.bus_bytes = 0  # 总线上收发的字节数
+        self.started = time.time()
+
+    def add_device(self, address: int, offsets: Tuple[float, float] = (0.0, 0.0)) -> BusDevice:
+        # 第一台为主云台，跟踪角度按其计算；其余云台按各自的角度差跟随
+        if address in self._by_address:
+            raise ValueError(f"设备地址0x{address:02X}重复")
+
+        device = BusDevice(address, offsets)
+        device.angle_querier.set_serial_port(self.serial_port)
+        self.devices.append(device)
+        self._by_address[address] = device
+        return device
+
+    def set_serial_port(self, serial_port):
+        self.serial_port = serial_port
+        for device in self.devices:
+            device.angle_querier.set_serial_port(serial_port)
+
+    def reset_stats(self):
+        self.bus_bytes = 0
+        self.started = time.time()
+        for device in self.devices:
+            device.reset_stats()
+
+    def enqueue(self, command_bytes: bytes, description: str = "", queued_time: Optional[float] = None,
+                replace: bool = False) -> bool:
+        # 按帧中的地址字节交给对应云台；replace 为 True 时替换该云台尚未发出的可替换命令
+        device = self._by_address.get(command_bytes[1]) if len(command_bytes) > 1 else None
+        if device is None:
+            return False
+
+        if replace:
+            for index, item in enumerate(device.commands):
+                if item[3]:
+                    del device.commands[index]
+                    device.stats['replaced'] += 1
+                    break
+
+        device.commands.append((command_bytes, description,
+                                time.time() if queued_time is None else queued_time, replace))
+        return True
+
+    def fan_out(self, horizontal: float, vertical: float) -> List[Tuple[bytes, str]]:
+        # 主云台的跟踪角度扣除各从云台的角度差，生成各自的命令帧（不含主云台）
+        commands = []
+        for device in self.devices[1:]:
+            controller = device.move_controller
+            h, v = follower_angles(controller, horizontal, vertical,
+                                   (device.horizontal_offset, device.vertical_offset))
+            batch = controller.build_batch([('stop',), ('horizontal', h), ('vertical', v)])
+            commands.append((batch, f"跟踪 0x{device.address:02X} 水平{h:.1f}° 垂直{v:.1f}°"))
+        return commands
+
+    def stop_commands(self) -> List[bytes]:
+        return [device.move_controller.stop() for device in self.devices]
+
+    def time_until_next_event(self, now: float) -> Optional[float]:
+        if self._active is not None:
+            pending = self._active.angle_querier.time_until_next_event(self.rx_poll_interval)
+            return self.rx_poll_interval if pending is None else pending
+
+        if not self.devices or self.serial_port is None:
+            return None
+
+        if any(device.commands for device in self.devices):
+            due = self._busy_until
+        else:
+            due = max(self._busy_until,
+                      min(device.last_query_time for device in self.devices) + self.query_interval)
+        return max(0.0, due - now)
+
+    def _occupy(self, size: int, now: float):
+        baudrate = getattr(self.serial_port, 'baudrate', None)
+        if baudrate:
+            self._busy_until = max(now, self._busy_until) + size * 10 / baudrate
+
+    def service(self, now: float) -> List[Tuple[str, BusDevice, Any]]:
+        # 处理一次总线事务，返回事件列表：
+        # ('command', 设备, (帧, 说明, 入队时刻, 写入开始, 写入结束)) / ('angle', 设备, 结果) / ('error', 设备, 信息)
+        events = []
+        if self.serial_port is None:
+            return events
+
+        if self._active is not None:
+            device = self._active
+            try:
+                result = device.angle_querier.poll()
+            except Exception as e:
+                device.angle_querier.cancel_query()
+                result = None
+                self._active = None
+                device.stats['failures'] += 1
+                events.append(('error', device, f"角度查询失败: {e}"))
+            if result is None:
+                return events
+
+            self._active = None
+            self._record_feedback(device, result)
+            events.append(('angle', device, result))
+
+        if now < self._busy_until:
+            return events
+
+        count = len(self.devices)
+        for step in range(count):
+            index = (self._turn + step) % count
+            device = self.devices[index]
+            query_due = now - device.last_query_time >= self.query_interval
+
+            # 命令与查询都在等待时轮流进行，持续的跟踪命令不会让反馈断掉
+            if device.commands and not (query_due and not device.last_was_query):
+                command_bytes, description, queued_time, _ = device.commands.popleft()
+                write_start = time.time()
+                try:
+                    self.serial_port.write(command_bytes)
+                except Exception as e:
+                    events.append(('error', device, f"发送命令失败: {e}"))
+                    self._turn = index + 1
+                    return events
+                write_end = time.time()
+                self._occupy(len(command_bytes), write_start)
+                device.last_was_query = False
+                self.bus_bytes += len(command_bytes)
+                device.stats['commands'] += 1
+                device.stats['max_wait'] = max(device.stats['max_wait'], write_start - queued_time)
+                events.append(('command', device,
+                               (command_bytes, description, queued_time, write_start, write_end)))
+                self._turn = index + 1
+                return events
+
+            if query_due:
+                device.last_query_time = now
+                device.last_was_query = True
+                device.stats['queries'] += 1
+                try:
+                    device.angle_querier.begin_query()
+                    self._active = device
+                except Exception as e:
+                    device.angle_querier.cancel_query()
+                    device.stats['failures'] += 1
+                    events.append(('error', device, f"角度查询失败: {e}"))
+                self._turn = index + 1
+                return events
+
+        return events
+
+    def _record_feedback(self, device: BusDevice, result: Dict[str, Any]):
+        stats = device.stats
+        # 水平/垂直查询帧各7字节，成功时各有7字节应答
+        self.bus_bytes += len(result.get('tx_horizontal') or b'') + len(result.get('tx_vertical') or b'')
+        self.bus_bytes += len(result.get('rx_horizontal') or b'') + len(result.get('rx_vertical') or b'')
+        if not result.get('success'):
+            stats['failures'] += 1
+            return
+
+        stats['feedback'] += 1
+        now = result.get('timestamp') or time.time()
+        if device.last_feedback_time is not None:
+            stats['max_gap'] = max(stats['max_gap'], now - device.last_feedback_time)
+        device.last_feedback_time = now
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[int, Dict[str, float]]:
+        # 各云台实际达到的命令/反馈频率(次/s)
+        elapsed = max(1e-6, (time.time() if now is None else now) - self.started)
+        rates = {}
+        for device in self.devices:
+            stats = dict(device.stats)
+            stats['command_rate'] = stats['commands'] / elapsed
+            stats['feedback_rate'] = stats['feedback'] / elapsed
+            rates[device.address] = stats
+        return rates
+
+    def utilization(self, now: Optional[float] = None) -> Optional[float]:
+        baudrate = getattr(self.serial_port, 'baudrate', None)
+        if not baudrate:
+            return None
+        elapsed = max(1e-6, (time.time() if now is None else now) - self.started)
+        return self.bus_bytes * 10 / baudrate / elapsed
+
+    def format_report(self, now: Optional[float] = None) -> str:
+        lines = [f"{'总线设备':<10}{'命令/s':>8}{'反馈/s':>8}{'替换':>6}{'失败':>6}{'最长排队ms':>12}{'最长反馈间隔s':>14}"]
+        for address, stats in self.snapshot(now).items():
+            lines.append(f"0x{address:02X}{'':<6}{stats['command_rate']:>8.2f}{stats['feedback_rate']:>8.2f}"
+                         f"{stats['replaced']:>6d}{stats['failures']:>6d}{stats['max_wait'] * 1000:>12.1f}"
+                         f"{stats['max_gap']:>14.2f}")
+        utilization = self.utilization(now)
+        if utilization is not None:
+            lines.append(f"总线占用: {utilization:.0%}")
+        return '\n'.join(lines)
@@ -0,0 +1,112 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+FRAME_SIZE = 7
+RESP_HORIZONTAL = 0x59
+RESP_VERTICAL = 0x5B
+
+
+def _as_uint8_array(data) -> np.ndarray:
+    if isinstance(data, np.ndarray):
+        return data.astype(np.uint8, copy=False).ravel()
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def _convert_vertical_angles(angle_deg: np.ndarray, mode: str) -> np.ndarray:
+    # 与 GetAngle._convert_vertical_angle 一致：auto/negative 下超过180°的值转为负角度
+    if mode == 'direct':
+        return angle_deg
+    return np.where(angle_deg > 180.0, angle_deg - 360.0, angle_deg)
+
+
+def _drop_overlapping(offsets: np.ndarray) -> np.ndarray:
+    # 与流式分帧器相同的贪心规则：一帧被接受后，其后6个字节不再作为帧头；
+    # 传入的应是所有地址和校验和有效的帧，按操作码筛选须在此之后进行
+    if offsets.size < 2:
+        return offsets
+
+    close = np.flatnonzero(np.diff(offsets) < FRAME_SIZE)
+    if close.size == 0:
+        return offsets
+
+    # 相距不小于一帧的帧互不影响，只需在相互重叠的一段段帧内逐个判断
+    keep = np.ones(offsets.size, dtype=bool)
+    starts = close[np.r_[True, np.diff(close) > 1]]
+    ends = close[np.r_[np.diff(close) > 1, True]] + 1
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        next_free = -1
+        for index in range(start, end + 1):
+            offset = int(offsets[index])
+            if offset >= next_free:
+                next_free = offset + FRAME_SIZE
+            else:
+                keep[index] = False
+    return offsets[keep]
+
+
+def decode_capture(data, address: Optional[int] = None,
+                   opcodes: Sequence[int] = (RESP_HORIZONTAL, RESP_VERTICAL),
+                   vertical_mode: str = 'auto',
+                   byte_timestamps: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    # 批量解码录制的 PELCO-D 接收字节流，返回按帧对齐的各列数组
+    if vertical_mode not in ('auto', 'direct', 'negative'):
+        raise ValueError(f"未知的垂直角度模式: {vertical_mode}")
+
+    stream = _as_uint8_array(data)
+
+    if stream.size >= FRAME_SIZE:
+        candidates = np.flatnonzero(stream[:stream.size - FRAME_SIZE + 1] == 0xFF)
+    else:
+        candidates = np.empty(0, dtype=np.intp)
+
+    frames = stream[candidates[:, None] + np.arange(FRAME_SIZE)]
+
+    checksum = frames[:, 1:6].sum(axis=1, dtype=np.uint32) & 0xFF
+    valid = checksum == frames[:, 6]
+    if address is not None:
+        valid &= frames[:, 1] == address
+
+    # 先按分帧器的规则去掉重叠帧，再筛选操作码：分帧器会接受任何校验有效的帧（如回显的查询帧），
+    # 它占用的字节不会再作为其他帧的开头
+    offsets = _drop_overlapping(candidates[valid])
+    frames = stream[offsets[:, None] + np.arange(FRAME_SIZE)]
+    if opcodes is not None:
+        wanted = np.isin(frames[:, 3], np.asarray(opcodes, dtype=np.uint8))
+        offsets = offsets[wanted]
+        frames = frames[wanted]
+
+    opcode = frames[:, 3]
+    raw = (frames[:, 4].astype(np.uint16) << 8) | frames[:, 5]
+
+    angle = raw / 100.0
+    is_vertical = opcode == RESP_VERTICAL
+    angle[is_vertical] = _convert_vertical_angles(angle[is_vertical], vertical_mode)
+    angle[(opcode != RESP_HORIZONTAL) & ~is_vertical] = np.nan
+
+    result = {
+        'index': offsets,
+        'address': frames[:, 1],
+        'opcode': opcode,
+        'raw': raw,
+        'angle': angle,
+    }
+
+    if byte_timestamps is not None:
+        result['timestamp'] = np.asarray(byte_timestamps)[offsets]
+
+    return result
+
+
+def decode_capture_file(path: str, **kwargs) -> Dict[str, np.ndarray]:
+    # 以内存映射方式读取大文件，避免整体载入内存
+    stream = np.memmap(path, dtype=np.uint8, mode='r')
+    return decode_capture(stream, **kwargs)
+
+
+def split_axes(decoded: Dict[str, np.ndarray]) -> Dict[str, Dict[str, np.ndarray]]:
+    axes = {}
+    for name, opcode in (('horizontal', RESP_HORIZONTAL), ('vertical', RESP_VERTICAL)):
+        mask = decoded['opcode'] == opcode
+        axes[name] = {key: values[mask] for key, values in decoded.items()}
+    return axes
@@ -0,0 +1,185 @@
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+
+class ClosedLoopController:
+    # 闭环跟踪：用 GetAngle 反馈比较云台实际位置与目标，误差小时按目标角速度加比例修正发变速转动命令，
+    # 误差大时改发绝对角度（0x4B/0x4D），到位后再回到速度跟踪。
+    # 反馈之间的位置按已发出的速度推算，命令生效前的死区时间用超前目标补偿
+
+    MAX_SPEED = 0x3F
+
+    def __init__(self, max_rate: float = 30.0, gain: float = 1.5, absolute_threshold: float = 2.0,
+                 tolerance: float = 0.05, dead_time: float = 0.15, feedback_timeout: float = 2.0,
+                 min_interval: float = 0.2, refresh_interval: float = 1.0,
+                 velocity_window: float = 2.0, max_jump: float = 10.0):
+        self.max_rate = max_rate  # 速度 0x3F 对应的转速(°/s)，速度与转速按线性换算
+        self.gain = gain  # 比例增益：每度误差附加的转速(°/s)
+        self.absolute_threshold = absolute_threshold  # 任一轴误差超过该值时改用绝对角度(°)
+        self.tolerance = tolerance  # 误差在该值以内且目标静止时该轴停止(°)
+        self.dead_time = dead_time  # 命令发出到云台开始响应的时间(s)
+        self.feedback_timeout = feedback_timeout  # 超过该时间没有反馈时视为无反馈，由调用方开环跟踪(s)
+        self.min_interval = min_interval  # 两次命令的最小间隔(s)
+        self.refresh_interval = refresh_interval  # 速度不变时重发的间隔，防止丢帧后云台一直停着(s)
+        self.velocity_window = velocity_window
+        self.max_jump = max_jump
+
+        self.mode = 'absolute'
+        self.target = None  # 最新目标 (时间, 水平角, 垂直角)
+        self.velocity = (0.0, 0.0)  # 目标角速度(°/s)
+        self.measured = None  # 最新反馈 (时间, 水平角, 垂直角)
+        self.last_absolute = None  # 最近一次绝对角度命令 (时间, 水平角, 垂直角)
+        self.last_speed = None  # 最近一次速度命令 (水平速度, 垂直速度)
+        self.last_command_time = None
+        self._targets = deque()
+        self._rates = deque()  # (生效时间, 水平转速, 垂直转速)，用于推算反馈之后的位置
+        self.stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> Dict[str, int]:
+        return {'absolute': 0, 'velocity': 0, 'switches': 0}
+
+    def reset(self):
+        self.mode = 'absolute'
+        self.target = None
+        self.velocity = (0.0, 0.0)
+        self.measured = None
+        self.last_absolute = None
+        self.last_speed = None
+        self.last_command_time = None
+        self._targets.clear()
+        self._rates.clear()
+        self.stats = self._new_stats()
+
+    def rate_per_step(self) -> float:
+        return self.max_rate / self.MAX_SPEED
+
+    def has_feedback(self, now: float) -> bool:
+        return self.measured is not None and now - self.measured[0] <= self.feedback_timeout
+
+    def set_target(self, now: float, horizontal: float, vertical: float):
+        targets = self._targets
+        if targets and (abs(horizontal - targets[-1][1]) > self.max_jump or
+                        abs(vertical - targets[-1][2]) > self.max_jump or now <= targets[-1][0]):
+            targets.clear()
+            self.velocity = (0.0, 0.0)
+        targets.append((now, horizontal, vertical))
+        while len(targets) > 2 and now - targets[1][0] >= self.velocity_window:
+            targets.popleft()
+        if len(targets) >= 2:
+            first_time, first_h, first_v = targets[0]
+            dt = now - first_time
+            self.velocity = ((horizontal - first_h) / dt, (vertical - first_v) / dt)
+        self.target = (now, horizontal, vertical)
+
+    def target_at(self, t: float) -> Tuple[float, float]:
+        stamp, horizontal, vertical = self.target
+        return horizontal + self.velocity[0] * (t - stamp), vertical + self.velocity[1] * (t - stamp)
+
+    def observe(self, now: float, horizontal: float, vertical: float):
+        self.measured = (now, horizontal, vertical)
+        # 只保留反馈时刻仍在生效的速度及之后的命令
+        while len(self._rates) > 1 and self._rates[1][0] <= now:
+            self._rates.popleft()
+
+    def estimate(self, t: float) -> Optional[Tuple[float, float]]:
+        # 最新反馈加上之后按已发速度命令转过的角度
+        if self.measured is None:
+            return None
+
+        stamp, horizontal, vertical = self.measured
+        rate = (0.0, 0.0)
+        for effective, rate_h, rate_v in self._rates:
+            if effective >= t:
+                break
+            if effective > stamp:
+                horizontal += rate[0] * (effective - stamp)
+                vertical += rate[1] * (effective - stamp)
+                stamp = effective
+            rate = (rate_h, rate_v)
+        return horizontal + rate[0] * (t - stamp), vertical + rate[1] * (t - stamp)
+
+    def update(self, now: float) -> Optional[Tuple]:
+        # 返回 ('absolute', 水平角, 垂直角) 或 ('velocity', 水平速度, 垂直速度)，不需要发命令时返回 None；
+        # 没有反馈时返回 None，由调用方按开环方式跟踪
+        if self.target is None or not self.has_feedback(now):
+            return None
+
+        if self.mode == 'absolute' and not self._arrived():
+            return self._absolute(now)
+
+        # 比较命令生效时刻的目标与推算位置
+        ahead = now + self.dead_time
+        target_h, target_v = self.target_at(ahead)
+        estimate_h, estimate_v = self.estimate(ahead)
+        error_h, error_v = target_h - estimate_h, target_v - estimate_v
+        if max(abs(error_h), abs(error_v)) > self.absolute_threshold:
+            self._switch('absolute')
+            return self._absolute(now)
+
+        self._switch('velocity')
+        speed = (self._speed(self.velocity[0], error_h), self._speed(self.velocity[1], error_v))
+        if self.last_command_time is not None:
+            elapsed = now - self.last_command_time
+            if elapsed < self.min_interval:
+                return None
+            if speed == self.last_speed and elapsed < self.refresh_interval:
+                return None
+
+        step = self.rate_per_step()
+        self._rates.append((ahead, speed[0] * step, speed[1] * step))
+        self.last_speed = speed
+        self.last_command_time = now
+        self.stats['velocity'] += 1
+        return ('velocity',) + speed
+
+    def _speed(self, target_rate: float, error: float) -> int:
+        rate = target_rate + self.gain * error
+        speed = min(self.MAX_SPEED, int(round(abs(rate) / self.rate_per_step())))
+        if speed == 0 and abs(error) > self.tolerance:
+            # 最低速度也比所需转速快，先按最低速度消除误差，下一次修正再停
+            speed = 1
+            rate = error
+        return speed if rate >= 0 else -speed
+
+    def _arrived(self) -> bool:
+        # 绝对角度命令发出后，有反馈显示云台已接近目标时回到速度跟踪
+        if self.last_absolute is None:
+            return False
+        stamp, horizontal, vertical = self.measured
+        if stamp < self.last_absolute[0] + self.dead_time:
+            return False
+        target_h, target_v = self.target_at(stamp)
+        return max(abs(target_h - horizontal), abs(target_v - vertical)) <= self.absolute_threshold / 2
+
+    def _absolute(self, now: float) -> Optional[Tuple]:
+        # 与开环相同，指向命令生效时刻的目标；目标移动超过 absolute_threshold/2 后再更新。
+        # 不按转动时间进一步超前：天顶附近目标在加速，线性外推更远反而偏得更多
+        target_h, target_v = self.target_at(now + self.dead_time)
+
+        if self.last_absolute is not None:
+            if now - self.last_absolute[0] < self.min_interval:
+                return None
+            if max(abs(target_h - self.last_absolute[1]),
+                   abs(target_v - self.last_absolute[2])) <= self.absolute_threshold / 2:
+                return None
+
+        target_h, target_v = round(target_h, 2), round(target_v, 2)
+        self.last_absolute = (now, target_h, target_v)
+        self.last_speed = None
+        self.last_command_time = now
+        self._rates.clear()
+        self.stats['absolute'] += 1
+        return ('absolute', target_h, target_v)
+
+    def _switch(self, mode: str):
+        if mode != self.mode:
+            self.mode = mode
+            self.stats['switches'] += 1
+            if mode == 'absolute':
+                self.last_absolute = None
+
+    def format_report(self) -> str:
+        stats = self.stats
+        return (f"闭环跟踪: 速度命令{stats['velocity']}次, 绝对角度命令{stats['absolute']}次, "
+                f"模式切换{stats['switches']}次")
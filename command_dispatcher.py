@@ -0,0 +1,173 @@
+import math
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from track_predictor import direction_vector
+
+
+def pointing_distance(h1: float, v1: float, h2: float, v2: float) -> float:
+    # 两组云台角度指向之间的夹角；垂直角超过90°（翻转姿态）同样适用
+    a = direction_vector(h1, v1)
+    b = direction_vector(h2, v2)
+    cos_angle = a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+    return math.degrees(math.acos(max(-1.0, min(1.0, cos_angle))))
+
+
+class CommandDispatcher:
+    # 跟踪命令调度：按目标角速度确定命令步长与超前量，按云台实测转速调整命令间隔；
+    # 间隔未到时不丢弃目标，只保留最新的一个，到时按其速度推算到当前时刻再发出
+
+    def __init__(self, resolution: float = 0.1, min_interval: float = 0.2,
+                 max_interval: float = 1.0, slew_rate: float = 30.0,
+                 smoothing: float = 0.3, max_jump: float = 10.0, velocity_window: float = 3.0,
+                 velocity_span: float = 1.0):
+        self.resolution = resolution  # 允许的指向误差，即界面上的角度分辨率(°)
+        self.min_interval = min_interval  # 两次命令的最小间隔(s)
+        self.max_interval = max_interval  # 大角度转动时等待上一条命令执行的最长时间(s)
+        self.slew_rate = slew_rate  # 云台转速，收到角度反馈后按实测值更新(°/s)
+        self.smoothing = smoothing
+        self.max_jump = max_jump  # 相邻目标相差超过该角度时视为跳变（换圈、换星），速度清零(°)
+        # 按最近 velocity_window 秒或最近转过 velocity_span 度（取较短者）的首尾目标计算角速度：
+        # 目标慢时跨度长以减小取整噪声，天顶附近加速快时跨度短以减小滞后
+        self.velocity_window = velocity_window
+        self.velocity_span = velocity_span
+
+        self.velocity = (0.0, 0.0)  # 目标的水平/垂直角速度(°/s)
+        self.pending = None  # 尚未发出的最新目标 (水平角, 垂直角, 时间)
+        self.last_sent = None  # 最近一次发出的角度（已含超前量）
+        self.last_sent_time = None
+        self._last_step = 0.0
+        self._targets = deque()
+        self._last_feedback = None
+        self.stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> Dict[str, int]:
+        return {'submitted': 0, 'sent': 0, 'coalesced': 0, 'suppressed': 0}
+
+    def reset(self):
+        self.velocity = (0.0, 0.0)
+        self.pending = None
+        self.last_sent = None
+        self.last_sent_time = None
+        self._last_step = 0.0
+        self._targets.clear()
+        self._last_feedback = None
+        self.stats = self._new_stats()
+
+    def target_rate(self) -> float:
+        # 目标指向的角速度(°/s)，水平角速度按垂直角折算
+        if not self._targets:
+            return 0.0
+        vertical = math.radians(self._targets[-1][2])
+        return math.hypot(self.velocity[0] * math.cos(vertical), self.velocity[1])
+
+    def interval(self) -> float:
+        # 上一条命令需要转动较大角度时，等云台大致执行完再发下一条，避免反复停止再启动
+        travel_time = self._last_step / self.slew_rate if self.slew_rate > 0 else 0.0
+        return max(self.min_interval, min(self.max_interval, travel_time))
+
+    def lead_time(self) -> float:
+        # 每条命令指向目标前方半个命令周期处，误差在 ±resolution 之间摆动：
+        # 目标慢时周期为 2*resolution/角速度，命令数比原方式减半；目标快时周期受 interval() 限制
+        rate = self.target_rate()
+        if rate <= 0:
+            return 0.0
+        return max(2 * self.resolution / rate, self.interval()) / 2
+
+    def deadband(self) -> float:
+        # 实际的命令步长(°)
+        return 2 * self.lead_time() * self.target_rate()
+
+    def submit(self, now: float, horizontal: float, vertical: float) -> Optional[Tuple[float, float]]:
+        # 提交最新目标；可以立即发送时返回要发出的角度，否则保留到 poll() 时再发
+        self.stats['submitted'] += 1
+
+        targets = self._targets
+        if targets and (abs(horizontal - targets[-1][1]) > self.max_jump or
+                        abs(vertical - targets[-1][2]) > self.max_jump or now <= targets[-1][0]):
+            targets.clear()
+            self.velocity = (0.0, 0.0)
+        targets.append((now, horizontal, vertical))
+        while len(targets) > 2 and (now - targets[1][0] >= self.velocity_window or
+                                    max(abs(horizontal - targets[1][1]),
+                                        abs(vertical - targets[1][2])) >= self.velocity_span):
+            targets.popleft()
+        if len(targets) >= 2:
+            first_time, first_h, first_v = targets[0]
+            dt = now - first_time
+            self.velocity = ((horizontal - first_h) / dt, (vertical - first_v) / dt)
+
+        if self.pending is not None:
+            self.stats['coalesced'] += 1
+        self.pending = (horizontal, vertical, now)
+        return self.poll(now)
+
+    def poll(self, now: float) -> Optional[Tuple[float, float]]:
+        if self.pending is None:
+            return None
+
+        h, v, stamp = self.pending
+        h += self.velocity[0] * (now - stamp)
+        v += self.velocity[1] * (now - stamp)
+
+        if self.last_sent is not None:
+            if not self._needs_command(h, v):
+                self.pending = None
+                self.stats['suppressed'] += 1
+                return None
+            if now - self.last_sent_time < self.interval():
+                return None
+
+        lead = self.lead_time()
+        target = (round(h + self.velocity[0] * lead, 2), round(v + self.velocity[1] * lead, 2))
+        if self.last_sent is not None:
+            self._last_step = max(abs(target[0] - self.last_sent[0]), abs(target[1] - self.last_sent[1]))
+        self.pending = None
+        self.last_sent = target
+        self.last_sent_time = now
+        self.stats['sent'] += 1
+        return target
+
+    def _needs_command(self, h: float, v: float) -> bool:
+        # 命令发出时指向目标前方 resolution 处，目标越过该点 resolution 后才需要下一条命令；
+        # 偏离超过 3*resolution（目标速度变化）时也发送
+        distance = pointing_distance(h, v, *self.last_sent)
+        rate = self.target_rate()
+        if rate <= 0 or distance > 3 * self.resolution:
+            return distance > self.resolution
+
+        # 目标相对上次命令在运动方向上的偏移，水平角差按垂直角折算
+        cos_v = math.cos(math.radians(v))
+        along = ((h - self.last_sent[0]) * cos_v * self.velocity[0] * cos_v +
+                 (v - self.last_sent[1]) * self.velocity[1]) / rate
+        return along > self.resolution
+
+    def next_due(self, now: float) -> Optional[float]:
+        # 待发目标距可发送还有多久(s)，没有待发目标时返回 None
+        if self.pending is None:
+            return None
+        if self.last_sent_time is None:
+            return 0.0
+        return max(0.0, self.last_sent_time + self.interval() - now)
+
+    def observe(self, now: float, horizontal: float, vertical: float):
+        # 角度反馈：云台在两次反馈之间一直满速转动（离目标仍远）时，用转动量估计实际转速
+        previous = self._last_feedback
+        self._last_feedback = (now, horizontal, vertical)
+        if previous is None or self.last_sent is None or now <= previous[0]:
+            return
+
+        moved = max(abs(horizontal - previous[1]), abs(vertical - previous[2]))
+        remaining = min(max(abs(self.last_sent[0] - h), abs(self.last_sent[1] - v))
+                        for h, v in (previous[1:], (horizontal, vertical)))
+        if moved >= 1.0 and remaining >= 1.0:
+            rate = moved / (now - previous[0])
+            self.slew_rate += self.smoothing * (rate - self.slew_rate)
+
+    def format_report(self) -> str:
+        stats = self.stats
+        return (f"跟踪命令: 提交{stats['submitted']}次, 发送{stats['sent']}次, "
+                f"合并{stats['coalesced']}次, 死区内{stats['suppressed']}次; "
+                f"目标角速度{self.target_rate():.2f}°/s, 命令步长{self.deadband():.2f}°, "
+                f"云台转速{self.slew_rate:.1f}°/s")
@@ -1,8 +1,103 @@
 import time
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
+
+
+class PelcoDFramer:
+    # PELCO-D 应答流式分帧器：可喂入任意切分的字节块，按 0xFF 同步头重新对齐，
+    # 校验地址和校验和后输出完整的 7 字节帧，未成帧的字节保留在环形缓冲区中
+    FRAME_SIZE = 7
+    SYNC = 0xFF
+
+    def __init__(self, address: Optional[int] = None, capacity: int = 256):
+        if capacity < self.FRAME_SIZE:
+            raise ValueError(f"缓冲区容量不能小于{self.FRAME_SIZE}字节")
+
+        self.address = address  # None 表示不校验地址
+        self._ring = bytearray(capacity)
+        self._capacity = capacity
+        self._head = 0
+        self._size = 0
+
+        self.frame_count = 0
+        self.discarded_bytes = 0
+
+    def set_address(self, address: Optional[int]):
+        self.address = address
+
+    def reset(self):
+        self._head = 0
+        self._size = 0
+
+    def pending_bytes(self) -> int:
+        return self._size
+
+    def feed(self, data: bytes) -> List[bytes]:
+        frames = []
+        view = memoryview(data)
+        offset = 0
+
+        # 大块数据分段写入，每段之后先分帧以腾出缓冲区空间
+        while True:
+            room = self._capacity - self._size
+            chunk = view[offset:offset + room]
+            if chunk:
+                self._push(chunk)
+                offset += len(chunk)
+            self._extract(frames)
+            if offset >= len(view):
+                break
+
+        return frames
+
+    def _extract(self, frames: List[bytes]):
+        ring = self._ring
+        while self._size >= self.FRAME_SIZE:
+            if ring[self._head] != self.SYNC:
+                self._consume(1)
+                self.discarded_bytes += 1
+                continue
+
+            frame = self._peek(self.FRAME_SIZE)
+            if self._is_valid(frame):
+                frames.append(frame)
+                self._consume(self.FRAME_SIZE)
+                self.frame_count += 1
+            else:
+                # 可能是数据字节中的 0xFF，跳过一个字节重新找同步头
+                self._consume(1)
+                self.discarded_bytes += 1
+
+    def _is_valid(self, frame: bytes) -> bool:
+        if self.address is not None and frame[1] != self.address:
+            return False
+        return (frame[1] + frame[2] + frame[3] + frame[4] + frame[5]) & 0xFF == frame[6]
+
+    def _push(self, data: bytes):
+        # 调用方保证 data 不超过剩余空间
+        cap = self._capacity
+        n = len(data)
+        tail = (self._head + self._size) % cap
+        first = min(n, cap - tail)
+        self._ring[tail:tail + first] = data[:first]
+        if first < n:
+            self._ring[:n - first] = data[first:]
+        self._size += n
+
+    def _peek(self, n: int) -> bytes:
+        start = self._head
+        end = start + n
+        if end <= self._capacity:
+            return bytes(self._ring[start:end])
+        return bytes(self._ring[start:]) + bytes(self._ring[:end - self._capacity])
+
+    def _consume(self, n: int):
+        self._head = (self._head + n) % self._capacity
+        self._size -= n
 
 
 class GetAngle:
+    _AXIS_QUERY = {'horizontal': 0x51, 'vertical': 0x53}
+    _RESPONSE_AXIS = {0x59: 'horizontal', 0x5B: 'vertical'}
 
     def __init__(self):
         self.serial_port = None
@@ -11,11 +106,23 @@ class GetAngle:
         self.timeout_ms = 350  # 查询超时时间(ms)
         self.retry_count = 3  # 重试次数
         self.query_interval = 0.05  # 查询间隔(s)
+        self.retry_interval = 0.05  # 重试间隔(s)
 
         self.last_horizontal_angle = None
         self.last_vertical_angle = None
 
         self.vertical_angle_mode = 'auto'
+        self.pipelined = False  # 水平/垂直查询帧连续发出，按应答命令字分拣
+
+        # 非阻塞查询状态
+        self._query_stage = None  # None / 'horizontal' / 'vertical' / 'pipelined'
+        self._query_attempt = 0
+        self._awaiting_reply = False
+        self._reply_deadline = 0.0
+        self._reply_expected = 0.0  # 按波特率估算的应答最早到齐时刻
+        self._next_send_time = 0.0
+        self._query_result = None
+        self._framer = PelcoDFramer(self.device_address)
 
     def set_serial_port(self, serial_port):
         self.serial_port = serial_port
@@ -23,6 +130,7 @@ class GetAngle:
     def set_device_address(self, address: int):
         if 1 <= address <= 255:
             self.device_address = address
+            self._framer.set_address(address)
             return True
         else:
             return False
@@ -53,6 +161,9 @@ class GetAngle:
 
         return bytes(cmd)
 
+    def set_pipelined(self, enabled: bool):
+        self.pipelined = bool(enabled)
+
     def _convert_vertical_angle(self, angle_raw: int) -> float:
         if angle_raw is None:
             return None
@@ -108,61 +219,8 @@ class GetAngle:
 
         return angle_deg
 
-    def _query_single_angle(self, is_horizontal: bool) -> Tuple[Optional[float], bytes, bytes]:
-        if not self.serial_port:
-            return None, b'', b''
-
-        query_cmd = 0x51 if is_horizontal else 0x53
-        cmd_bytes = self._build_query_command(query_cmd)
-
-        try:
-            self.serial_port.write(cmd_bytes)
-        except Exception as e:
-            print(f"发送命令失败: {e}")
-            return None, cmd_bytes, b''
-
-        try:
-            self.serial_port.reset_input_buffer()
-
-            start_time = time.time()
-            response = b''
-
-            while time.time() - start_time < (self.timeout_ms / 1000.0):
-                if self.serial_port.in_waiting > 0:
-                    response += self.serial_port.read(self.serial_port.in_waiting)
-                    if len(response) >= 7:
-                        break
-                time.sleep(0.001)
-
-            response = response[:7]
-
-        except Exception as e:
-            print(f"接收响应失败: {e}")
-            return None, cmd_bytes, b''
-
-        expected_resp = query_cmd + 0x08
-        angle_deg = self._parse_response(response, expected_resp, not is_horizontal)
-
-        return angle_deg, cmd_bytes, response
-
-    def query_angles(self) -> Dict[str, Any]:
-        if not self.serial_port:
-            return {
-                'success': False,
-                'horizontal_angle': None,
-                'vertical_angle': None,
-                'horizontal_raw': None,
-                'vertical_raw': None,
-                'tx_horizontal': b'',
-                'rx_horizontal': b'',
-                'tx_vertical': b'',
-                'rx_vertical': b'',
-                'device_address': self.device_address,
-                'error_message': '未连接串口',
-                'vertical_mode': self.vertical_angle_mode
-            }
-
-        result = {
+    def _new_result(self, error_message: str = '') -> Dict[str, Any]:
+        return {
             'success': False,
             'horizontal_angle': None,
             'vertical_angle': None,
@@ -173,42 +231,160 @@ class GetAngle:
             'tx_vertical': b'',
             'rx_vertical': b'',
             'device_address': self.device_address,
-            'error_message': '',
+            'error_message': error_message,
             'vertical_mode': self.vertical_angle_mode
         }
 
-        for retry in range(self.retry_count):
-            h_angle, tx_h, rx_h = self._query_single_angle(True)
+    def is_query_active(self) -> bool:
+        return self._query_stage is not None
 
-            result['tx_horizontal'] = tx_h
-            result['rx_horizontal'] = rx_h
+    def begin_query(self) -> bool:
+        # 开始一轮非阻塞查询（先水平后垂直），立即返回
+        if not self.serial_port or self._query_stage is not None:
+            return False
 
-            if h_angle is not None:
-                result['horizontal_angle'] = h_angle
-                if rx_h and len(rx_h) >= 7:
-                    result['horizontal_raw'] = (rx_h[4] << 8) | rx_h[5]
-                self.last_horizontal_angle = h_angle
-                break
-            elif retry < self.retry_count - 1:
-                time.sleep(0.05)
+        self._query_result = self._new_result()
+        self._query_stage = 'pipelined' if self.pipelined else 'horizontal'
+        self._query_attempt = 0
+        self._awaiting_reply = False
+        self._next_send_time = time.time()
+
+        self.poll()
+        return True
+
+    def cancel_query(self):
+        self._query_stage = None
+        self._awaiting_reply = False
+        self._framer.reset()
+
+    def byte_time(self) -> float:
+        # 一个字节在线上的传输时间：起始位 + 8数据位 + 停止位
+        baudrate = getattr(self.serial_port, 'baudrate', None) or 9600
+        return 10.0 / baudrate
+
+    def time_until_next_event(self, min_poll: float = 0.002) -> Optional[float]:
+        # 距下一次需要 poll() 处理的时刻：等待应答时，应答按波特率最早到齐之前不必读串口，
+        # 之后每隔一帧的传输时间（不少于 min_poll）读一次，直到超时；否则为下一次发送时刻
+        if self._query_stage is None:
+            return None
 
-        time.sleep(self.query_interval)
+        now = time.time()
+        if not self._awaiting_reply:
+            return max(0.0, self._next_send_time - now)
 
-        for retry in range(self.retry_count):
-            v_angle, tx_v, rx_v = self._query_single_angle(False)
+        if now < self._reply_expected:
+            target = self._reply_expected
+        else:
+            target = now + max(min_poll, PelcoDFramer.FRAME_SIZE * self.byte_time())
+        return max(0.0, min(target, self._reply_deadline) - now)
 
-            result['tx_vertical'] = tx_v
-            result['rx_vertical'] = rx_v
+    def poll(self) -> Optional[Dict[str, Any]]:
+        # 读取已到达的字节、处理超时与重发，本轮结束时返回结果字典
+        if self._query_stage is None:
+            return None
 
-            if v_angle is not None:
-                result['vertical_angle'] = v_angle
-                if rx_v and len(rx_v) >= 7:
-                    result['vertical_raw'] = (rx_v[4] << 8) | rx_v[5]
-                self.last_vertical_angle = v_angle
-                break
-            elif retry < self.retry_count - 1:
-                time.sleep(0.05)
+        if self._awaiting_reply:
+            try:
+                waiting = self.serial_port.in_waiting
+                if waiting > 0:
+                    result = self.feed(self.serial_port.read(waiting))
+                    if result is not None or not self._awaiting_reply:
+                        return result
+            except Exception as e:
+                print(f"接收响应失败: {e}")
+                return self._attempt_failed(time.time())
+
+            now = time.time()
+            if now >= self._reply_deadline:
+                return self._attempt_failed(now)
+            return None
+
+        now = time.time()
+        if now >= self._next_send_time:
+            return self._send_stage_query(now)
+        return None
+
+    def feed(self, data: bytes) -> Optional[Dict[str, Any]]:
+        # 喂入串口收到的字节，按应答命令字(0x59/0x5B)分拣出各轴的帧
+        if self._query_stage is None or not self._awaiting_reply:
+            return None
+
+        pending = self._pending_axes()
+
+        for response in self._framer.feed(data):
+            axis = self._RESPONSE_AXIS.get(response[3])
+            if axis not in pending:
+                continue
+
+            is_vertical = axis == 'vertical'
+            angle_deg = self._parse_response(response, response[3], is_vertical)
+            if angle_deg is None:
+                continue
+
+            self._query_result['rx_' + axis] = response
+            self._query_result[axis + '_angle'] = angle_deg
+            self._query_result[axis + '_raw'] = (response[4] << 8) | response[5]
+            if is_vertical:
+                self.last_vertical_angle = angle_deg
+            else:
+                self.last_horizontal_angle = angle_deg
+            pending.remove(axis)
+
+        if pending:
+            return None
+
+        return self._finish_stage(time.time())
+
+    def _pending_axes(self) -> List[str]:
+        if self._query_stage == 'pipelined':
+            return [axis for axis in ('horizontal', 'vertical')
+                    if self._query_result[axis + '_angle'] is None]
+        return [self._query_stage]
+
+    def _send_stage_query(self, now: float) -> Optional[Dict[str, Any]]:
+        frames = []
+        for axis in self._pending_axes():
+            cmd_bytes = self._build_query_command(self._AXIS_QUERY[axis])
+            self._query_result['tx_' + axis] = cmd_bytes
+            self._query_result['rx_' + axis] = b''
+            frames.append(cmd_bytes)
+
+        self._query_attempt += 1
+
+        try:
+            # 不再清空输入缓冲：残留字节由分帧器按同步头和命令字过滤
+            self.serial_port.write(b''.join(frames))
+        except Exception as e:
+            print(f"发送命令失败: {e}")
+            return self._attempt_failed(now)
+
+        self._awaiting_reply = True
+        self._reply_deadline = now + self.timeout_ms / 1000.0
+        # 查询帧发完、每轴一帧应答传回所需的时间，不含设备的处理时间
+        self._reply_expected = now + 2 * len(frames) * PelcoDFramer.FRAME_SIZE * self.byte_time()
+        return None
+
+    def _attempt_failed(self, now: float) -> Optional[Dict[str, Any]]:
+        self._awaiting_reply = False
+
+        if self._query_attempt < self.retry_count:
+            self._next_send_time = now + self.retry_interval
+            return None
+
+        return self._finish_stage(now)
 
+    def _finish_stage(self, now: float) -> Optional[Dict[str, Any]]:
+        self._awaiting_reply = False
+        self._query_attempt = 0
+
+        if self._query_stage == 'horizontal':
+            self._query_stage = 'vertical'
+            self._next_send_time = now + self.query_interval
+            return None
+
+        self._query_stage = None
+        result = self._query_result
+        result['timestamp'] = now
         if result['horizontal_angle'] is not None and result['vertical_angle'] is not None:
             result['success'] = True
         else:
@@ -216,6 +392,19 @@ class GetAngle:
 
         return result
 
+    def query_angles(self) -> Dict[str, Any]:
+        if not self.serial_port:
+            return self._new_result('未连接串口')
+
+        self.cancel_query()
+        self.begin_query()
+
+        while True:
+            result = self.poll()
+            if result is not None:
+                return result
+            time.sleep(0.001)
+
     def format_result(self, result: Dict[str, Any]) -> str:
         if not result['success']:
             return f"查询失败: {result['error_message']}"
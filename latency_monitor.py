@@ -0,0 +1,162 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Sequence
+
+# 跟踪链路各环节，按数据流向排列
+STAGES = OrderedDict([
+    ('orbitron', 'Orbitron读取'),
+    ('signal', '信号传递'),
+    ('queue', '串口队列'),
+    ('write', '串口写入'),
+    ('mechanical', '机械到位'),
+])
+
+# 命令发出之后的环节，超前补偿量为这些环节的平均延迟之和
+LEAD_STAGES = ('queue', 'write', 'mechanical')
+
+
+def _angular_distance(az1: float, el1: float, az2: float, el2: float) -> float:
+    a1, e1, a2, e2 = map(math.radians, (az1, el1, az2, el2))
+    cos_angle = (math.sin(e1) * math.sin(e2) +
+                 math.cos(e1) * math.cos(e2) * math.cos(a1 - a2))
+    return math.degrees(math.acos(max(-1.0, min(1.0, cos_angle))))
+
+
+class LatencyMonitor:
+    # 在线统计跟踪链路各环节延迟；机械延迟由命令写入时刻与 GetAngle 反馈到位时刻之差得到
+
+    def __init__(self, smoothing: float = 0.2, tolerance: float = 0.2,
+                 max_lead: float = 2.0, command_timeout: float = 10.0):
+        self.smoothing = smoothing  # 平均值的指数平滑系数
+        self.tolerance = tolerance  # 反馈角度与命令角度相差不超过该值视为到位(°)
+        self.max_lead = max_lead  # 超前补偿上限(s)
+        self.command_timeout = command_timeout  # 超过该时间仍未到位的命令不再等待(s)
+
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._expected = OrderedDict()  # 已提交未写入的命令 -> 目标角度
+        self._pending = deque(maxlen=64)  # 已写入未到位的命令 (写入时刻, 方位, 仰角)
+        self._last_feedback_time = None
+        self._last_reached = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {stage: self._new_stat() for stage in STAGES}
+            self._expected.clear()
+            self._pending.clear()
+            self._last_feedback_time = None
+            self._last_reached = None
+
+    @staticmethod
+    def _new_stat() -> Dict[str, Optional[float]]:
+        return {'last': None, 'average': None, 'max': 0.0, 'count': 0}
+
+    def record(self, stage: str, seconds: float):
+        seconds = max(0.0, seconds)
+        with self._lock:
+            stat = self._stats.setdefault(stage, self._new_stat())
+            stat['last'] = seconds
+            if stat['average'] is None:
+                stat['average'] = seconds
+            else:
+                stat['average'] += self.smoothing * (seconds - stat['average'])
+            stat['max'] = max(stat['max'], seconds)
+            stat['count'] += 1
+
+    def expect_command(self, command_bytes: bytes, azimuth: float, elevation: float):
+        # 主线程提交跟踪命令前登记其目标角度
+        with self._lock:
+            self._expected[command_bytes] = (azimuth, elevation)
+            self._expected.move_to_end(command_bytes)
+            while len(self._expected) > 16:
+                self._expected.popitem(last=False)
+
+    def command_written(self, command_bytes: bytes, queued_time: float,
+                        write_start: float, write_end: float):
+        # 串口线程写入命令后调用
+        self.record('queue', write_start - queued_time)
+        self.record('write', write_end - write_start)
+
+        with self._lock:
+            target = self._expected.pop(command_bytes, None)
+            if target is not None:
+                self._pending.append((write_end,) + target)
+
+    def feedback(self, azimuth: float, elevation: float,
+                 timestamp: Optional[float] = None) -> Optional[float]:
+        # 云台角度反馈；返回更新后的机械延迟估计，没有命令到位时返回 None
+        now = timestamp or time.time()
+
+        with self._lock:
+            previous = self._last_feedback_time
+            self._last_feedback_time = now
+
+            while self._pending and now - self._pending[0][0] > self.command_timeout:
+                self._pending.popleft()
+
+            # 跟踪命令彼此相距很近，取离反馈角度最近的命令作为已到位的命令；
+            # 云台仍停在上一条已到位命令处时不算新命令到位
+            reached = None
+            best = self.tolerance
+            if self._last_reached is not None:
+                best = min(best, _angular_distance(azimuth, elevation, *self._last_reached))
+            for index, (written, az, el) in enumerate(self._pending):
+                if written > now:
+                    break
+                distance = _angular_distance(azimuth, elevation, az, el)
+                if distance < best:
+                    reached = index
+                    best = distance
+
+            if reached is None:
+                return None
+
+            # 更早的命令已被覆盖，不会再单独到位
+            written = self._pending[reached][0]
+            self._last_reached = self._pending[reached][1:]
+            for _ in range(reached + 1):
+                self._pending.popleft()
+
+            current = self._stats['mechanical']['average']
+
+        # 到位发生在上一次反馈（或命令写入）与本次反馈之间，只能得到延迟所在的区间；
+        # 估计值落在区间内时保持不变，否则拉回区间边界，避免查询周期带来的偏差
+        low = (written if previous is None else max(previous, written)) - written
+        high = now - written
+        if current is None:
+            lag = (low + high) / 2
+        else:
+            lag = min(high, max(low, current))
+
+        self.record('mechanical', lag)
+        return lag
+
+    def average(self, stage: str) -> float:
+        with self._lock:
+            stat = self._stats.get(stage)
+            if not stat or stat['average'] is None:
+                return 0.0
+            return stat['average']
+
+    def lead_time(self, stages: Sequence[str] = LEAD_STAGES) -> float:
+        lead = sum(self.average(stage) for stage in stages)
+        return min(self.max_lead, max(0.0, lead))
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        with self._lock:
+            return {stage: dict(stat) for stage, stat in self._stats.items()}
+
+    def format_report(self) -> str:
+        def ms(value):
+            return "   N/A" if value is None else f"{value * 1000:6.1f}"
+
+        lines = ["延迟统计(ms)    最近    平均    最大   次数"]
+        for stage, stat in self.snapshot().items():
+            name = STAGES.get(stage, stage)
+            lines.append(f"{name:<10}{ms(stat['last'])}  {ms(stat['average'])}  "
+                         f"{ms(stat['max'] if stat['count'] else None)}  {stat['count']:5d}")
+        lines.append(f"超前补偿: {self.lead_time() * 1000:.1f}ms")
+        return "\n".join(lines)
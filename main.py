@@ -1,8 +1,18 @@
 import sys
 import time
-import serial
-import serial.tools.list_ports
+
+# --profile-startup 时在导入其他模块之前开始计时
+startup_profiler = None
+if '--profile-startup' in sys.argv:
+    from startup_profile import StartupProfiler
+    startup_profiler = StartupProfiler()
+    startup_profiler.install()
+
+import argparse
+import importlib
+import threading
 import queue
+from contextlib import nullcontext
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtCore import QTimer, QThread, pyqtSignal
 
@@ -11,15 +21,30 @@ from UI import Ui_MainWindow
 try:
     from MoveControl import MoveControl
     from get_angle import GetAngle
-    from orbitron_module import get_orbitron_data
-    from zenith_tracker import ZenithTracker
+    from orbitron_module import get_orbitron_data, set_orbitron_source, run_orbitron_push
+    from track_predictor import TrackPredictor, sky_angles
+    from latency_monitor import LatencyMonitor
+    from azimuth_wrap import AzimuthWrap
+    from command_dispatcher import CommandDispatcher
+    from closed_loop import ClosedLoopController
+    from bus_scheduler import BusScheduler, follower_angles
+    from port_health import PortHealth
+    from view_state import ViewState
 except ImportError as e:
     print(f"导入模块失败: {e}")
     print("请确保以下模块在同一目录下:")
     print("1. MoveControl.py")
     print("2. get_angle.py")
     print("3. orbitron_module.py")
-    print("4. zenith_tracker.py")
+    print("4. track_predictor.py")
+    print("5. latency_monitor.py")
+    print("6. azimuth_wrap.py")
+    print("7. command_dispatcher.py")
+    print("8. closed_loop.py")
+    print("9. bus_scheduler.py")
+    print("10. port_health.py")
+    print("11. view_state.py")
+    print("天顶图 (zenith_tracker.py / zenith_tracker_qt.py) 在窗口显示后加载，pass_planner.py 在 --pass-plan 时加载")
     sys.exit(1)
 
 
@@ -38,32 +63,90 @@ class SerialWorker(QThread):
         self.is_connected = False
         self.last_query_time = 0
         self.query_interval = 0.38  # 380ms查询间隔
+        self.rx_poll_interval = 0.002  # 等待应答时串口轮询间隔的下限，实际按波特率取一帧的传输时间
+        self.pipelined_query = False  # 水平/垂直查询帧连续发送
+        self.latency_monitor = None  # 记录命令排队与写入耗时
+        self.horizontal_range = (0.0, 360.0)  # 云台水平角（线缆缠绕）范围
+        self.vertical_range = (-90.0, 90.0)  # 云台垂直角范围
+        self.move_speed = (0x20, 0x20)  # 手动转动的水平/垂直速度
+        # 同一总线上跟随主云台的其他云台 [(地址, 水平角度差, 垂直角度差)]，为空时只控制一台
+        self.bus_devices = []
+        self.bus = None
+        self.port_name = None
+        self.health = None  # 多个串口共享的健康统计 (PortHealth)
+
+    def _report_error(self, message):
+        if self.health and self.port_name:
+            self.health.error(self.port_name, message)
+        self.error_occurred.emit(message)
+
+    def _report_command(self, command_bytes, description, queued_time, write_start, write_end):
+        if self.health and self.port_name:
+            self.health.command_written(self.port_name, queued_time, write_start, write_end)
+        self.command_sent.emit(command_bytes, description)
+
+    def _report_feedback(self, result):
+        if self.health and self.port_name:
+            self.health.feedback(self.port_name, result.get('success', False), result.get('timestamp'))
+
+    def _configure_controller(self, controller):
+        controller.set_horizontal_range(*self.horizontal_range)
+        controller.set_vertical_range(*self.vertical_range)
+        controller.set_pan_speed(self.move_speed[0])
+        controller.set_tilt_speed(self.move_speed[1])
 
     def connect_serial(self, port_name, baudrate, address):
         try:
+            import serial
+
             self.serial_port = serial.Serial(
                 port=port_name,
                 baudrate=baudrate,
                 timeout=0.5
             )
 
-            self.move_controller = MoveControl(address=address)
-            self.angle_querier = GetAngle()
-            self.angle_querier.set_serial_port(self.serial_port)
-            self.angle_querier.set_device_address(address)
-            self.angle_querier.set_vertical_angle_mode('auto')
+            self.port_name = port_name
+            if self.health:
+                self.health.register(port_name)
+
+            if self.bus_devices:
+                # 多台云台共用一条总线：命令与查询由 BusScheduler 轮流发出
+                self.bus = BusScheduler(self.serial_port, self.query_interval, self.rx_poll_interval)
+                self.bus.add_device(address)
+                for device_address, h_offset, v_offset in self.bus_devices:
+                    self.bus.add_device(device_address, (h_offset, v_offset))
+                for device in self.bus.devices:
+                    self._configure_controller(device.move_controller)
+                self.move_controller = self.bus.devices[0].move_controller
+                self.angle_querier = self.bus.devices[0].angle_querier
+            else:
+                self.move_controller = MoveControl(address=address)
+                self._configure_controller(self.move_controller)
+                self.angle_querier = GetAngle()
+                self.angle_querier.set_serial_port(self.serial_port)
+                self.angle_querier.set_device_address(address)
+                self.angle_querier.set_vertical_angle_mode('auto')
+                self.angle_querier.set_pipelined(self.pipelined_query)
 
             self.is_connected = True
+            self._wake()
+            if self.bus:
+                addresses = ', '.join(f"0x{device.address:02X}" for device in self.bus.devices)
+                return True, f"已连接到串口: {port_name} @ {baudrate}bps, 总线云台: {addresses}"
             return True, f"已连接到串口: {port_name} @ {baudrate}bps"
 
         except Exception as e:
+            self.bus = None
             return False, f"串口连接失败: {e}"
 
     def disconnect_serial(self):
         self.is_connected = False
         if self.serial_port:
             try:
-                if self.move_controller:
+                if self.bus:
+                    self.serial_port.write(b''.join(self.bus.stop_commands()))
+                    time.sleep(0.1)
+                elif self.move_controller:
                     stop_cmd = self.move_controller.stop()
                     self.serial_port.write(stop_cmd)
                     time.sleep(0.1)
@@ -71,87 +154,252 @@ class SerialWorker(QThread):
                 self.serial_port.close()
                 self.serial_port = None
             except Exception as e:
-                self.error_occurred.emit(f"关闭串口时出错: {e}")
+                self._report_error(f"关闭串口时出错: {e}")
 
         self.move_controller = None
         self.angle_querier = None
+        self.bus = None
 
-    def send_command(self, command_bytes, description=""):
+    def send_command(self, command_bytes, description="", replace=False):
+        # replace: 总线模式下该命令尚未发出时可被同一云台的新命令替换（跟踪命令）
         if self.is_connected:
-            self.command_queue.put((command_bytes, description))
+            self.command_queue.put((command_bytes, description, time.time(), replace))
+
+    def fan_out(self, horizontal, vertical):
+        # 主云台的跟踪角度按各自的角度差分发给总线上的其他云台
+        if self.is_connected and self.bus:
+            for command_bytes, description in self.bus.fan_out(horizontal, vertical):
+                self.send_command(command_bytes, description, replace=True)
+
+    def stop_followers(self):
+        if self.is_connected and self.bus:
+            for command_bytes in self.bus.stop_commands()[1:]:
+                self.send_command(command_bytes, f"停止 0x{command_bytes[1]:02X}")
 
     def set_query_interval(self, interval_ms):
         self.query_interval = interval_ms / 1000.0  # 转换为秒
+        if self.bus:
+            self.bus.query_interval = self.query_interval
+        self._wake()
+
+    def set_pipelined_query(self, enabled):
+        self.pipelined_query = bool(enabled)
+        if self.angle_querier:
+            self.angle_querier.set_pipelined(self.pipelined_query)
+
+    def _wake(self):
+        # 空命令只用于唤醒阻塞在队列上的工作线程
+        self.command_queue.put((None, "", 0.0, False))
+
+    def _query_timeout(self):
+        # 查询进行中时等到应答按波特率应到齐的时刻再读串口，之后每隔一帧的传输时间读一次；
+        # 否则等到下一次查询时刻
+        querier = self.angle_querier
+        if not (self.is_connected and querier):
+            return None
+
+        if querier.is_query_active():
+            return querier.time_until_next_event(self.rx_poll_interval)
+
+        return max(0.0, self.last_query_time + self.query_interval - time.time())
+
+    def _service_angle_query(self):
+        querier = self.angle_querier
+        if not (self.is_connected and querier):
+            return
+
+        try:
+            if querier.is_query_active():
+                result = querier.poll()
+                if result:
+                    self._report_feedback(result)
+                    self.angle_data.emit(result)
+            else:
+                current_time = time.time()
+                if current_time - self.last_query_time >= self.query_interval:
+                    self.last_query_time = current_time
+                    querier.begin_query()
+        except Exception as e:
+            querier.cancel_query()
+            self._report_error(f"角度查询失败: {e}")
+
+    def _service_bus(self):
+        bus = self.bus
+        try:
+            item = self.command_queue.get(timeout=bus.time_until_next_event(time.time()))
+            while True:
+                command_bytes, description, queued_time, replace = item
+                if command_bytes is not None and not bus.enqueue(command_bytes, description,
+                                                                 queued_time, replace):
+                    self._report_error(f"总线上没有地址为0x{command_bytes[1]:02X}的云台")
+                item = self.command_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        if not self.running:
+            return
+
+        primary = bus.devices[0]
+        for kind, device, payload in bus.service(time.time()):
+            if kind == 'command':
+                command_bytes, description, queued_time, write_start, write_end = payload
+                if self.latency_monitor and device is primary:
+                    self.latency_monitor.command_written(command_bytes, queued_time,
+                                                         write_start, write_end)
+                self._report_command(command_bytes, description, queued_time, write_start, write_end)
+            elif kind == 'angle':
+                # 跟踪与显示使用主云台的反馈，其余云台的反馈只计入总线统计
+                self._report_feedback(payload)
+                if device is primary:
+                    self.angle_data.emit(payload)
+            else:
+                self._report_error(f"0x{device.address:02X} {payload}")
 
     def run(self):
         while self.running:
             try:
-                current_time = time.time()
+                if self.bus is not None and self.is_connected:
+                    self._service_bus()
+                    continue
 
                 try:
-                    if not self.command_queue.empty():
-                        command_bytes, description = self.command_queue.get_nowait()
-                        if self.serial_port and self.is_connected:
-                            self.serial_port.write(command_bytes)
-                            self.command_sent.emit(command_bytes, description)
+                    command_bytes, description, queued_time, _ = self.command_queue.get(
+                        timeout=self._query_timeout())
+                    if command_bytes is not None and self.serial_port and self.is_connected:
+                        write_start = time.time()
+                        self.serial_port.write(command_bytes)
+                        write_end = time.time()
+                        if self.latency_monitor:
+                            self.latency_monitor.command_written(command_bytes, queued_time,
+                                                                 write_start, write_end)
+                        self._report_command(command_bytes, description, queued_time,
+                                             write_start, write_end)
                 except queue.Empty:
                     pass
 
-                if (self.is_connected and self.angle_querier and
-                        current_time - self.last_query_time >= self.query_interval):
+                if not self.running:
+                    break
 
-                    try:
-                        result = self.angle_querier.query_angles()
-                        if result:
-                            self.angle_data.emit(result)
-                        self.last_query_time = current_time
-                    except Exception as e:
-                        self.error_occurred.emit(f"角度查询失败: {e}")
-
-                time.sleep(0.01)
+                self._service_angle_query()
 
             except Exception as e:
-                self.error_occurred.emit(f"串口工作线程错误: {e}")
+                self._report_error(f"串口工作线程错误: {e}")
                 time.sleep(0.1)
 
     def stop(self):
         self.running = False
+        self._wake()
         self.wait()
 
 
 class OrbitronWorker(QThread):
     data_received = pyqtSignal(dict)
 
-    def __init__(self):
+    def __init__(self, push_mode=False):
         super().__init__()
         self.running = True
         self.query_interval = 1.0  # 1秒查询间隔
+        self.push_mode = push_mode  # 长连接推送，数据随 Orbitron 更新到达
+        self._stop_event = threading.Event()
 
     def set_query_interval(self, interval_ms):
         self.query_interval = interval_ms / 1000.0  # 转换为秒
 
+    def _emit_data(self, data):
+        # Orbitron 输出未变化时不再重复通知界面
+        if data and data.get('changed', True):
+            self.data_received.emit(data)
+
     def run(self):
+        if self.push_mode:
+            try:
+                run_orbitron_push(self._emit_data, self._stop_event)
+            except Exception as e:
+                print(f"Orbitron推送错误: {e}")
+            return
+
         while self.running:
             try:
-                data = get_orbitron_data()
-                if data:
-                    self.data_received.emit(data)
+                self._emit_data(get_orbitron_data())
             except Exception as e:
                 print(f"Orbitron查询错误: {e}")
 
-            time.sleep(self.query_interval)
+            self._stop_event.wait(self.query_interval)
 
     def stop(self):
         self.running = False
+        self._stop_event.set()
         self.wait()
 
 
+class StartupLoader(QThread):
+    # 窗口首次显示后在后台枚举串口、导入天顶图（matplotlib 版本同时导入 NumPy），
+    # 结果通过信号交回界面线程；导入期间界面照常响应
+    ports_found = pyqtSignal(list)  # [(串口名, 说明)]
+    zenith_loaded = pyqtSignal(object)  # 天顶图模块，导入失败时为异常
+
+    def __init__(self, zenith_view='matplotlib', profiler=None):
+        super().__init__()
+        self.zenith_view = zenith_view
+        self.profiler = profiler
+
+    def stage(self, name):
+        return self.profiler.stage(name) if self.profiler else nullcontext()
+
+    def run(self):
+        threading.current_thread().name = 'StartupLoader'
+        with self.stage("查找串口"):
+            self.ports_found.emit(scan_serial_ports())
+
+        module_name = 'zenith_tracker_qt' if self.zenith_view == 'qt' else 'zenith_tracker'
+        try:
+            with self.stage(f"导入 {module_name}"):
+                module = importlib.import_module(module_name)
+        except Exception as e:
+            module = e
+        self.zenith_loaded.emit(module)
+
+
+def scan_serial_ports():
+    # 串口枚举在部分系统上需要上百毫秒，只在后台线程中调用
+    try:
+        import serial.tools.list_ports
+
+        return [(port.name, port.description if port.description else port.name)
+                for port in serial.tools.list_ports.comports()]
+    except Exception as e:
+        print(f"查找串口失败: {e}")
+        return []
+
+
 class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
-    def __init__(self):
+    def __init__(self, orbitron_push=False, predict_rate=0.0, lead_compensation=False,
+                 latency_report=0.0, pass_plan=False, vertical_range=(-90.0, 90.0),
+                 slew_rate=30.0, azimuth_range=(0.0, 360.0), closed_loop=False,
+                 move_speed=(0x20, 0x20), bus_devices=(), extra_ports=(), ui_rate=10.0,
+                 zenith_view='matplotlib', profiler=None, pipelined_query=False):
         super().__init__()
-        self.setupUi(self)
+        self.profiler = profiler  # --profile-startup 时记录各初始化阶段
+        with self.profile_stage("setupUi"):
+            self.setupUi(self)
+
+        self.orbitron_push = orbitron_push
+        self.predict_rate = predict_rate
+        self.lead_compensation = lead_compensation  # 按实测链路延迟超前指向
+        self.pass_plan = pass_plan  # 入境前规划跟踪模式与天顶附近的方位转动
+        self.vertical_range = vertical_range
+        self.azimuth_range = azimuth_range
+        self.closed_loop = closed_loop  # 按角度反馈发变速转动命令修正指向
+        self.move_speed = move_speed  # 手动转动的水平/垂直速度
+        self.pipelined_query = pipelined_query  # 水平/垂直角度查询帧连续发送
+        self.bus_devices = list(bus_devices)  # 同一总线上跟随主云台的云台 [(地址, 水平角度差, 垂直角度差)]
+        # 其他串口上各自独立的云台 [(串口, 波特率, 地址, 水平角度差, 垂直角度差)]，每个串口一个工作线程
+        self.extra_ports = list(extra_ports)
+        self.zenith_view = zenith_view  # 天顶图实现: matplotlib / qt
 
         self.serial_worker = None
+        self.extra_workers = []
+        self.health = PortHealth()
         self.orbitron_worker = None
         self.tracker = None
         self.is_tracking = False
@@ -162,30 +410,100 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
 
         self.last_satellite_azimuth = None
         self.last_satellite_elevation = None
-
-        self.command_lock = False
-        self.command_lock_timer = QTimer()
-        self.command_lock_timer.timeout.connect(self.release_command_lock)
-
+        self.last_orbitron_data = None
+
+        # 换星或卫星升起时开始新的过境，天顶图轨迹清空
+        self.pass_satellite = None
+        self.pass_visible = False
+        self.pass_count = 0
+
+        # 两次 Orbitron 采样之间按 predict_rate 外推目标角度，0 表示直接使用采样值
+        self.predictor = TrackPredictor()
+        self.prediction_timer = QTimer()
+        self.prediction_timer.timeout.connect(self.update_prediction)
+
+        self.latency = LatencyMonitor()
+        self.latency_report_timer = QTimer()
+        self.latency_report_timer.timeout.connect(self.print_latency_report)
+        if latency_report > 0:
+            self.latency_report_timer.start(int(latency_report * 1000))
+
+        # 过境规划依赖 NumPy，只在 --pass-plan 时创建
+        self.pass_planner = None
+        if pass_plan:
+            from pass_planner import PassPlanner
+            self.pass_planner = PassPlanner(azimuth_range=azimuth_range, vertical_range=vertical_range,
+                                            slew_rate=slew_rate)
+
+        # 水平角累计位置，在线缆缠绕范围内按最短路径选择命令角度
+        self.azimuth_wrap = AzimuthWrap(azimuth_range)
+        self.pass_plan_mode = None
+
+        # 跟踪命令按目标角速度与云台转速调度，间隔未到时只保留最新目标，到时再发出
+        self.dispatcher = CommandDispatcher(slew_rate=slew_rate)
+        self.last_tracking_command = None  # 最近一次跟踪命令的说明，在定时报告中打印
+        self.dispatch_timer = QTimer()
+        self.dispatch_timer.setSingleShot(True)
+        self.dispatch_timer.timeout.connect(self.flush_tracking_command)
+
+        # 闭环跟踪：有角度反馈时每50ms比较目标与推算位置，没有反馈时仍按上面的开环方式发送
+        self.controller = ClosedLoopController(max_rate=slew_rate)
+        self.control_timer = QTimer()
+        self.control_timer.timeout.connect(self.update_closed_loop)
+
+        # 信号处理函数只把最新值写入 view，界面定时器按 ui_rate 把变化的值更新到控件和天顶图，
+        # 角度查询、Orbitron 数据再频繁也不会增加界面线程的重绘次数
+        self.view = ViewState()
         self.ui_update_timer = QTimer()
         self.ui_update_timer.timeout.connect(self.update_ui_status)
-        self.ui_update_timer.start(100)
+        self.ui_update_timer.start(max(1, int(1000 / ui_rate)))
 
-        self.setup_fonts()
+        # 窗口首次绘制后才在后台线程中枚举串口、导入天顶图与 NumPy，完成前天顶图区域为空
+        self.startup_loader = None
+        self.first_painted = False
 
-        self.init_ui()
+        with self.profile_stage("初始化控件"):
+            self.setup_fonts()
 
-        self.init_zenith_tracker()
+            self.init_ui()
 
-        self.init_new_controls()
+            self.init_new_controls()
 
-        self.start_workers()
+        with self.profile_stage("启动工作线程"):
+            self.start_workers()
 
         self.connect_signals()
 
         self.update_connection_status(False)
         self.update_tracking_status("未跟踪")
 
+    def profile_stage(self, name):
+        return self.profiler.stage(name) if self.profiler else nullcontext()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_painted:
+            self.first_painted = True
+            if self.profiler:
+                self.profiler.event("窗口首次绘制")
+            # 等这一帧画完再开始后台加载
+            QTimer.singleShot(0, self.start_deferred_loads)
+
+    def start_deferred_loads(self):
+        if self.startup_loader is not None:
+            return
+        self.startup_loader = StartupLoader(self.zenith_view, self.profiler)
+        self.startup_loader.ports_found.connect(self.update_serial_ports)
+        self.startup_loader.zenith_loaded.connect(self.init_zenith_tracker)
+        self.startup_loader.finished.connect(self.handle_deferred_loads_finished)
+        self.startup_loader.start()
+
+    def handle_deferred_loads_finished(self):
+        if self.profiler:
+            self.profiler.event("后台加载完成")
+            self.profiler.uninstall()
+            print(self.profiler.format_report())
+
     def setup_fonts(self):
         font = QtGui.QFont("幼圆")
 
@@ -248,15 +566,17 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
                 interval = 5000
                 self.angle_cycle.setText("5000")
 
-            if self.serial_worker:
-                self.serial_worker.set_query_interval(interval)
+            for worker in [self.serial_worker] + self.extra_workers:
+                if worker:
+                    worker.set_query_interval(interval)
 
             print(f"角度查询周期已更新: {interval}ms")
 
         except ValueError:
             self.angle_cycle.setText("380")  # 重置为默认值
-            if self.serial_worker:
-                self.serial_worker.set_query_interval(380)
+            for worker in [self.serial_worker] + self.extra_workers:
+                if worker:
+                    worker.set_query_interval(380)
 
     def update_task_cycle(self):
         try:
@@ -284,28 +604,53 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
         if enabled:
             print("角度查询已启用")
         else:
-            self.H.setText("N/A")
-            self.D.setText("N/A")
-            self.TX.setText("N/A")
-            self.RX.setText("N/A")
+            for key in ('H', 'D', 'TX', 'RX'):
+                self.view.set(key, None)
             print("角度查询已禁用")
 
-    def init_zenith_tracker(self):
+    def init_zenith_tracker(self, module):
+        # module 为 StartupLoader 在后台导入的天顶图模块（qt 版本不加载 matplotlib 与 NumPy），
+        # 控件必须在界面线程中创建
         try:
-            self.tracker = ZenithTracker(self.star_plot)
-            self.tracker.set_satellite_position(0, 45)
-            self.tracker.set_tracker_angle(0, 45)
+            if isinstance(module, Exception):
+                raise module
+            with self.profile_stage("创建天顶图"):
+                self.tracker = module.ZenithTracker(self.star_plot)
+                self.tracker.set_satellite_position(0, 45)
+                self.tracker.set_tracker_angle(0, 45)
+            # 加载期间收到的位置在下一帧补画
+            self.view.invalidate('satellite')
+            self.view.invalidate('tracker')
         except Exception as e:
             print(f"初始化天顶图失败: {e}")
 
+    def create_serial_worker(self):
+        worker = SerialWorker()
+        worker.horizontal_range = self.azimuth_range
+        worker.vertical_range = self.vertical_range
+        worker.move_speed = self.move_speed
+        worker.set_pipelined_query(self.pipelined_query)
+        worker.health = self.health
+        return worker
+
     def start_workers(self):
-        self.serial_worker = SerialWorker()
+        self.serial_worker = self.create_serial_worker()
+        self.serial_worker.latency_monitor = self.latency
+        self.serial_worker.bus_devices = self.bus_devices
         self.serial_worker.command_sent.connect(self.handle_command_sent)
         self.serial_worker.angle_data.connect(self.handle_angle_data)
         self.serial_worker.error_occurred.connect(self.handle_serial_error)
         self.serial_worker.start()
 
-        self.orbitron_worker = OrbitronWorker()
+        # 其他串口各用一个工作线程，命令队列与角度查询互不等待；反馈只计入健康统计
+        for port_name, _, _, _, _ in self.extra_ports:
+            worker = self.create_serial_worker()
+            worker.error_occurred.connect(
+                lambda error_msg, port_name=port_name: self.handle_serial_error(f"{port_name} {error_msg}"))
+            worker.start()
+            self.extra_workers.append(worker)
+
+        self.orbitron_worker = OrbitronWorker(push_mode=self.orbitron_push)
         self.orbitron_worker.data_received.connect(self.handle_orbitron_data)
         self.orbitron_worker.start()
 
@@ -329,13 +674,16 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
         self.track_c.clicked.connect(self.toggle_tracking)
 
     def refresh_serial_ports(self):
+        # 串口列表由 StartupLoader 在后台枚举后通过 update_serial_ports 填入
+        self.ser_list.clear()
+        self.ser_list.addItem("正在查找串口...", "")
+
+    def update_serial_ports(self, ports):
         self.ser_list.clear()
-        ports = serial.tools.list_ports.comports()
 
-        for port in ports:
-            description = port.description if port.description else port.name
-            display_text = f"{port.name} - {description}"
-            self.ser_list.addItem(display_text, port.name)
+        for name, description in ports:
+            display_text = f"{name} - {description}"
+            self.ser_list.addItem(display_text, name)
 
         if len(ports) == 0:
             self.ser_list.addItem("未发现串口", "")
@@ -367,9 +715,16 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
             self.address.setEnabled(False)
 
             print(message)
+            self.connect_extra_ports()
         else:
             QtWidgets.QMessageBox.critical(self, "连接失败", f"无法连接串口:\n{message}")
 
+    def connect_extra_ports(self):
+        # 其他串口连接失败时只打印，不影响主串口
+        for worker, (port_name, baudrate, address, _, _) in zip(self.extra_workers, self.extra_ports):
+            success, message = worker.connect_serial(port_name, baudrate, address)
+            print(message if success else f"{port_name} {message}")
+
     def disconnect_serial(self):
         if self.is_tracking:
             self.stop_tracking()
@@ -378,6 +733,9 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
             self.stop_move()
 
         self.serial_worker.disconnect_serial()
+        for worker in self.extra_workers:
+            if worker.is_connected:
+                worker.disconnect_serial()
         self.is_connected = False
         self.update_connection_status(False)
         self.set_control_enabled(False)
@@ -396,6 +754,8 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
             self.ser_con.setText("打开串口")
             self.status_text.setText("未连接")
             self.status_color.setStyleSheet("border-radius: 50%; background-color: rgb(128, 128, 128);")
+            # 下一次跟踪状态写入时重新显示
+            self.view.invalidate('status')
 
     def set_control_enabled(self, enabled):
         self.up.setEnabled(enabled and not self.is_tracking)
@@ -410,21 +770,9 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
 
         self.track_c.setEnabled(enabled)
 
-    def acquire_command_lock(self):
-        if self.command_lock:
-            return False
-
-        self.command_lock = True
-        self.command_lock_timer.start(200)
-        return True
-
-    def release_command_lock(self):
-        self.command_lock = False
-        self.command_lock_timer.stop()
-
-    def send_command(self, command_bytes, description=""):
+    def send_command(self, command_bytes, description="", replace=False):
         if self.serial_worker:
-            self.serial_worker.send_command(command_bytes, description)
+            self.serial_worker.send_command(command_bytes, description, replace)
 
     def start_move(self, direction):
         if not self.is_connected or self.is_tracking:
@@ -445,6 +793,8 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
                 command_bytes = command_func()
                 self.send_command(command_bytes, f"移动-{direction}")
                 self.is_moving = True
+                # 手动转动后云台位置以角度反馈为准
+                self.azimuth_wrap.position = None
 
     def stop_move(self):
         if not self.is_connected:
@@ -471,23 +821,24 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
             h_angle = float(h_angle_text)
             d_angle = float(d_angle_text)
 
-            if not (0 <= h_angle <= 360):
-                QtWidgets.QMessageBox.warning(self, "警告", "水平角度必须在0-360度之间")
+            h_low, h_high = self.azimuth_range
+            if not (h_low <= h_angle <= h_high):
+                QtWidgets.QMessageBox.warning(self, "警告", f"水平角度必须在{h_low:g}-{h_high:g}度之间")
                 return
 
-            if not (-90 <= d_angle <= 90):
-                QtWidgets.QMessageBox.warning(self, "警告", "垂直角度必须在-90到90度之间")
+            v_low, v_high = self.vertical_range
+            if not (v_low <= d_angle <= v_high):
+                QtWidgets.QMessageBox.warning(self, "警告", f"垂直角度必须在{v_low:g}-{v_high:g}度之间")
                 return
 
             if self.serial_worker.move_controller:
-                stop_cmd = self.serial_worker.move_controller.stop()
-                self.send_command(stop_cmd, "停止移动")
-
-            h_cmd = self.serial_worker.move_controller.set_horizontal_angle(h_angle)
-            self.send_command(h_cmd, f"设置水平角 {h_angle}°")
-
-            d_cmd = self.serial_worker.move_controller.set_vertical_angle(d_angle)
-            self.send_command(d_cmd, f"设置垂直角 {d_angle}°")
+                batch = self.serial_worker.move_controller.build_batch([
+                    ('stop',),
+                    ('horizontal', h_angle),
+                    ('vertical', d_angle),
+                ])
+                self.send_command(batch, f"设置角度 水平{h_angle}° 垂直{d_angle}°")
+                self.azimuth_wrap.commit(h_angle)
 
             self.h_in.clear()
             self.d_in.clear()
@@ -515,22 +866,52 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
 
         self.last_satellite_azimuth = None
         self.last_satellite_elevation = None
+        self.dispatcher.reset()
+        self.last_tracking_command = None
+        self.controller.reset()
+        if self.serial_worker and self.serial_worker.bus:
+            self.serial_worker.bus.reset_stats()
+        self.health.reset()
+        self.view.reset_stats()
 
         self.set_control_enabled(True)
 
         print("开始卫星跟踪，手动控制已禁用")
 
+        if self.predict_rate > 0:
+            self.prediction_timer.start(max(1, int(1000 / self.predict_rate)))
+        if self.closed_loop:
+            self.control_timer.start(50)
+
+        # 重复数据不会再次送达，用最近一次的数据立即发出首个跟踪命令
+        if self.last_orbitron_data:
+            self.handle_orbitron_data(self.last_orbitron_data)
+
     def stop_tracking(self):
         self.is_tracking = False
         self.track_c.setText("开始跟踪")
 
+        self.prediction_timer.stop()
+        self.dispatch_timer.stop()
+        self.control_timer.stop()
+
         self.set_control_enabled(True)
 
         if self.serial_worker and self.serial_worker.move_controller:
             stop_cmd = self.serial_worker.move_controller.stop()
             self.send_command(stop_cmd, "停止跟踪")
+            self.serial_worker.stop_followers()
+        for worker in self.extra_workers:
+            if worker.is_connected and worker.move_controller:
+                worker.send_command(worker.move_controller.stop(), "停止跟踪")
 
         print("停止卫星跟踪，手动控制已启用")
+        if self.dispatcher.stats['submitted']:
+            print(self.dispatcher.format_report())
+        if self.closed_loop:
+            print(self.controller.format_report())
+        print(self.view.format_report())
+        self.print_latency_report()
 
     def update_tracking_status(self, status):
         status_map = {
@@ -564,11 +945,37 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
             print(f"角度差输入无效，使用默认值0")
             return azimuth, elevation
 
+    def apply_pass_plan(self, azimuth, elevation):
+        # 先从实际方位/仰角中减去角度差再换算为云台角度：翻转姿态下垂直角为 180-仰角，
+        # 仰角差在云台垂直角上是反向的，不能在规划结果上直接相减
+        try:
+            azimuth -= float(self.h_delta.text())
+            elevation -= float(self.d_delta.text())
+        except ValueError:
+            print(f"角度差输入无效，使用默认值0")
+
+        horizontal, vertical = self.pass_planner.command_angles(time.time(), azimuth, elevation)
+
+        # 规划已按水平角范围选好圈数，扣除角度差后越界时再按最短路径选择
+        horizontal = round(horizontal, 2)
+        if not self.azimuth_wrap.contains(horizontal):
+            horizontal = self.azimuth_wrap.resolve(horizontal)
+
+        low, high = self.vertical_range
+        return horizontal, round(max(low, min(high, vertical)), 2)
+
     def handle_command_sent(self, command_bytes, description):
-        tx_hex = ' '.join([f'{b:02X}' for b in command_bytes])
-        self.TX.setText(tx_hex)
+        self.view.set('TX', command_bytes)
 
     def handle_angle_data(self, result):
+        if result and result.get('success'):
+            self.latency.feedback(result['horizontal_angle'], result['vertical_angle'],
+                                  result.get('timestamp'))
+            self.azimuth_wrap.observe(result['horizontal_angle'])
+            feedback_time = result.get('timestamp') or time.time()
+            self.dispatcher.observe(feedback_time, result['horizontal_angle'], result['vertical_angle'])
+            self.controller.observe(feedback_time, result['horizontal_angle'], result['vertical_angle'])
+
         if self.angle_if.currentText() != "是":
             return
 
@@ -576,101 +983,254 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
             h_angle = result.get('horizontal_angle', 0)
             d_angle = result.get('vertical_angle', 0)
 
-            self.H.setText(f"{h_angle:.1f}")
-            self.D.setText(f"{d_angle:.1f}")
+            # 按显示精度记录，精度以内的变化不触发重绘
+            self.view.set('H', round(h_angle, 1))
+            self.view.set('D', round(d_angle, 1))
 
             if 'tx_horizontal' in result and result['tx_horizontal']:
-                tx_hex = ' '.join([f'{b:02X}' for b in result['tx_horizontal']])
-                self.TX.setText(tx_hex)
+                self.view.set('TX', bytes(result['tx_horizontal']))
 
             if 'rx_horizontal' in result and result['rx_horizontal']:
-                rx_hex = ' '.join([f'{b:02X}' for b in result['rx_horizontal']])
-                self.RX.setText(rx_hex)
+                self.view.set('RX', bytes(result['rx_horizontal']))
 
-            if self.tracker:
-                self.tracker.set_tracker_angle(h_angle, d_angle)
+            # 垂直角超过90°时云台处于翻转姿态，转换为实际指向再显示
+            azimuth, elevation = sky_angles(h_angle, d_angle)
+            self.view.set('tracker', (round(azimuth, 1), round(elevation, 1)))
 
     def handle_orbitron_data(self, data):
+        self.last_orbitron_data = data
+
+        if data and 'read_duration' in data:
+            self.latency.record('orbitron', data['read_duration'])
+            self.latency.record('signal', time.time() - data['timestamp'] - data['read_duration'])
+
         if data and data.get('status') == 'tracking':
             satellite = data.get('satellite', 'N/A')
             azimuth = data.get('azimuth', 0)
             elevation = data.get('elevation', 0)
 
-            self.track_name.setText(satellite)
-            self.track_h.setText(f"{azimuth:.1f}")
-            self.track_d.setText(f"{elevation:.1f}")
+            visible = elevation >= 0
+            if satellite != self.pass_satellite or (visible and not self.pass_visible):
+                self.pass_count += 1
+                self.view.set('pass', self.pass_count)
+            self.pass_satellite = satellite
+            self.pass_visible = visible
 
-            azimuth_with_delta, elevation_with_delta = self.apply_angle_delta(azimuth, elevation)
+            self.view.set('track_name', satellite)
+            self.view.set('track_h', round(azimuth, 1))
+            self.view.set('track_d', round(elevation, 1))
+            self.view.set('satellite', (round(azimuth, 1), round(elevation, 1)))
 
-            if self.tracker:
-                self.tracker.set_satellite_position(azimuth, elevation)
+            azimuth_with_delta, elevation_with_delta = self.apply_angle_delta(azimuth, elevation)
 
             if elevation < 0:
                 status = "已落下"
+                self.predictor.reset()
                 if self.is_tracking:
                     self.stop_tracking()
             else:
                 status = "跟踪中" if self.is_tracking else "未跟踪"
+                self.predictor.add_sample(azimuth, elevation,
+                                          data.get('timestamp') or time.time(), satellite)
 
-            self.update_tracking_status(status)
+            if self.pass_plan:
+                self.update_pass_plan(data)
+
+            self.view.set('status', status)
 
             if self.is_tracking and elevation >= 0 and self.serial_worker and self.serial_worker.move_controller:
-                self.send_tracking_commands(azimuth, elevation)
+                if self.prediction_timer.isActive() or self.lead_compensation:
+                    self.update_prediction()
+                else:
+                    self.send_tracking_commands(azimuth, elevation)
 
         else:
-            self.track_name.setText("N/A")
-            self.track_h.setText("N/A")
-            self.track_d.setText("N/A")
-            self.update_tracking_status("未跟踪")
+            for key in ('track_name', 'track_h', 'track_d'):
+                self.view.set(key, None)
+            self.view.set('status', "未跟踪")
+            self.predictor.reset()
+            if self.pass_planner:
+                self.pass_planner.reset()
+            self.pass_plan_mode = None
+
+    def update_pass_plan(self, data):
+        # 入境前的负仰角采样同样用于外推整段过境
+        self.pass_planner.azimuth_reference = self.azimuth_wrap.reference()
+        plan = self.pass_planner.add_sample(data.get('azimuth', 0), data.get('elevation', 0),
+                                            data.get('timestamp') or time.time(),
+                                            data.get('satellite'), data.get('range'))
+        mode = plan.mode if plan else None
+        if mode != self.pass_plan_mode:
+            self.pass_plan_mode = mode
+            if plan:
+                print(f"过境规划: {plan.describe()}")
+
+    def update_prediction(self):
+        if not self.is_tracking or not self.serial_worker or not self.serial_worker.move_controller:
+            return
+
+        # 超前补偿：指向命令写入并由云台到位时卫星所在的位置
+        target_time = time.time()
+        if self.lead_compensation:
+            target_time += self.latency.lead_time()
+
+        predicted = self.predictor.predict(target_time)
+        if predicted is None:
+            return
+
+        azimuth, elevation = predicted
+        # 外推值在过境末端可能略低于地平线，落下判断仍以 Orbitron 数据为准
+        self.send_tracking_commands(round(azimuth, 2), round(max(elevation, 0.0), 2))
 
     def send_tracking_commands(self, azimuth, elevation):
         if not self.is_connected or not self.serial_worker.move_controller:
             return
 
-        azimuth_with_delta, elevation_with_delta = self.apply_angle_delta(azimuth, elevation)
+        if self.pass_plan:
+            azimuth_with_delta, elevation_with_delta = self.apply_pass_plan(azimuth, elevation)
+        else:
+            azimuth_with_delta, elevation_with_delta = self.apply_angle_delta(azimuth, elevation)
+            # 359.9°->0.1° 不再被当作整圈转动；线缆缠绕范围允许时沿最短路径跨过正北
+            azimuth_with_delta = self.azimuth_wrap.resolve(azimuth_with_delta)
+
+        try:
+            resolution = float(self.angle_resolution.text())
+            if resolution <= 0:
+                resolution = 0.1
+        except ValueError:
+            resolution = 0.1
+        self.dispatcher.resolution = resolution
 
-        position_changed = False
+        self.last_satellite_azimuth = azimuth
+        self.last_satellite_elevation = elevation
 
-        if (self.last_satellite_azimuth is None or
-                self.last_satellite_elevation is None):
-            position_changed = True
-        else:
-            az_diff = abs(azimuth_with_delta - self.last_satellite_azimuth)
-            el_diff = abs(elevation_with_delta - self.last_satellite_elevation)
+        now = time.time()
+        if self.closed_loop:
+            self.controller.set_target(now, azimuth_with_delta, elevation_with_delta)
+            if self.controller.has_feedback(now):
+                self.update_closed_loop()
+                return
 
-            try:
-                threshold = float(self.angle_resolution.text())
-                if threshold <= 0:
-                    threshold = 0.1
-            except ValueError:
-                threshold = 0.1
+        target = self.dispatcher.submit(now, azimuth_with_delta, elevation_with_delta)
+        if target is not None:
+            self.dispatch_tracking_command(*target)
+        else:
+            self.schedule_tracking_flush()
 
-            if (az_diff > threshold or el_diff > threshold):
-                position_changed = True
+    def schedule_tracking_flush(self):
+        due = self.dispatcher.next_due(time.time())
+        if due is not None and not self.dispatch_timer.isActive():
+            self.dispatch_timer.start(int(due * 1000) + 1)
 
-        if position_changed:
-            self.last_satellite_azimuth = azimuth_with_delta
-            self.last_satellite_elevation = elevation_with_delta
+    def flush_tracking_command(self):
+        if not self.is_tracking or not self.is_connected or not self.serial_worker.move_controller:
+            return
 
-            if self.acquire_command_lock():
+        target = self.dispatcher.poll(time.time())
+        if target is not None:
+            self.dispatch_tracking_command(*target)
+        else:
+            self.schedule_tracking_flush()
 
-                stop_cmd = self.serial_worker.move_controller.stop()
-                self.send_command(stop_cmd, "停止移动")
+    def update_closed_loop(self):
+        if not self.is_tracking or not self.is_connected or not self.serial_worker.move_controller:
+            return
 
-                h_cmd = self.serial_worker.move_controller.set_horizontal_angle(azimuth_with_delta)
-                self.send_command(h_cmd, f"跟踪水平角 {azimuth}°->{azimuth_with_delta:.1f}°")
+        command = self.controller.update(time.time())
+        if command is None:
+            return
 
-                d_cmd = self.serial_worker.move_controller.set_vertical_angle(elevation_with_delta)
-                self.send_command(d_cmd, f"跟踪垂直角 {elevation}°->{elevation_with_delta:.1f}°")
+        if command[0] == 'absolute':
+            self.dispatch_tracking_command(command[1], command[2])
+            return
 
-                print(f"发送跟踪命令: 方位{azimuth}°->{azimuth_with_delta:.1f}°, "
-                      f"仰角{elevation}°->{elevation_with_delta:.1f}°")
+        pan_speed, tilt_speed = command[1], command[2]
+        frame = self.serial_worker.move_controller.move(pan_speed, tilt_speed)
+        self.send_command(frame, f"闭环 水平速度{pan_speed:+d} 垂直速度{tilt_speed:+d}", replace=True)
+        # 速度跟踪时云台位置以角度反馈为准
+        self.azimuth_wrap.position = None
+        # 速度修正只针对主云台；其他云台按同一目标发绝对角度
+        self.fan_out(*self.controller.target_at(time.time() + self.controller.dead_time))
+
+    def dispatch_tracking_command(self, horizontal, vertical):
+        # 调度器的超前量可能越过限位，发出前再检查一次
+        if not self.azimuth_wrap.contains(horizontal):
+            horizontal = self.azimuth_wrap.resolve(horizontal)
+        low, high = self.vertical_range
+        vertical = max(low, min(high, vertical))
+
+        # 停止+水平+垂直合并为一帧串，两轴在同一次串口写入中启动
+        batch = self.serial_worker.move_controller.build_batch([
+            ('stop',),
+            ('horizontal', horizontal),
+            ('vertical', vertical),
+        ])
+        self.latency.expect_command(batch, horizontal, vertical)
+        self.azimuth_wrap.commit(horizontal)
+
+        azimuth, elevation = self.last_satellite_azimuth, self.last_satellite_elevation
+        # 每条命令都打印会在界面线程中产生大量输出，只记录最近一条，由 print_latency_report 定时汇总
+        self.last_tracking_command = (f"方位{azimuth}°->{horizontal:.1f}° "
+                                      f"仰角{elevation}°->{vertical:.1f}°")
+        self.send_command(batch, f"跟踪 {self.last_tracking_command}", replace=True)
+        self.fan_out(horizontal, vertical)
+
+    def fan_out(self, horizontal, vertical):
+        # 主云台的跟踪角度分发给同一总线与其他串口上的云台
+        self.serial_worker.fan_out(horizontal, vertical)
+        for worker, (_, _, address, h_offset, v_offset) in zip(self.extra_workers, self.extra_ports):
+            controller = worker.move_controller
+            if not worker.is_connected or controller is None:
+                continue
+            h, v = follower_angles(controller, horizontal, vertical, (h_offset, v_offset))
+            batch = controller.build_batch([('stop',), ('horizontal', h), ('vertical', v)])
+            worker.send_command(batch, f"跟踪 {worker.port_name} 水平{h:.1f}° 垂直{v:.1f}°", replace=True)
 
     def handle_serial_error(self, error_msg):
         print(f"串口错误: {error_msg}")
 
     def update_ui_status(self):
-        pass
+        # 每帧只更新上一帧以来变化的控件，天顶图最多重绘一次
+        changes = self.view.take_changes()
+        if not changes:
+            return
+
+        labels = {'H': self.H, 'D': self.D, 'TX': self.TX, 'RX': self.RX,
+                  'track_name': self.track_name, 'track_h': self.track_h, 'track_d': self.track_d}
+        for key, label in labels.items():
+            if key not in changes:
+                continue
+            value = changes[key]
+            if value is None:
+                label.setText("N/A")
+            elif isinstance(value, bytes):
+                label.setText(' '.join([f'{b:02X}' for b in value]))
+            elif isinstance(value, (int, float)):
+                label.setText(f"{value:.1f}")
+            else:
+                label.setText(str(value))
+
+        if 'status' in changes:
+            self.update_tracking_status(changes['status'])
+
+        if self.tracker and 'pass' in changes:
+            self.tracker.clear_trail()
+
+        if self.tracker and ('satellite' in changes or 'tracker' in changes):
+            self.tracker.set_positions(satellite=changes.get('satellite'), tracker=changes.get('tracker'))
+
+    def print_latency_report(self):
+        if self.is_tracking and self.last_tracking_command:
+            print(f"最近一次跟踪命令: {self.last_tracking_command}")
+            print(self.dispatcher.format_report())
+        if self.latency.snapshot()['queue']['count']:
+            print(self.latency.format_report())
+        if self.serial_worker and self.serial_worker.bus:
+            print(self.serial_worker.bus.format_report())
+        if self.extra_workers:
+            print(self.health.format_report())
+        if self.closed_loop and self.is_tracking:
+            print(self.controller.format_report())
 
     def closeEvent(self, event):
         if self.is_tracking:
@@ -679,23 +1239,131 @@ class MainApp(QtWidgets.QMainWindow, Ui_MainWindow):
         if self.serial_worker:
             self.serial_worker.stop()
 
+        for worker in self.extra_workers:
+            if worker.is_connected:
+                worker.disconnect_serial()
+            worker.stop()
+
         if self.orbitron_worker:
             self.orbitron_worker.stop()
 
+        # 导入无法中断，等后台加载结束再退出
+        if self.startup_loader:
+            self.startup_loader.wait()
+
         self.ui_update_timer.stop()
-        self.command_lock_timer.stop()
+        self.dispatch_timer.stop()
+        self.control_timer.stop()
+        self.prediction_timer.stop()
+        self.latency_report_timer.stop()
 
         event.accept()
 
 
-def main():
-    app = QtWidgets.QApplication(sys.argv)
+def parse_bus_device(text):
+    # 地址[:水平角度差:垂直角度差]，如 0x02 或 0x02:1.5:-0.3
+    parts = text.split(':')
+    try:
+        address = int(parts[0], 0)
+        offsets = [float(part) for part in parts[1:]]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的总线云台: {text}")
+    if not 0x01 <= address <= 0xFF or len(offsets) not in (0, 2):
+        raise argparse.ArgumentTypeError(f"无效的总线云台: {text}（格式: 地址[:水平角度差:垂直角度差]）")
+    return (address,) + (tuple(offsets) if offsets else (0.0, 0.0))
+
+
+def parse_extra_port(text):
+    # 串口[,波特率[,地址[,水平角度差,垂直角度差]]]，如 COM4 或 /dev/ttyUSB1,9600,0x01,1.5,-0.3
+    parts = text.split(',')
+    try:
+        baudrate = int(parts[1]) if len(parts) > 1 else 9600
+        address = int(parts[2], 0) if len(parts) > 2 else 0x01
+        offsets = tuple(float(part) for part in parts[3:])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的串口: {text}")
+    if not parts[0] or baudrate <= 0 or not 0x01 <= address <= 0xFF or len(offsets) not in (0, 2):
+        raise argparse.ArgumentTypeError(f"无效的串口: {text}（格式: 串口[,波特率[,地址[,水平角度差,垂直角度差]]]）")
+    return (parts[0], baudrate, address) + (offsets or (0.0, 0.0))
 
-    font = QtGui.QFont("幼圆", 9)
-    app.setFont(font)
 
-    window = MainApp()
-    window.show()
+def main():
+    if startup_profiler:
+        startup_profiler.event("模块导入完成")
+
+    parser = argparse.ArgumentParser(description="PELCO-D 云台卫星跟踪程序")
+    parser.add_argument('--orbitron-source', default=None,
+                        help="Orbitron 数据源: dde / replay:文件[@倍速] / udp:主机:端口 / tcp:主机:端口")
+    parser.add_argument('--orbitron-push', action='store_true',
+                        help="使用长连接推送模式接收 Orbitron 数据（默认按跟踪周期轮询）")
+    parser.add_argument('--predict-rate', type=float, default=0.0, metavar='HZ',
+                        help="在两次 Orbitron 采样之间外推目标角度的频率，如 20；0 为关闭，每次 Orbitron 更新发一次命令（默认 0）")
+    parser.add_argument('--lead-compensation', action='store_true',
+                        help="按实测的串口与机械延迟超前指向卫星的未来位置")
+    parser.add_argument('--latency-report', type=float, default=0.0, metavar='SECONDS',
+                        help="每隔指定秒数打印各环节延迟统计，0 为只在停止跟踪时打印")
+    parser.add_argument('--pass-plan', action='store_true',
+                        help="入境前规划跟踪模式，平滑天顶附近的方位快速转动")
+    parser.add_argument('--vertical-range', type=float, nargs=2, default=(-90.0, 90.0),
+                        metavar=('MIN', 'MAX'),
+                        help="云台垂直角范围，上限180时可翻转/过顶跟踪（默认 -90 90）")
+    parser.add_argument('--azimuth-range', type=float, nargs=2, default=(0.0, 360.0),
+                        metavar=('MIN', 'MAX'),
+                        help="云台水平角（线缆缠绕）范围，如 0 450 可跨过正北而不整圈回绕（默认 0 360）")
+    parser.add_argument('--slew-rate', type=float, default=30.0, metavar='DEG_PER_S',
+                        help="云台转速，用于过境规划、命令调度和闭环跟踪（默认 30）")
+    parser.add_argument('--closed-loop', action='store_true',
+                        help="闭环跟踪：按角度反馈发变速转动命令修正指向，误差大时改用绝对角度")
+    parser.add_argument('--move-speed', type=lambda text: int(text, 0), nargs=2, default=(0x20, 0x20),
+                        metavar=('PAN', 'TILT'),
+                        help="手动转动的水平/垂直速度，0x00-0x3F，水平可为 0xFF 加速（默认 0x20 0x20）")
+    parser.add_argument('--bus-device', type=parse_bus_device, action='append', default=[],
+                        metavar='ADDR[:H:V]',
+                        help="同一 RS-485 总线上跟随主云台的其他云台，可重复指定；H/V 为相对主云台的角度差")
+    parser.add_argument('--extra-port', type=parse_extra_port, action='append', default=[],
+                        metavar='PORT[,BAUD[,ADDR[,H,V]]]',
+                        help="其他串口上独立跟踪的云台，可重复指定，每个串口一个工作线程；H/V 为相对主云台的角度差")
+    parser.add_argument('--pipelined-query', action='store_true',
+                        help="水平/垂直角度查询帧连续发出，按应答命令字分拣，缩短一次角度查询的时间（单云台串口）")
+    parser.add_argument('--ui-rate', type=float, default=10.0, metavar='HZ',
+                        help="界面与天顶图的最高刷新频率，角度查询更频繁时只显示最新值（默认 10）")
+    parser.add_argument('--zenith-view', choices=('matplotlib', 'qt'), default='matplotlib',
+                        help="天顶图实现: matplotlib，或直接用 QPainter 绘制、启动更快占用内存更少的 qt（默认 matplotlib）")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="打印启动各阶段与各模块导入的耗时（天顶图等在窗口显示后于后台加载）")
+    args, qt_args = parser.parse_known_args()
+
+    if not -180 <= args.vertical_range[0] < args.vertical_range[1] <= 180:
+        parser.error("--vertical-range 需满足 -180 <= MIN < MAX <= 180")
+    if not 0 <= args.azimuth_range[0] < args.azimuth_range[1] <= 655.35:
+        parser.error("--azimuth-range 需满足 0 <= MIN < MAX <= 655.35")
+    if not (0x00 <= args.move_speed[0] <= 0x3F or args.move_speed[0] == 0xFF) or \
+            not 0x00 <= args.move_speed[1] <= 0x3F:
+        parser.error("--move-speed 水平速度需在 0x00-0x3F 之间或为 0xFF，垂直速度需在 0x00-0x3F 之间")
+    if args.ui_rate <= 0:
+        parser.error("--ui-rate 需大于 0")
+
+    if args.orbitron_source:
+        set_orbitron_source(args.orbitron_source)
+
+    profile_stage = startup_profiler.stage if startup_profiler else nullcontext
+    with profile_stage("QApplication"):
+        app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+
+        font = QtGui.QFont("幼圆", 9)
+        app.setFont(font)
+
+    with profile_stage("MainApp"):
+        window = MainApp(orbitron_push=args.orbitron_push, predict_rate=args.predict_rate,
+                         lead_compensation=args.lead_compensation,
+                         latency_report=args.latency_report, pass_plan=args.pass_plan,
+                         vertical_range=tuple(args.vertical_range), slew_rate=args.slew_rate,
+                         azimuth_range=tuple(args.azimuth_range), closed_loop=args.closed_loop,
+                         move_speed=tuple(args.move_speed), bus_devices=args.bus_device,
+                         extra_ports=args.extra_port, ui_rate=args.ui_rate, zenith_view=args.zenith_view,
+                         profiler=startup_profiler, pipelined_query=args.pipelined_query)
+    with profile_stage("显示窗口"):
+        window.show()
 
     sys.exit(app.exec_())
 
@@ -1,70 +1,163 @@
+import os
 import sys
 import time
 import re
+import socket
+import queue
+import bisect
 import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Callable, List
-import win32ui
-import dde
+
+
+def _to_int(value: str) -> int:
+    return int(float(value))
+
+
+# Orbitron 按固定顺序输出 TrackingDataEx 字段，整行一次匹配作为快速路径
+_FAST_FIELDS = ("AZ", "EL", "DN", "UP", "RA", "RR", "DM", "UM", "LO", "LA", "AL", "TU", "TL", "AOS")
+_FAST_PATTERN = re.compile(
+    r' *SN"([^"]*)"' + ''.join(rf'(?: +{field}(\S+))?' for field in _FAST_FIELDS) + r' *')
+# Orbitron 的标准输出（AZ 到 UM 齐全、单个空格分隔、没有位置与时间字段）：没有可选分组，
+# 匹配耗时约为上面的1/6，parse_tracking_data_ex 首先尝试它
+_STANDARD_MATCH = re.compile(
+    r'SN"([^"]+)" AZ([^ ]+) EL([^ ]+) DN([^ ]+) UP([^ ]+) RA([^ ]+) RR([^ ]+) DM([^ ]+) UM([^ ]+)').fullmatch
 
 
 class OrbitronParser:
+    # 字段名 -> (结果键, 转换函数, 转换失败时的默认值)；未列出的字段按小写名保存原始字符串
+    _FIELD_TABLE = {
+        "AZ": ("az", float, 0.0),
+        "EL": ("el", float, 0.0),
+        "RA": ("ra", float, 0.0),
+        "RR": ("rr", float, 0.0),
+        "LO": ("lo", float, 0.0),
+        "LA": ("la", float, 0.0),
+        "AL": ("al", float, 0.0),
+        "DN": ("dn_freq", _to_int, 0),
+        "UP": ("up_freq", _to_int, 0),
+        "SN": ("sn", None, None),
+        "UM": ("um", None, None),
+        "DM": ("dm", None, None),
+        "AOS": ("aos", None, None),
+        "TU": ("tu_time", None, None),
+        "TL": ("tl_time", None, None),
+    }
+
     @staticmethod
-    def parse_tracking_data_ex(raw_data: str) -> Dict[str, Any]:
-        if not raw_data or raw_data.strip() == "":
-            return {"status": "no_data", "raw": raw_data}
+    def _store_field(result: Dict[str, Any], field: str, value: str):
+        entry = OrbitronParser._FIELD_TABLE.get(field)
+        if entry is None:
+            field = field.upper()
+            entry = OrbitronParser._FIELD_TABLE.get(field)
+            if entry is None:
+                if field.isalpha():
+                    result[field.lower()] = value
+                return
+
+        key, convert, default = entry
+        if convert is None:
+            result[key] = value
+            return
 
+        try:
+            result[key] = convert(value)
+        except ValueError:
+            result[key] = default
+            result["errors"].append(f"字段 {field} 值转换失败: {value}")
+
+    @staticmethod
+    def _parse_fast(raw_data: str) -> Optional[Dict[str, Any]]:
+        match = _FAST_PATTERN.fullmatch(raw_data)
+        if match is None:
+            return None
+
+        sn, az, el, dn, up, ra, rr, dm, um, lo, la, al, tu, tl, aos = match.groups()
         result = {"status": "tracking", "raw": raw_data, "errors": []}
 
         try:
-            pattern = r'(\w+)(?:"([^"]*)"|([^"\s]+))?'
-            matches = re.findall(pattern, raw_data)
+            if sn:
+                result["sn"] = sn
+            if az:
+                result["az"] = float(az)
+            if el:
+                result["el"] = float(el)
+            if dn:
+                result["dn_freq"] = int(float(dn))
+            if up:
+                result["up_freq"] = int(float(up))
+            if ra:
+                result["ra"] = float(ra)
+            if rr:
+                result["rr"] = float(rr)
+            if dm:
+                result["dm"] = dm
+            if um:
+                result["um"] = um
+            if lo:
+                result["lo"] = float(lo)
+            if la:
+                result["la"] = float(la)
+            if al:
+                result["al"] = float(al)
+            if tu:
+                result["tu_time"] = tu
+            if tl:
+                result["tl_time"] = tl
+            if aos:
+                result["aos"] = aos
+        except ValueError:
+            # 交给逐字段解析生成错误信息
+            return None
 
-            for field, quoted_val, unquoted_val in matches:
-                field = field.upper()
-                value = quoted_val if quoted_val else unquoted_val
+        return result
 
-                if not value:
-                    continue
+    @staticmethod
+    def parse_tracking_data_ex(raw_data: str) -> Dict[str, Any]:
+        if not raw_data:
+            return {"status": "no_data", "raw": raw_data}
 
-                if field in ["AZ", "EL", "RA", "RR", "LO", "LA", "AL"]:
-                    try:
-                        result[field.lower()] = float(value)
-                    except ValueError:
-                        result[field.lower()] = 0.0
-                        result["errors"].append(f"字段 {field} 值转换失败: {value}")
-                elif field in ["DN", "UP"]:
-                    try:
-                        result[field.lower() + "_freq"] = int(float(value))
-                    except ValueError:
-                        result[field.lower() + "_freq"] = 0
-                        result["errors"].append(f"字段 {field} 值转换失败: {value}")
-                elif field in ["SN", "UM", "DM", "AOS"]:
-                    result[field.lower()] = value
-                elif field in ["TU", "TL"]:
-                    result[field.lower() + "_time"] = value
-                else:
-                    result[field.lower()] = value
+        # 标准格式一次匹配后直接组装结果，不经过其他函数调用
+        match = _STANDARD_MATCH(raw_data)
+        if match is not None:
+            sn, az, el, dn, up, ra, rr, dm, um = match.groups()
+            try:
+                return {"status": "tracking", "raw": raw_data, "errors": [], "sn": sn,
+                        "az": float(az), "el": float(el), "dn_freq": int(float(dn)), "up_freq": int(float(up)),
+                        "ra": float(ra), "rr": float(rr), "dm": dm, "um": um}
+            except ValueError:
+                # 数值无法转换时交给逐字段解析生成错误信息
+                pass
+
+        if raw_data.strip() == "":
+            return {"status": "no_data", "raw": raw_data}
 
-            if not result.get("sn") and "SN" in raw_data:
-                sn_match = re.search(r'SN"([^"]+)"', raw_data)
-                if sn_match:
-                    result["sn"] = sn_match.group(1)
+        result = OrbitronParser._parse_fast(raw_data)
+        if result is not None:
+            return result
 
-            if "az" not in result:
-                az_match = re.search(r'AZ([-\d.]+)', raw_data)
-                if az_match:
-                    try:
-                        result["az"] = float(az_match.group(1))
-                    except:
-                        pass
+        result = {"status": "tracking", "raw": raw_data, "errors": []}
+        store = OrbitronParser._store_field
 
-            if "el" not in result:
-                el_match = re.search(r'EL([-\d.]+)', raw_data)
-                if el_match:
-                    try:
-                        result["el"] = float(el_match.group(1))
-                    except:
-                        pass
+        try:
+            # 按引号切分：偶数段为普通字段，奇数段为紧随前一个字段名的引号值
+            parts = raw_data.split('"')
+            for i in range(0, len(parts), 2):
+                words = parts[i].split()
+                quoted = parts[i + 1] if i + 1 < len(parts) else None
+
+                if quoted is not None and words and not parts[i][-1].isspace():
+                    quoted_field = words.pop()
+                else:
+                    quoted_field = None
+
+                for word in words:
+                    cut = 3 if word.startswith("AOS") else 2
+                    if len(word) > cut:
+                        store(result, word[:cut], word[cut:])
+
+                if quoted_field and quoted:
+                    store(result, quoted_field, quoted)
 
         except Exception as e:
             result["status"] = "parse_error"
@@ -103,14 +196,224 @@ class OrbitronParser:
         return result
 
 
-class OrbitronDDE:
+def _tracking_data_from_ex(raw_data_ex: str) -> str:
+    # 非 DDE 数据源只提供 TrackingDataEx，TrackingData 由其去掉引号得到
+    return raw_data_ex.replace('"', '') if raw_data_ex else raw_data_ex
+
+
+class DDESource:
     def __init__(self, service: str = "Orbitron", topic: str = "Tracking"):
         self.service = service
         self.topic = topic
         self.conversation = None
         self.server = None
+
+    def connect(self):
+        # pywin32 的 dde 模块要求先加载 win32ui，均在连接时才导入
+        import win32ui  # noqa: F401
+        import dde
+
+        self.server = dde.CreateServer()
+        server_name = f"OrbitronDataModule_{int(time.time() * 1000)}"
+        self.server.Create(server_name)
+
+        self.conversation = dde.CreateConversation(self.server)
+        self.conversation.ConnectTo(self.service, self.topic)
+
+    def disconnect(self):
+        if self.conversation:
+            self.conversation.Disconnect()
+        self.conversation = None
+        self.server = None
+
+    def request(self, item: str) -> str:
+        return self.conversation.Request(item)
+
+
+class ReplayFileSource:
+    # 回放录制的 TrackingDataEx 文本文件，每行一条；
+    # 行首可带 "时间戳<TAB>" 按原始节奏回放，否则每次请求前进一行
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self._times = []
+        self._lines = []
+        self._index = 0
+        self._start_time = 0.0
+        self._current = ""
+
+    def connect(self):
+        times, lines = [], []
+        with open(self.path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if not line.strip():
+                    continue
+                stamp, sep, text = line.partition("\t")
+                if sep:
+                    times.append(float(stamp))
+                    lines.append(text)
+                else:
+                    lines.append(line)
+
+        if not lines:
+            raise ValueError(f"回放文件为空: {self.path}")
+
+        self._times = times if len(times) == len(lines) else []
+        self._lines = lines
+        self._index = 0
+        self._start_time = time.time()
+
+    def disconnect(self):
+        self._lines = []
+        self._times = []
+
+    def _next_line(self) -> str:
+        lines = self._lines
+        if self._times:
+            t0 = self._times[0]
+            elapsed = (time.time() - self._start_time) * self.speed
+            duration = self._times[-1] - t0
+            if self.loop and duration > 0:
+                elapsed %= duration
+            index = bisect.bisect_right(self._times, t0 + elapsed) - 1
+            return lines[max(0, min(index, len(lines) - 1))]
+
+        line = lines[self._index]
+        if self._index + 1 < len(lines):
+            self._index += 1
+        elif self.loop:
+            self._index = 0
+        return line
+
+    def request(self, item: str) -> str:
+        if item == "TrackingDataEx":
+            self._current = self._next_line()
+            return self._current
+        return _tracking_data_from_ex(self._current)
+
+
+class SocketSource:
+    # 接收本机 UDP 数据报或 TCP 连接上按行发送的 TrackingDataEx 文本，请求时返回最新一条
+    def __init__(self, host: str = "127.0.0.1", port: int = 5555, protocol: str = "udp"):
+        if protocol not in ("udp", "tcp"):
+            raise ValueError(f"不支持的协议: {protocol}")
+
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self._sock = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._latest = ""
+        self._current = ""
+        self._push_callback = None
+
+    def subscribe(self, item: str, callback: Optional[Callable[[str], None]]):
+        # 每收到一行即推送；callback 为 None 时取消订阅
+        if item == "TrackingDataEx":
+            self._push_callback = callback
+
+    def connect(self):
+        if self.protocol == "udp":
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.bind((self.host, self.port))
+        else:
+            self._sock = socket.create_connection((self.host, self.port), timeout=5.0)
+        self._sock.settimeout(0.5)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self._thread.start()
+
+    def disconnect(self):
+        self._stop.set()
+        if self._sock:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        self._sock = None
+        self._thread = None
+
+    def _store_lines(self, data: bytes):
+        for line in reversed(data.decode("utf-8", errors="replace").splitlines()):
+            if line.strip():
+                self._latest = line.strip()
+                callback = self._push_callback
+                if callback is not None:
+                    callback(self._latest)
+                return
+
+    def _receive_loop(self):
+        pending = b""
+        while not self._stop.is_set():
+            try:
+                if self.protocol == "udp":
+                    data, _ = self._sock.recvfrom(4096)
+                    self._store_lines(data)
+                    continue
+
+                data = self._sock.recv(4096)
+                if not data:
+                    break
+                pending += data
+                complete, sep, pending = pending.rpartition(b"\n")
+                if sep:
+                    self._store_lines(complete)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not self._stop.is_set():
+                    print(f"数据源接收失败: {e}")
+                break
+
+    def request(self, item: str) -> str:
+        if item == "TrackingDataEx":
+            self._current = self._latest
+            return self._current
+        return _tracking_data_from_ex(self._current)
+
+
+def create_source(spec: str):
+    # "dde" / "replay:路径[@倍速]" / "udp:主机:端口" / "tcp:主机:端口"
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+
+    if kind == "dde":
+        service, _, topic = arg.partition("/")
+        return DDESource(service or "Orbitron", topic or "Tracking")
+
+    if kind == "replay":
+        path, sep, speed = arg.rpartition("@")
+        if not sep:
+            path, speed = arg, "1"
+        return ReplayFileSource(path, speed=float(speed))
+
+    if kind in ("udp", "tcp"):
+        host, _, port = arg.rpartition(":")
+        return SocketSource(host or "127.0.0.1", int(port), protocol=kind)
+
+    raise ValueError(f"未知的数据源: {spec}")
+
+
+class OrbitronDDE:
+    def __init__(self, service: str = "Orbitron", topic: str = "Tracking",
+                 skip_tracking_data: bool = False, source=None):
+        self.service = service
+        self.topic = topic
+        self.source = source if source is not None else DDESource(service, topic)
         self.parser = OrbitronParser()
         self.is_connected = False
+        self.skip_tracking_data = skip_tracking_data
+
+        # 原始字符串 -> 解析结果的小型 LRU，Orbitron 两次输出相同时直接复用
+        self.parse_cache_size = 16
+        self._parse_cache = OrderedDict()
+        self._last_raw_ex = None
 
         self.current_data = {
             "tracking_data_ex": None,
@@ -128,12 +431,7 @@ class OrbitronDDE:
             if self.is_connected:
                 self.disconnect()
 
-            self.server = dde.CreateServer()
-            server_name = f"OrbitronDataModule_{int(time.time() * 1000)}"
-            self.server.Create(server_name)
-
-            self.conversation = dde.CreateConversation(self.server)
-            self.conversation.ConnectTo(self.service, self.topic)
+            self.source.connect()
             self.is_connected = True
             return True
         except Exception as e:
@@ -143,20 +441,14 @@ class OrbitronDDE:
 
     def disconnect(self):
         try:
-            if self.conversation:
-                self.conversation.Disconnect()
-            if self.server:
-                try:
-                    pass
-                except:
-                    pass
-            self.is_connected = False
-            self.conversation = None
-            self.server = None
+            self.source.disconnect()
         except Exception as e:
             print(f"断开连接时出错: {e}")
+        self.is_connected = False
+        self._last_raw_ex = None
 
-    def read_data(self) -> Dict[str, Any]:
+    def read_data(self, raw_data_ex: Optional[str] = None) -> Dict[str, Any]:
+        # raw_data_ex 为推送模式下已收到的 TrackingDataEx，此时不再发起请求
         if not self.is_connected:
             return {"status": "disconnected", "error": "未连接到 Orbitron"}
 
@@ -168,14 +460,21 @@ class OrbitronDDE:
         }
 
         try:
-            raw_data_ex = self.conversation.Request("TrackingDataEx")
-            parsed_ex = self.parser.parse_tracking_data_ex(raw_data_ex)
+            if raw_data_ex is None:
+                raw_data_ex = self.source.request("TrackingDataEx")
+            parsed_ex = self._parse_cached(raw_data_ex)
             result["tracking_data_ex"] = parsed_ex
+            result["changed"] = raw_data_ex != self._last_raw_ex
+            self._last_raw_ex = raw_data_ex
 
-            raw_data = self.conversation.Request("TrackingData")
-            parsed = self.parser.parse_tracking_data(raw_data)
-            result["tracking_data"] = parsed
+            # TrackingDataEx 已包含方位/仰角时可跳过 TrackingData 的请求与解析
+            if not (self.skip_tracking_data and parsed_ex.get("status") == "tracking"
+                    and "az" in parsed_ex and "el" in parsed_ex):
+                raw_data = self.source.request("TrackingData")
+                parsed = self.parser.parse_tracking_data(raw_data)
+                result["tracking_data"] = parsed
 
+            result["read_duration"] = time.time() - result["timestamp"]
             self.current_data = result.copy()
 
         except Exception as e:
@@ -186,8 +485,23 @@ class OrbitronDDE:
 
         return result
 
-    def get_satellite_info(self) -> Dict[str, Any]:
-        data = self.read_data()
+    def _parse_cached(self, raw_data_ex: str) -> Dict[str, Any]:
+        # 缓存的字典会被多次返回，调用方不应修改
+        cache = self._parse_cache
+        parsed = cache.get(raw_data_ex)
+        if parsed is not None:
+            cache.move_to_end(raw_data_ex)
+            return parsed
+
+        parsed = self.parser.parse_tracking_data_ex(raw_data_ex)
+        cache[raw_data_ex] = parsed
+        if len(cache) > self.parse_cache_size:
+            cache.popitem(last=False)
+        return parsed
+
+    def get_satellite_info(self, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if data is None:
+            data = self.read_data()
 
         if data.get("status") in ["disconnected", "error"]:
             return {"status": "error", "error": data.get("error", "连接或读取错误")}
@@ -200,10 +514,12 @@ class OrbitronDDE:
         elif tracking_data and tracking_data.get("status") == "tracking":
             parsed = tracking_data
         else:
-            return {"status": "no_tracking", "timestamp": data.get("timestamp")}
+            return {"status": "no_tracking", "timestamp": data.get("timestamp"),
+                    "changed": data.get("changed", True)}
 
         info = {
             "status": "tracking",
+            "changed": data.get("changed", True),
             "satellite": parsed.get("sn", "Unknown"),
             "azimuth": parsed.get("az", 0.0),
             "elevation": parsed.get("el", 0.0),
@@ -212,6 +528,8 @@ class OrbitronDDE:
             "timestamp": data.get("timestamp", time.time())
         }
 
+        if "read_duration" in data:
+            info["read_duration"] = data["read_duration"]
         if "ra" in parsed:
             info["range"] = parsed.get("ra", 0.0)
         if "rr" in parsed:
@@ -255,6 +573,55 @@ class OrbitronDDE:
                 print(f"监控循环错误: {e}")
                 time.sleep(interval)
 
+    def push_loop(self, callback: Callable[[Dict[str, Any]], None],
+                  stop_event: threading.Event, poll_interval: float = 0.05):
+        # 长连接推送模式，阻塞运行直到 stop_event 置位。
+        # 数据源支持订阅时由其推送 TrackingDataEx；否则（pywin32 的 DDE 客户端没有 advise）
+        # 在同一会话上以 poll_interval 读取，只在数据变化时回调。
+        # DDE 会话与创建线程绑定，因此连接也在本线程内建立。
+        last_error = None
+
+        while not stop_event.is_set() and not self.is_connected:
+            if self.connect():
+                break
+            if last_error is None:
+                last_error = "无法连接到 Orbitron"
+                callback({"status": "error", "error": last_error})
+            stop_event.wait(1.0)
+
+        subscribe = getattr(self.source, "subscribe", None)
+        pushed = queue.Queue() if subscribe is not None else None
+        if subscribe is not None:
+            subscribe("TrackingDataEx", pushed.put)
+
+        try:
+            while not stop_event.is_set():
+                if pushed is not None:
+                    try:
+                        raw_data_ex = pushed.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    # 只处理积压中最新的一条
+                    while not pushed.empty():
+                        raw_data_ex = pushed.get_nowait()
+                    info = self.get_satellite_info(self.read_data(raw_data_ex))
+                else:
+                    info = self.get_satellite_info()
+
+                if info.get("status") == "error":
+                    if info.get("error") != last_error:
+                        last_error = info.get("error")
+                        callback(info)
+                elif info.get("changed", True):
+                    last_error = None
+                    callback(info)
+
+                if pushed is None:
+                    stop_event.wait(poll_interval)
+        finally:
+            if subscribe is not None:
+                subscribe("TrackingDataEx", None)
+
     def __enter__(self):
         self.connect()
         return self
@@ -268,21 +635,35 @@ class _OrbitronManager:
     _instance = None
     _orbitron_instance = None
     _connection_count = 0
+    _source_spec = os.environ.get("ORBITRON_SOURCE", "dde")
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def get_orbitron(self):
+    def get_orbitron(self, acquire: bool = True):
+        # acquire=False 用于周期性读取：复用同一长连接而不增加引用计数
         if self._orbitron_instance is None:
-            self._orbitron_instance = OrbitronDDE()
+            self._orbitron_instance = OrbitronDDE(source=create_source(self._source_spec))
             if not self._orbitron_instance.connect():
                 self._orbitron_instance = None
                 return None
-        self._connection_count += 1
+        if acquire:
+            self._connection_count += 1
         return self._orbitron_instance
 
+    def get_source_spec(self) -> str:
+        return self._source_spec
+
+    def set_source(self, spec: str):
+        create_source(spec)  # 先校验格式
+        if self._orbitron_instance:
+            self._orbitron_instance.disconnect()
+            self._orbitron_instance = None
+            self._connection_count = 0
+        _OrbitronManager._source_spec = spec
+
     def release_orbitron(self):
         self._connection_count -= 1
         if self._connection_count <= 0 and self._orbitron_instance:
@@ -296,7 +677,7 @@ _orbitron_manager = _OrbitronManager()
 
 def get_orbitron_data() -> Dict[str, Any]:
     try:
-        orbitron = _orbitron_manager.get_orbitron()
+        orbitron = _orbitron_manager.get_orbitron(acquire=False)
         if orbitron is None:
             return {"status": "error", "error": "无法连接到 Orbitron"}
 
@@ -307,6 +688,21 @@ def get_orbitron_data() -> Dict[str, Any]:
         return {"status": "error", "error": str(e)}
 
 
+def set_orbitron_source(spec: str):
+    _orbitron_manager.set_source(spec)
+
+
+def run_orbitron_push(callback: Callable[[Dict[str, Any]], None],
+                      stop_event: threading.Event, poll_interval: float = 0.05):
+    # 在调用线程内建立独立的长连接并推送数据，直到 stop_event 置位
+    orbitron = OrbitronDDE(skip_tracking_data=True,
+                           source=create_source(_orbitron_manager.get_source_spec()))
+    try:
+        orbitron.push_loop(callback, stop_event, poll_interval)
+    finally:
+        orbitron.disconnect()
+
+
 def cleanup_orbitron_connections():
     _orbitron_manager.release_orbitron()
 
@@ -0,0 +1,448 @@
+import math
+from bisect import bisect_left
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# sky_angles 不依赖 NumPy，放在 track_predictor 中供主程序直接导入，这里保留原来的导入路径
+from track_predictor import direction_vector, sky_angles
+
+MODE_NAMES = {
+    'normal': '常规',
+    'flip': '翻转',  # 整个过境使用 方位+180°、垂直角=180°-仰角，避开方位限位
+    'over_the_top': '过顶',  # 水平角保持在过境所在竖直面两侧90°以内，垂直角经天顶从一侧转到另一侧
+}
+
+
+def projected_vertical(azimuth: float, elevation: float, horizontal: float) -> float:
+    # 云台水平角固定为 horizontal 时，离卫星方向最近的垂直角（0~180°）
+    el = math.radians(elevation)
+    return math.degrees(math.atan2(math.sin(el),
+                                   math.cos(el) * math.cos(math.radians(azimuth - horizontal))))
+
+
+def _fit_linear_motion(samples: Sequence[Tuple[float, float, float, Optional[float]]]):
+    # 按匀速直线运动拟合卫星位置 position(t) = a + b * (t - t0)，低轨过境在几分钟内是良好近似
+    # 有距离时直接对位置做最小二乘；没有距离时方向只确定到比例因子，由 d × (a + b·t) = 0 求零空间
+    times = np.array([s[0] for s in samples], dtype=float) - samples[0][0]
+    directions = np.array([direction_vector(s[1], s[2]) for s in samples])
+    ranges = [s[3] for s in samples]
+
+    if all(ranges):
+        positions = directions * np.array(ranges, dtype=float)[:, None]
+        design = np.column_stack([np.ones_like(times), times])
+        coef, *_ = np.linalg.lstsq(design, positions, rcond=None)
+        return coef[0], coef[1]
+
+    if len(samples) < 3:
+        return None
+
+    rows = []
+    for t, (x, y, z) in zip(times, directions):
+        cross = np.array([[0.0, -z, y], [z, 0.0, -x], [-y, x, 0.0]])
+        rows.append(np.hstack([cross, cross * t]))
+    _, _, vt = np.linalg.svd(np.vstack(rows))
+    a, b = vt[-1][:3], vt[-1][3:]
+    if np.dot(a + b * times[-1], directions[-1]) < 0:
+        a, b = -a, -b
+    return a, b
+
+
+def extrapolate_pass(samples: Sequence[Tuple[float, float, float, Optional[float]]],
+                     step: float = 1.0, max_duration: float = 1800.0,
+                     min_elevation: float = 0.0) -> List[Tuple[float, float, float]]:
+    # samples 为按时间排列的 (时间, 方位, 仰角, 距离km或None)，从最后一个采样起外推到落到 min_elevation 以下为止
+    if len(samples) < 2 or samples[-1][0] <= samples[0][0]:
+        return []
+
+    fit = _fit_linear_motion(samples)
+    if fit is None:
+        return []
+    a, b = fit
+
+    t0, t1 = samples[0][0], samples[-1][0]
+    offsets = np.arange(0.0, max_duration + step / 2, step)
+    positions = a + b * (t1 - t0 + offsets)[:, None]
+
+    # 与 vector_angles 相同的换算，整段一次计算
+    x, y, z = positions.T
+    norm = np.sqrt(x * x + y * y + z * z)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        azimuths = np.where(norm == 0, 0.0, np.degrees(np.arctan2(x, y)) % 360)
+        elevations = np.where(norm == 0, 90.0, np.degrees(np.arcsin(np.clip(z / norm, -1.0, 1.0))))
+
+    # 到达过 min_elevation 以上且正在下降时视为出境
+    end = len(offsets)
+    above = elevations >= min_elevation
+    if above.any():
+        rise = int(np.argmax(above))
+        setting = ~above[rise + 1:] & (elevations[rise + 1:] < elevations[rise:-1])
+        if setting.any():
+            end = rise + 1 + int(np.argmax(setting))
+
+    return list(zip((t1 + offsets[:end]).tolist(), azimuths[:end].tolist(), elevations[:end].tolist()))
+
+
+def _unwrap(azimuths: Sequence[float]) -> List[float]:
+    unwrapped = []
+    for az in azimuths:
+        if unwrapped:
+            az = unwrapped[-1] + (az - unwrapped[-1] + 180) % 360 - 180
+        unwrapped.append(az)
+    return unwrapped
+
+
+def _rate_limited(times: Sequence[float], values: Sequence[float], rate: float) -> List[float]:
+    # 前向限速（滞后）与反向限速（超前）取平均：转速不超过 rate，且相对原轨迹对称，
+    # 天顶附近的大角度方位转动被提前开始、推迟结束
+    def limit(order):
+        out = [0.0] * len(values)
+        first = order[0]
+        value, last_time = values[first], times[first]
+        out[first] = value
+        for i in order[1:]:
+            allowed = rate * abs(times[i] - last_time)
+            change = values[i] - value
+            if change > allowed:
+                change = allowed
+            elif change < -allowed:
+                change = -allowed
+            value += change
+            last_time = times[i]
+            out[i] = value
+        return out
+
+    if not values:
+        return []
+    forward = limit(range(len(values)))
+    backward = limit(range(len(values) - 1, -1, -1))
+    return [(a + b) / 2 for a, b in zip(forward, backward)]
+
+
+def _facing(azimuth: float, plane: float) -> float:
+    # 过顶模式下与竖直面方位相差不超过90°的水平角表示
+    if abs((azimuth - plane + 180) % 360 - 180) <= 90:
+        return azimuth
+    return azimuth + 180
+
+
+def _fit_into_range(values: List[float], low: float, high: float,
+                    reference: Optional[float] = None, keep: bool = False) -> Tuple[List[float], bool]:
+    # 整圈平移使轨迹落在 [low, high] 内，有多种圈数可选时取起点离 reference 最近的；
+    # 放不下时取从起点起在范围内持续最久的圈数，使回绕尽量推迟到过境末尾，返回 (轨迹, True)
+    # keep 为 True（跟踪途中）时只能使用 reference 所在的圈数，换圈本身就是一次回绕
+    if keep and reference is not None:
+        shift = round((reference - values[0]) / 360) * 360
+        shifted = [v + shift for v in values]
+        return shifted, not all(low <= v <= high for v in shifted)
+
+    span_low, span_high = min(values), max(values)
+    shift = math.ceil((low - span_low) / 360) * 360
+    if span_high + shift <= high:
+        shifts = []
+        while span_high + shift <= high:
+            shifts.append(shift)
+            shift += 360
+        if reference is not None:
+            shift = min(shifts, key=lambda s: abs(values[0] + s - reference))
+        else:
+            shift = shifts[0]
+        return [v + shift for v in values], False
+
+    def inside(shift):
+        count = 0
+        for v in values:
+            if not low <= v + shift <= high:
+                break
+            count += 1
+        return count
+
+    shift = math.ceil((low - values[0]) / 360) * 360
+    shifts = []
+    while values[0] + shift <= high:
+        shifts.append(shift)
+        shift += 360
+    if not shifts:
+        shifts.append(-math.floor((values[0] - low) / 360) * 360)
+    shift = max(shifts, key=inside)
+    return [v + shift for v in values], True
+
+
+class PassPlan:
+    # 一次过境的规划结果：跟踪模式、云台水平角轨迹（已展开、限速）及评估指标
+
+    def __init__(self, mode: str, times: List[float], azimuths: List[float],
+                 planned_azimuths: List[float], azimuth_range: Tuple[float, float],
+                 vertical_range: Tuple[float, float], needs_unwind: bool,
+                 max_elevation: float, peak_rate: float, slew_time: float, max_error: float,
+                 plane: Optional[float] = None):
+        self.mode = mode
+        self.plane = plane  # 过顶模式的竖直面方位
+        self.times = times
+        self.azimuths = azimuths  # 未限速的云台水平角（已展开）
+        self.planned_azimuths = planned_azimuths  # 限速后的云台水平角
+        self.azimuth_range = azimuth_range
+        self.vertical_range = vertical_range
+        self.needs_unwind = needs_unwind  # 水平角范围内放不下整个过境，途中需要回绕
+        self.max_elevation = max_elevation
+        self.peak_rate = peak_rate  # 未限速时的最大水平角速度(°/s)
+        self.slew_time = slew_time  # 按转速估算的总转动时间(s)
+        self.max_error = max_error  # 规划轨迹的最大指向误差(°)
+        self.limit_hold = 0.0  # 越过水平角限位不超过该角度时停在限位上(°)
+
+    def describe(self) -> str:
+        text = (f"{MODE_NAMES.get(self.mode, self.mode)}模式, 最高仰角{self.max_elevation:.1f}°, "
+                f"预计转动{self.slew_time:.1f}s, 最大指向误差{self.max_error:.2f}°")
+        if self.needs_unwind:
+            text += ", 途中需回绕"
+        return text
+
+    def _planned_azimuth(self, timestamp: float) -> Optional[Tuple[float, float]]:
+        # 返回 (限速后水平角, 原始水平角)；入境前、出境后按起点、终点计，云台提前转到规划的圈数上等待
+        times = self.times
+        if not times:
+            return None
+        timestamp = min(max(timestamp, times[0]), times[-1])
+
+        i = bisect_left(times, timestamp)
+        if times[i] == timestamp or i == 0:
+            return self.planned_azimuths[i], self.azimuths[i]
+
+        fraction = (timestamp - times[i - 1]) / (times[i] - times[i - 1])
+
+        def interpolate(values):
+            return values[i - 1] + fraction * (values[i] - values[i - 1])
+
+        return interpolate(self.planned_azimuths), interpolate(self.azimuths)
+
+    def command_angles(self, timestamp: float, azimuth: float, elevation: float) -> Tuple[float, float]:
+        # 实际方位/仰角 -> 本次过境使用的云台水平/垂直角度
+        if self.mode == 'over_the_top':
+            horizontal = _facing(azimuth, self.plane)
+        elif self.mode == 'flip':
+            horizontal = azimuth + 180
+        else:
+            horizontal = azimuth
+
+        planned = self._planned_azimuth(timestamp)
+        if planned is not None:
+            planned_azimuth, raw_azimuth = planned
+            # 水平角取与规划轨迹同一圈的值，实时角度为主；天顶附近叠加限速带来的偏移
+            horizontal = raw_azimuth + (horizontal - raw_azimuth + 180) % 360 - 180
+            horizontal += planned_azimuth - raw_azimuth
+
+        low, high = self.azimuth_range
+        if high < horizontal <= high + self.limit_hold:
+            horizontal = high
+        elif low - self.limit_hold <= horizontal < low:
+            horizontal = low
+        elif not low <= horizontal <= high:
+            horizontal %= 360
+            if horizontal > high:
+                horizontal -= 360
+            horizontal = max(low, horizontal)
+
+        vertical = projected_vertical(azimuth, elevation, horizontal)
+        v_low, v_high = self.vertical_range
+        return horizontal, max(v_low, min(v_high, vertical))
+
+
+class PassPlanner:
+    # 根据入境前的 Orbitron 采样外推整段轨迹，在入境前选定跟踪模式与方位圈数，
+    # 并为天顶附近的方位快速转动规划限速轨迹；模式在入境后锁定，直到出境
+
+    def __init__(self, azimuth_range: Tuple[float, float] = (0.0, 360.0),
+                 vertical_range: Tuple[float, float] = (-90.0, 90.0),
+                 slew_rate: float = 30.0, min_elevation: float = 0.0,
+                 keyhole_elevation: float = 85.0, max_gap: float = 10.0,
+                 confirm_samples: int = 5, limit_hold: float = 15.0, replan_interval: float = 1.0):
+        self.azimuth_range = azimuth_range  # 云台水平角范围
+        self.vertical_range = vertical_range  # 云台垂直角范围，上限超过90°时可翻转/过顶
+        self.slew_rate = slew_rate  # 云台转速(°/s)
+        self.min_elevation = min_elevation  # 开始跟踪的仰角，低于该仰角的采样只用于入境前规划
+        self.keyhole_elevation = keyhole_elevation  # 最高仰角超过该值时，从天顶哪一侧经过无法可靠预测
+        self.max_gap = max_gap
+        self.azimuth_reference = None  # 云台当前水平角，水平角范围超过一圈时用于选择圈数
+        self.confirm_samples = confirm_samples  # 要求云台转动超过180°的新规划需连续出现的次数
+        self.limit_hold = limit_hold  # 越过水平角限位不超过该角度时停在限位上，不整圈回绕(°)
+        self.replan_interval = replan_interval  # 两次重新规划的最小间隔(s)，其间的采样只记录
+        self._jump_count = 0
+        self._plan_time = None
+        self.plan = None
+        self.satellite = None
+        self._samples = []
+        self._locked_mode = None
+        self._locked_azimuth = None
+        self._above = False
+
+    def reset(self):
+        self.plan = None
+        self.satellite = None
+        self._samples = []
+        self._locked_mode = None
+        self._locked_azimuth = None
+        self._above = False
+        self._jump_count = 0
+        self._plan_time = None
+
+    def add_sample(self, azimuth: float, elevation: float, timestamp: float,
+                   satellite: Optional[str] = None, distance: Optional[float] = None) -> Optional[PassPlan]:
+        # 加入一次采样并重新规划，返回新的规划（采样不足时为 None）
+        if satellite != self.satellite or (self._samples and
+                                           timestamp - self._samples[-1][0] > self.max_gap):
+            self.reset()
+            self.satellite = satellite
+
+        if self._samples and timestamp <= self._samples[-1][0]:
+            return self.plan
+
+        if elevation >= self.min_elevation:
+            self._above = True
+        elif self._above:
+            # 出境：下一次过境重新选择模式
+            self._samples = []
+            self._locked_mode = None
+            self._locked_azimuth = None
+            self._above = False
+
+        self._samples.append((timestamp, azimuth, elevation, distance))
+        if len(self._samples) > 30:
+            del self._samples[:-30]
+
+        if len(self._samples) < 2:
+            self.plan = None
+            return None
+
+        # 一次规划（外推整段过境、各模式限速）需要几毫秒，在界面线程中按 replan_interval 限频，
+        # 其间沿用上一次的规划；尚无规划、刚入境需要锁定模式、整圈换位待确认时立即规划
+        if (self.plan is not None and self._jump_count == 0 and
+                not (self._above and self._locked_mode is None) and
+                timestamp - self._plan_time < self.replan_interval):
+            return self.plan
+        self._plan_time = timestamp
+
+        track = [(timestamp, azimuth, elevation)] + extrapolate_pass(
+            self._samples, min_elevation=self.min_elevation)[1:]
+
+        modes = (self._locked_mode,) if self._locked_mode else None
+        plan = self.plan_track(track, modes)
+
+        # 近乎迎面飞来的过境在入境前方位几乎不变，外推的转动方向不稳定；
+        # 需要整圈换位的规划连续出现多次才采用，避免云台来回转动
+        if (plan and self.azimuth_reference is not None and
+                abs(plan.planned_azimuths[0] - self.azimuth_reference) > 180):
+            self._jump_count += 1
+            if self._jump_count < self.confirm_samples:
+                return self.plan
+        else:
+            self._jump_count = 0
+        self.plan = plan
+
+        # 过顶模式在天顶前与常规模式给出相同的角度；随着接近天顶拟合能分辨从哪一侧经过，
+        # 此时若常规模式无需回绕，且两者当前角度仍一致，则改用常规模式
+        if self._locked_mode == 'over_the_top' and self.plan:
+            normal = self._plan_mode('normal', [p for p in track if p[2] >= self.min_elevation])
+            if (normal and not normal.needs_unwind and
+                    normal.max_elevation < self.keyhole_elevation and
+                    abs(normal.command_angles(timestamp, azimuth, elevation)[0] -
+                        self.plan.command_angles(timestamp, azimuth, elevation)[0]) < 1.0):
+                self._locked_mode = 'normal'
+                self._locked_azimuth = None
+                self.plan = normal
+
+        if self.plan and self._above and self._locked_mode is None:
+            self._locked_mode = self.plan.mode
+            # 过顶模式的竖直面在入境时确定
+            if self.plan.mode == 'over_the_top':
+                self._locked_azimuth = self.plan.plane
+        return self.plan
+
+    def command_angles(self, timestamp: float, azimuth: float, elevation: float) -> Tuple[float, float]:
+        if self.plan is None:
+            return azimuth % 360, elevation
+        return self.plan.command_angles(timestamp, azimuth, elevation)
+
+    def available_modes(self) -> Tuple[str, ...]:
+        low, high = self.vertical_range
+        modes = ['normal']
+        if high >= 180 - max(self.min_elevation, 0.0):
+            modes.append('flip')
+            if low <= max(self.min_elevation, 0.0):
+                modes.append('over_the_top')
+        return tuple(modes)
+
+    def plan_track(self, track: Sequence[Tuple[float, float, float]],
+                   modes: Optional[Sequence[str]] = None) -> Optional[PassPlan]:
+        visible = [point for point in track if point[2] >= self.min_elevation] or list(track[:1])
+        if not visible:
+            return None
+
+        plans = [plan for plan in (self._plan_mode(mode, visible)
+                                   for mode in modes or self.available_modes()) if plan]
+        if not plans:
+            return None
+
+        # 过天顶附近时从哪一侧经过无法可靠预测，方位会在两侧之间突变，优先使用与侧向无关的过顶模式
+        max_elevation = max(el for _, _, el in visible)
+        if max_elevation >= self.keyhole_elevation:
+            for plan in plans:
+                if plan.mode == 'over_the_top':
+                    return plan
+
+        # 依次比较：是否需要回绕、最大指向误差（0.1°量级）、总转动时间
+        return min(plans, key=lambda plan: (plan.needs_unwind, round(plan.max_error, 1),
+                                            plan.slew_time))
+
+    def _plan_mode(self, mode: str, track: Sequence[Tuple[float, float, float]]) -> Optional[PassPlan]:
+        times = [t for t, _, _ in track]
+        az = np.radians([a for _, a, _ in track])
+        el = np.radians([e for _, _, e in track])
+
+        plane = None
+        if mode == 'over_the_top':
+            if self._locked_azimuth is not None:
+                plane = self._locked_azimuth
+            else:
+                # 竖直面方位取入境方位与出境反方向的平均，使过境尽量落在该竖直面附近
+                first, last = math.radians(track[0][1]), math.radians(track[-1][1] + 180)
+                plane = math.degrees(math.atan2(math.sin(first) + math.sin(last),
+                                                math.cos(first) + math.cos(last)))
+            # 各点取竖直面两侧90°以内的表示，过天顶时水平角跳变180°，由限速平滑为经过竖直面的转动
+            raw = [plane + (_facing(a, plane) - plane + 180) % 360 - 180 for _, a, _ in track]
+        else:
+            offset = 180 if mode == 'flip' else 0
+            raw = _unwrap([a + offset for _, a, _ in track])
+
+        azimuths, needs_unwind = _fit_into_range(raw, *self.azimuth_range,
+                                                 reference=self.azimuth_reference,
+                                                 keep=self._above)
+        planned = _rate_limited(times, azimuths, self.slew_rate)
+
+        horizontal = np.radians(planned)
+        vertical = np.degrees(np.arctan2(np.sin(el), np.cos(el) * np.cos(az - horizontal)))
+        low, high = self.vertical_range
+        if mode != 'normal' and (vertical.min() < low - 0.5 or vertical.max() > high + 0.5):
+            return None
+        vertical = np.clip(vertical, low, high)
+
+        # 指向误差：云台方向与卫星方向的夹角
+        v = np.radians(vertical)
+        cos_error = np.cos(v) * np.cos(el) * np.cos(az - horizontal) + np.sin(v) * np.sin(el)
+        max_error = float(np.degrees(np.arccos(np.clip(cos_error, -1.0, 1.0))).max())
+
+        dt = np.diff(times)
+        moving = dt > 0
+        raw_step = np.abs(np.diff(azimuths))
+        peak_rate = float((raw_step[moving] / dt[moving]).max()) if moving.any() else 0.0
+        step = np.maximum(np.abs(np.diff(planned)), np.abs(np.diff(vertical)))
+        slew_time = float(step.sum()) / self.slew_rate
+        if needs_unwind:
+            slew_time += 360 / self.slew_rate
+
+        if plane is not None:
+            plane = plane + azimuths[0] - raw[0]
+        plan = PassPlan(mode, times, azimuths, planned, self.azimuth_range, self.vertical_range,
+                        needs_unwind, float(np.degrees(el).max()), peak_rate, slew_time, max_error,
+                        plane)
+        plan.limit_hold = self.limit_hold
+        return plan
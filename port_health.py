@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class PortHealth:
+    # 多个串口工作线程共享的健康统计：各端口的命令排队/写入耗时、反馈频率、查询失败与错误；
+    # 每个端口只在自己的线程里更新，锁只保护统计字典，不会让一个端口等待另一个端口的串口操作
+
+    def __init__(self, smoothing: float = 0.2, stale_after: float = 2.0):
+        self.smoothing = smoothing  # 平均值的指数平滑系数
+        self.stale_after = stale_after  # 超过该时间没有成功反馈视为异常(s)
+        self._lock = threading.Lock()
+        self._ports = OrderedDict()
+        self.started = time.time()
+
+    @staticmethod
+    def _new_port() -> Dict[str, Optional[float]]:
+        return {'commands': 0, 'queue_average': None, 'queue_max': 0.0, 'write_average': None,
+                'queries': 0, 'feedback': 0, 'failures': 0, 'errors': 0,
+                'last_feedback': None, 'last_error': ''}
+
+    def register(self, port: str):
+        with self._lock:
+            self._ports.setdefault(port, self._new_port())
+
+    def reset(self):
+        with self._lock:
+            for port in self._ports:
+                self._ports[port] = self._new_port()
+            self.started = time.time()
+
+    def _average(self, stats, key: str, value: float):
+        if stats[key] is None:
+            stats[key] = value
+        else:
+            stats[key] += self.smoothing * (value - stats[key])
+
+    def command_written(self, port: str, queued_time: float, write_start: float, write_end: float):
+        with self._lock:
+            stats = self._ports.setdefault(port, self._new_port())
+            stats['commands'] += 1
+            waited = max(0.0, write_start - queued_time)
+            self._average(stats, 'queue_average', waited)
+            stats['queue_max'] = max(stats['queue_max'], waited)
+            self._average(stats, 'write_average', max(0.0, write_end - write_start))
+
+    def feedback(self, port: str, success: bool, timestamp: Optional[float] = None):
+        with self._lock:
+            stats = self._ports.setdefault(port, self._new_port())
+            stats['queries'] += 1
+            if success:
+                stats['feedback'] += 1
+                stats['last_feedback'] = timestamp or time.time()
+            else:
+                stats['failures'] += 1
+
+    def error(self, port: str, message: str):
+        with self._lock:
+            stats = self._ports.setdefault(port, self._new_port())
+            stats['errors'] += 1
+            stats['last_error'] = message
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        now = time.time() if now is None else now
+        with self._lock:
+            elapsed = max(1e-6, now - self.started)
+            result = OrderedDict()
+            for port, stats in self._ports.items():
+                item = dict(stats)
+                item['command_rate'] = stats['commands'] / elapsed
+                item['feedback_rate'] = stats['feedback'] / elapsed
+                last = stats['last_feedback']
+                item['feedback_age'] = None if last is None else now - last
+                # 有查询但长时间没有成功反馈时视为异常
+                item['healthy'] = not stats['queries'] or (last is not None and now - last <= self.stale_after)
+                result[port] = item
+            return result
+
+    def format_report(self, now: Optional[float] = None) -> str:
+        def ms(value):
+            return f"{value * 1000:.1f}" if value is not None else "N/A"
+
+        lines = [f"{'串口':<14}{'状态':>6}{'命令/s':>8}{'排队ms':>8}{'最长ms':>8}{'写入ms':>8}"
+                 f"{'反馈/s':>8}{'失败':>6}{'错误':>6}"]
+        for port, stats in self.snapshot(now).items():
+            lines.append(f"{port:<14}{'正常' if stats['healthy'] else '异常':>6}{stats['command_rate']:>8.2f}"
+                         f"{ms(stats['queue_average']):>8}{ms(stats['queue_max']):>8}"
+                         f"{ms(stats['write_average']):>8}{stats['feedback_rate']:>8.2f}"
+                         f"{stats['failures']:>6d}{stats['errors']:>6d}")
+            if stats['last_error']:
+                lines.append(f"{'':<14}最近错误: {stats['last_error']}")
+        return '\n'.join(lines)
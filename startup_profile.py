@@ -0,0 +1,152 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+class _TimedLoader:
+    # 包装模块的 loader，计时 create_module（扩展模块在这里加载动态库）与 exec_module；
+    # 执行前换回原 loader，模块看到的 __loader__ 与不计时时相同
+
+    def __init__(self, loader, profiler: 'StartupProfiler'):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        self._profiler._enter(spec.name)
+        try:
+            return self._loader.create_module(spec)
+        finally:
+            self._profiler._leave(spec.name)
+
+    def exec_module(self, module):
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder:
+    # 放在 sys.meta_path 最前面，由其余 finder 找到模块后给 loader 套上计时
+
+    def __init__(self, profiler: 'StartupProfiler'):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self._profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    # 启动耗时统计：各阶段（可在后台线程中）的起止时间，以及每个模块导入的自身耗时（不含其导入的子模块）
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._finder = None
+        self.stages: List[Tuple[str, float, float, str]] = []  # (名称, 开始, 结束, 线程)
+        self.events: List[Tuple[str, float]] = []
+        self.imports: Dict[str, Tuple[float, float]] = {}  # 模块 -> (自身耗时, 含子模块耗时)
+
+    def install(self):
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, name: str):
+        self._stack().append([name, time.perf_counter(), 0.0])
+
+    def _leave(self, name: str):
+        stack = self._stack()
+        _, start, children = stack.pop()
+        total = time.perf_counter() - start
+        if stack:
+            stack[-1][2] += total
+        with self._lock:
+            own, inclusive = self.imports.get(name, (0.0, 0.0))
+            self.imports[name] = (own + total - children, inclusive + total)
+
+    def now(self) -> float:
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def stage(self, name: str):
+        start = self.now()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages.append((name, start, self.now(), threading.current_thread().name))
+
+    def event(self, name: str):
+        with self._lock:
+            self.events.append((name, self.now()))
+
+    def event_time(self, name: str) -> Optional[float]:
+        with self._lock:
+            for event, stamp in self.events:
+                if event == name:
+                    return stamp
+        return None
+
+    def import_summary(self, limit: int = 12) -> List[Tuple[str, float, int]]:
+        # 按顶层包汇总自身耗时：(包名, 耗时, 模块数)，从大到小
+        packages = OrderedDict()
+        with self._lock:
+            items = list(self.imports.items())
+        for name, (own, _) in items:
+            package = name.split('.')[0]
+            total, count = packages.get(package, (0.0, 0))
+            packages[package] = (total + own, count + 1)
+        ranked = sorted(packages.items(), key=lambda item: item[1][0], reverse=True)
+        return [(package, total, count) for package, (total, count) in ranked[:limit]]
+
+    def format_report(self, limit: int = 12) -> str:
+        lines = ["启动耗时（从 main.py 开始执行计时，不含解释器自身启动）",
+                 f"{'阶段':<24}{'开始ms':>10}{'耗时ms':>10}  线程"]
+        # 阶段与时间点按开始时间排在一起，时间点没有耗时一栏
+        with self._lock:
+            rows = [(start, name, f"{(end - start) * 1000:>10.1f}  {thread}")
+                    for name, start, end, thread in self.stages]
+            rows += [(stamp, name, '') for name, stamp in self.events]
+        for start, name, detail in sorted(rows, key=lambda item: item[0]):
+            lines.append(f"{name:<24}{start * 1000:>10.1f}{detail}")
+
+        summary = self.import_summary(limit)
+        if summary:
+            lines.append("")
+            lines.append(f"{'导入(按顶层包)':<24}{'模块数':>10}{'耗时ms':>10}")
+            for package, total, count in summary:
+                lines.append(f"{package:<24}{count:>10d}{total * 1000:>10.1f}")
+            with self._lock:
+                own_total = sum(own for own, _ in self.imports.values())
+            lines.append(f"{'合计':<24}{len(self.imports):>10d}{own_total * 1000:>10.1f}")
+        return '\n'.join(lines)
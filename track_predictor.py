@@ -0,0 +1,83 @@
+import math
+from collections import deque
+from typing import Optional, Tuple
+
+
+def direction_vector(azimuth: float, elevation: float) -> Tuple[float, float, float]:
+    # 方位/仰角 -> 东北天单位向量，避免方位 359->0 跳变和天顶奇点
+    az = math.radians(azimuth)
+    el = math.radians(elevation)
+    cos_el = math.cos(el)
+    return cos_el * math.sin(az), cos_el * math.cos(az), math.sin(el)
+
+
+def sky_angles(horizontal: float, vertical: float) -> Tuple[float, float]:
+    # 云台角度 -> 实际指向的方位/仰角，垂直角超过90°为翻转姿态
+    if vertical > 90:
+        return (horizontal + 180) % 360, 180 - vertical
+    return horizontal % 360, vertical
+
+
+def vector_angles(x: float, y: float, z: float) -> Tuple[float, float]:
+    norm = math.sqrt(x * x + y * y + z * z)
+    if norm == 0:
+        return 0.0, 90.0
+    azimuth = math.degrees(math.atan2(x, y)) % 360
+    elevation = math.degrees(math.asin(max(-1.0, min(1.0, z / norm))))
+    return azimuth, elevation
+
+
+class TrackPredictor:
+    # 根据最近几次 Orbitron 采样对卫星方向做二次外推，在两次采样之间给出平滑的目标角度
+
+    def __init__(self, history: int = 3, max_extrapolation: float = 2.0, max_gap: float = 5.0):
+        self.max_extrapolation = max_extrapolation  # 超出最后一次采样多久后不再外推(s)
+        self.max_gap = max_gap  # 两次采样间隔超过该值时重新开始(s)
+        self._samples = deque(maxlen=max(2, history))
+        self.satellite = None
+
+    def reset(self):
+        self._samples.clear()
+        self.satellite = None
+
+    def has_samples(self) -> bool:
+        return bool(self._samples)
+
+    def add_sample(self, azimuth: float, elevation: float, timestamp: float,
+                   satellite: Optional[str] = None):
+        if satellite != self.satellite:
+            self.reset()
+            self.satellite = satellite
+
+        if self._samples:
+            last_time = self._samples[-1][0]
+            if timestamp <= last_time:
+                return
+            if timestamp - last_time > self.max_gap:
+                self._samples.clear()
+
+        self._samples.append((timestamp, direction_vector(azimuth, elevation)))
+
+    def predict(self, timestamp: float) -> Optional[Tuple[float, float]]:
+        samples = self._samples
+        if not samples:
+            return None
+
+        last_time = samples[-1][0]
+        t = min(timestamp, last_time + self.max_extrapolation)
+
+        if len(samples) == 1:
+            return vector_angles(*samples[0][1])
+
+        # 拉格朗日插值（2点为线性，3点为二次），逐分量计算后归一化
+        points = list(samples)[-3:]
+        vector = [0.0, 0.0, 0.0]
+        for i, (ti, vi) in enumerate(points):
+            weight = 1.0
+            for j, (tj, _) in enumerate(points):
+                if i != j:
+                    weight *= (t - tj) / (ti - tj)
+            for axis in range(3):
+                vector[axis] += weight * vi[axis]
+
+        return vector_angles(*vector)
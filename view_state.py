@@ -0,0 +1,57 @@
+from typing import Any, Dict
+
+
+class ViewState:
+    # 界面显示的最新状态：信号处理函数只记录最新值，界面定时器按固定帧率取出变化的值再更新控件，
+    # 两帧之间多次写入同一项时只保留最后一次；值与上次显示的相同时不更新控件
+
+    _MISSING = object()
+
+    def __init__(self):
+        self._values = {}
+        self._shown = {}
+        self._dirty = set()
+        self.stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> Dict[str, int]:
+        return {'updates': 0, 'frames': 0, 'applied': 0}
+
+    def reset_stats(self):
+        self.stats = self._new_stats()
+
+    def set(self, key: str, value: Any):
+        self._values[key] = value
+        self._dirty.add(key)
+        self.stats['updates'] += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._values.get(key, default)
+
+    def invalidate(self, key: str):
+        # 控件被其他代码直接改写后调用，下一帧按记录的值重新显示
+        self._shown.pop(key, None)
+        if key in self._values:
+            self._dirty.add(key)
+
+    def take_changes(self) -> Dict[str, Any]:
+        # 返回上一帧以来变化的项 {键: 最新值}，并记为已显示
+        changes = {}
+        if not self._dirty:
+            return changes
+
+        for key in self._dirty:
+            value = self._values[key]
+            if self._shown.get(key, self._MISSING) != value:
+                changes[key] = value
+                self._shown[key] = value
+        self._dirty.clear()
+
+        self.stats['frames'] += 1
+        self.stats['applied'] += len(changes)
+        return changes
+
+    def format_report(self) -> str:
+        stats = self.stats
+        return (f"界面刷新: 状态写入{stats['updates']}次, 刷新{stats['frames']}帧, "
+                f"控件更新{stats['applied']}次")
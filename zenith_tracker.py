@@ -1,23 +1,41 @@
+import math
 import matplotlib
 
 matplotlib.use('Qt5Agg')
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import numpy as np
-from PyQt5.QtWidgets import QVBoxLayout
 from PyQt5 import QtCore
 
+from zenith_tracker_base import PassTrailBase, ZenithTrackerBase
 
-class ZenithTracker:
 
-    def __init__(self, star_plot_widget):
-        self.star_plot = star_plot_widget
+class PassTrail(PassTrailBase):
+    # 一次过境的轨迹，保存在预分配的环形数组中：每个点同时写入 i 和 i+capacity，
+    # 最近 capacity 个点始终是连续的一段，直接作为 Line2D 的数据，不需要拼接或增长列表
 
-        self.satellite_pos = (45.0, 30.0)
+    def __init__(self, capacity=18000, min_spacing=0.2):
+        super().__init__(capacity, min_spacing)
+        self.theta = np.zeros(2 * capacity)
+        self.r = np.zeros(2 * capacity)
+        self._next = 0
 
-        self.tracker_angle = (0.0, 0.0)
+    def _reset(self):
+        self._next = 0
 
-        self.init_plot()
+    def _store(self, azimuth, elevation):
+        index = self._next
+        self.theta[index] = self.theta[index + self.capacity] = math.radians(azimuth)
+        self.r[index] = self.r[index + self.capacity] = 1 - elevation / 90.0
+        self._next = (index + 1) % self.capacity
+
+    def data(self):
+        start = (self._next - self.count) % self.capacity
+        return self.theta[start:start + self.count], self.r[start:start + self.count]
+
+
+class ZenithTracker(ZenithTrackerBase):
+    trail_class = PassTrail
 
     def init_plot(self):
         self.figure = Figure(figsize=(4.21, 4.21), dpi=100)
@@ -37,25 +55,19 @@ class ZenithTracker:
         self.ax.patch.set_alpha(0.2)
         self.ax.patch.set_facecolor('white')
 
-        if self.star_plot.layout():
-            old_layout = self.star_plot.layout()
-            while old_layout.count():
-                item = old_layout.takeAt(0)
-                if item.widget():
-                    item.widget().setParent(None)
+        self.attach_canvas(self.canvas)
 
-        layout = QVBoxLayout(self.star_plot)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.addWidget(self.canvas)
+        self.init_background()
+        self.init_markers()
 
-        self.update_plot()
+        # 每次完整重绘（首次显示、窗口缩放）后重新缓存背景，之后只重绘标记
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
 
-    def update_plot(self):
-        self.ax.clear()
-
-        self.ax.patch.set_alpha(0.2)
-        self.ax.patch.set_facecolor('white')
+        self.update_plot()
 
+    def init_background(self):
+        # 坐标轴、刻度、地平线和30°/60°仰角圈只绘制一次
         self.ax.set_theta_zero_location('N')
         self.ax.set_theta_direction(-1)
 
@@ -75,70 +87,78 @@ class ZenithTracker:
             self.ax.plot(theta, np.full_like(theta, r), 'lightgray',
                          alpha=0.4, linewidth=0.8, linestyle='--')
 
+        self.ax.grid(True, alpha=0.4)
+
+    def init_markers(self):
+        # 会移动的标记设为 animated，不参与完整重绘，由 update_plot 叠加在缓存的背景上
+        # 轨迹线画在标记下方，数据直接引用 PassTrail 的环形数组
+        self.satellite_trail_line = self.ax.plot([], [], color='blue', alpha=0.4, linewidth=1.0,
+                                                 animated=True)[0]
+        self.tracker_trail_line = self.ax.plot([], [], color='red', alpha=0.5, linewidth=1.0,
+                                               animated=True)[0]
+        self.trail_versions = [None, None]
+
+        # 卫星与云台两条方位线放在同一个 Line2D 中，用 NaN 断开
+        self.azimuth_lines = self.ax.plot([0, 0, np.nan, 0, 0], [0, 0.97, np.nan, 0, 0.97], 'gray',
+                                          alpha=0.4, linewidth=0.8, linestyle=':', animated=True)[0]
+
+        # 用 Line2D 的标记而不是 scatter：重绘时不需要计算圆形路径的范围，开销约为 scatter 的1/8
+        self.satellite_marker = self.ax.plot([0], [0], 'o',
+                                             markersize=np.sqrt(120),
+                                             color='blue',
+                                             alpha=0.9,
+                                             markeredgecolor='darkblue',
+                                             markeredgewidth=1.5,
+                                             zorder=10,
+                                             animated=True)[0]
+
+        self.tracker_marker = self.ax.plot([0], [0], 'o',
+                                           markersize=np.sqrt(80),
+                                           color='red',
+                                           alpha=0.9,
+                                           markeredgecolor='darkred',
+                                           markeredgewidth=1.0,
+                                           zorder=11,
+                                           animated=True)[0]
+
+        self.markers = [self.satellite_trail_line, self.tracker_trail_line, self.azimuth_lines,
+                        self.satellite_marker, self.tracker_marker]
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_markers()
+
+    def draw_markers(self):
+        for artist in self.markers:
+            self.ax.draw_artist(artist)
+
+    def update_markers(self):
         sat_az_rad = np.radians(self.satellite_pos[0])
         sat_r = 1 - self.satellite_pos[1] / 90.0
-
-        self.ax.scatter(sat_az_rad, sat_r,
-                        s=120,
-                        c='blue',
-                        alpha=0.9,
-                        edgecolors='darkblue',
-                        linewidth=1.5,
-                        zorder=10)
+        self.satellite_marker.set_data([sat_az_rad], [sat_r])
 
         track_az_rad = np.radians(self.tracker_angle[0])
         track_r = 1 - self.tracker_angle[1] / 90.0
+        self.tracker_marker.set_data([track_az_rad], [track_r])
 
-        self.ax.scatter(track_az_rad, track_r,
-                        s=80,
-                        c='red',
-                        alpha=0.9,
-                        edgecolors='darkred',
-                        linewidth=1.0,
-                        zorder=11)
-
-        for az in [self.satellite_pos[0], self.tracker_angle[0]]:
-            rad = np.radians(az)
-            self.ax.plot([rad, rad], [0, 0.97], 'gray',
-                         alpha=0.4, linewidth=0.8, linestyle=':')
+        self.azimuth_lines.set_xdata([sat_az_rad, sat_az_rad, np.nan, track_az_rad, track_az_rad])
 
-        self.ax.grid(True, alpha=0.4)
-
-        self.canvas.draw()
-
-
-    def set_satellite_position(self, azimuth, elevation):
-        azimuth = azimuth % 360
-        elevation = max(0, min(90, elevation))
-
-        self.satellite_pos = (azimuth, elevation)
-        self.update_plot()
-
-    def set_tracker_angle(self, azimuth, elevation):
-        azimuth = azimuth % 360
-        elevation = max(0, min(90, elevation))
+        # 轨迹有新点时才更新 Line2D，否则沿用已变换的路径
+        trails = [(self.satellite_trail, self.satellite_trail_line), (self.tracker_trail, self.tracker_trail_line)]
+        for index, (trail, line) in enumerate(trails):
+            if self.trail_versions[index] != trail.version:
+                line.set_data(*trail.data())
+                self.trail_versions[index] = trail.version
 
-        self.tracker_angle = (azimuth, elevation)
-        self.update_plot()
-
-    def get_satellite_position(self):
-        return self.satellite_pos
-
-    def get_tracker_angle(self):
-        return self.tracker_angle
-
-    def get_angle_difference(self):
-        az1, el1 = self.satellite_pos
-        az2, el2 = self.tracker_angle
-
-        az_diff = abs(az1 - az2)
-        if az_diff > 180:
-            az_diff = 360 - az_diff
+    def update_plot(self):
+        self.update_markers()
 
-        el_diff = abs(el1 - el2)
-        return az_diff, el_diff
+        if self.background is None:
+            # 还没有缓存背景时完整绘制一次，draw_event 中缓存背景并画出标记
+            self.canvas.draw()
+            return
 
-    def clear_plot(self):
-        self.satellite_pos = (45.0, 30.0)
-        self.tracker_angle = (0.0, 0.0)
-        self.update_plot()
\ No newline at end of file
+        # 恢复背景后只重绘两个标记和两条方位线
+        self.canvas.restore_region(self.background)
+        self.draw_markers()
+        self.canvas.blit(self.figure.bbox)
\ No newline at end of file
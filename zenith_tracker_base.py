@@ -0,0 +1,128 @@
+from PyQt5.QtWidgets import QVBoxLayout
+
+
+class PassTrailBase:
+    # 一次过境的轨迹：与上一个点相差小于 min_spacing 时不记录，最多保留最近 capacity 个点；
+    # 点的保存方式由子类的 _store/_reset 决定
+
+    def __init__(self, capacity=18000, min_spacing=0.2):
+        self.capacity = capacity  # 默认可保存20Hz下15分钟的点
+        self.min_spacing = min_spacing  # 与上一个点相差小于该角度时不记录(°)
+        self.count = 0
+        self.version = 0  # 每次变化加1，绘制时据此判断是否需要更新
+        self._last = None
+
+    def clear(self):
+        self._reset()
+        self.count = 0
+        self._last = None
+        self.version += 1
+
+    def append(self, azimuth, elevation):
+        if self._last is not None:
+            d_az = abs(azimuth - self._last[0]) % 360
+            d_el = abs(elevation - self._last[1])
+            if max(min(d_az, 360 - d_az), d_el) < self.min_spacing:
+                return False
+
+        self._last = (azimuth, elevation)
+        self._store(azimuth, elevation)
+        self.count = min(self.count + 1, self.capacity)
+        self.version += 1
+        return True
+
+    def _store(self, azimuth, elevation):
+        raise NotImplementedError
+
+    def _reset(self):
+        raise NotImplementedError
+
+
+class ZenithTrackerBase:
+    # matplotlib 与 QPainter 两种天顶图共用的状态与接口，不依赖 NumPy；
+    # 子类提供 trail_class、init_plot() 与 update_plot()
+
+    trail_class = PassTrailBase
+
+    def __init__(self, star_plot_widget):
+        self.star_plot = star_plot_widget
+
+        # 当前过境中卫星与追踪器的轨迹
+        self.satellite_trail = self.trail_class()
+        self.tracker_trail = self.trail_class()
+
+        self.satellite_pos = (45.0, 30.0)
+
+        self.tracker_angle = (0.0, 0.0)
+
+        self.init_plot()
+
+    def init_plot(self):
+        raise NotImplementedError
+
+    def update_plot(self):
+        raise NotImplementedError
+
+    def attach_canvas(self, canvas):
+        # 清空 star_plot 中原有的控件，放入绘图控件
+        if self.star_plot.layout():
+            old_layout = self.star_plot.layout()
+            while old_layout.count():
+                item = old_layout.takeAt(0)
+                if item.widget():
+                    item.widget().setParent(None)
+
+        layout = QVBoxLayout(self.star_plot)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(canvas)
+
+    def set_satellite_position(self, azimuth, elevation):
+        self.set_positions(satellite=(azimuth, elevation))
+
+    def set_tracker_angle(self, azimuth, elevation):
+        self.set_positions(tracker=(azimuth, elevation))
+
+    def set_positions(self, satellite=None, tracker=None):
+        # 同时更新卫星位置与追踪器角度时只重绘一次
+        # 地平线以上的位置同时记入轨迹
+        if satellite is not None:
+            azimuth, elevation = satellite
+            self.satellite_pos = (azimuth % 360, max(0, min(90, elevation)))
+            if elevation >= 0:
+                self.satellite_trail.append(*self.satellite_pos)
+
+        if tracker is not None:
+            azimuth, elevation = tracker
+            self.tracker_angle = (azimuth % 360, max(0, min(90, elevation)))
+            if elevation >= 0:
+                self.tracker_trail.append(*self.tracker_angle)
+
+        self.update_plot()
+
+    def get_satellite_position(self):
+        return self.satellite_pos
+
+    def get_tracker_angle(self):
+        return self.tracker_angle
+
+    def get_angle_difference(self):
+        az1, el1 = self.satellite_pos
+        az2, el2 = self.tracker_angle
+
+        az_diff = abs(az1 - az2)
+        if az_diff > 180:
+            az_diff = 360 - az_diff
+
+        el_diff = abs(el1 - el2)
+        return az_diff, el_diff
+
+    def clear_trail(self):
+        # 新的过境开始时清空轨迹，下一次更新时生效
+        self.satellite_trail.clear()
+        self.tracker_trail.clear()
+
+    def clear_plot(self):
+        self.satellite_pos = (45.0, 30.0)
+        self.tracker_angle = (0.0, 0.0)
+        self.clear_trail()
+        self.update_plot()
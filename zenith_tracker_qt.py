@@ -0,0 +1,161 @@
+import math
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen, QPixmap, QPolygonF
+from PyQt5 import QtCore
+
+from zenith_tracker_base import PassTrailBase, ZenithTrackerBase
+
+
+class PassTrail(PassTrailBase):
+    # 记录规则与 zenith_tracker.PassTrail 相同（见 PassTrailBase），点以单位圆坐标逐个追加到 QPolygonF，
+    # 超出容量时删除最早的点；绘制时经坐标变换直接使用，不需要每帧重建，控件缩放后也不需要重建
+
+    def __init__(self, capacity=18000, min_spacing=0.2):
+        super().__init__(capacity, min_spacing)
+        self.polygon = QPolygonF()
+
+    def _reset(self):
+        self.polygon.clear()
+
+    def _store(self, azimuth, elevation):
+        if self.count == self.capacity:
+            self.polygon.remove(0)
+        self.polygon.append(QtCore.QPointF(*polar_point(azimuth, elevation)))
+
+
+def polar_point(azimuth, elevation):
+    # 方位/仰角 -> 单位圆坐标，正北向上、顺时针，天顶为圆心、地平线半径为1
+    r = 1 - elevation / 90.0
+    theta = math.radians(azimuth)
+    return r * math.sin(theta), -r * math.cos(theta)
+
+
+class ZenithCanvas(QWidget):
+    # 直接用 QPainter 绘制的天顶图：网格与标签画在缓存的 QPixmap 上，大小变化时才重画；
+    # 每次更新只在背景上画轨迹、方位线和两个标记
+
+    DPI_SCALE = 100 / 72.0  # 与 matplotlib 版本（dpi=100）相同的点到像素换算
+
+    def __init__(self, tracker, parent=None):
+        super().__init__(parent)
+        self.tracker = tracker
+        self.background = None
+        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
+        self.setStyleSheet("background-color: transparent;")
+
+    def geometry_for(self, width, height):
+        # 与 matplotlib 版本相同：绘图区占四周各10%以内，极坐标圆取较短边
+        radius = min(width, height) * 0.8 / 2
+        return QtCore.QPointF(width / 2, height / 2), radius
+
+    def resizeEvent(self, event):
+        self.background = None
+        super().resizeEvent(event)
+
+    def render_background(self):
+        width, height = self.width(), self.height()
+        pixmap = QPixmap(width, height)
+        pixmap.fill(QColor(255, 255, 255, 51))
+        center, radius = self.geometry_for(width, height)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(QColor(255, 255, 255, 51))
+        painter.drawEllipse(center, radius, radius)
+        painter.setBrush(QtCore.Qt.NoBrush)
+
+        # 网格：0.25/0.5/0.75 半径圆和每45°一条径向线
+        grid = QPen(QColor(176, 176, 176, 102), 0.8 * self.DPI_SCALE)
+        painter.setPen(grid)
+        for fraction in (0.25, 0.5, 0.75):
+            painter.drawEllipse(center, radius * fraction, radius * fraction)
+        for index in range(8):
+            x, y = polar_point(index * 45, 0)
+            painter.drawLine(center, QtCore.QPointF(center.x() + x * radius, center.y() + y * radius))
+
+        # 30°/60°仰角圈
+        ring = QPen(QColor(211, 211, 211, 102), 0.8 * self.DPI_SCALE, QtCore.Qt.DashLine)
+        painter.setPen(ring)
+        for elev in (30, 60):
+            r = radius * (1 - elev / 90.0)
+            painter.drawEllipse(center, r, r)
+
+        # 地平线与外框
+        painter.setPen(QPen(QColor(128, 128, 128, 128), 1.0 * self.DPI_SCALE))
+        painter.drawEllipse(center, radius, radius)
+        painter.setPen(QPen(QColor(0, 0, 0), 0.8 * self.DPI_SCALE))
+        painter.drawEllipse(center, radius, radius)
+
+        font = QFont(self.font())
+        font.setPointSizeF(10)
+        painter.setFont(font)
+        painter.setPen(QColor(0, 0, 0))
+        for index, label in enumerate(['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']):
+            x, y = polar_point(index * 45, 0)
+            distance = radius + 14 * self.DPI_SCALE
+            box = QtCore.QRectF(center.x() + x * distance - 20, center.y() + y * distance - 10, 40, 20)
+            painter.drawText(box, QtCore.Qt.AlignCenter, label)
+
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        if self.background is None or self.background.size() != self.size():
+            self.background = self.render_background()
+
+        tracker = self.tracker
+        center, radius = self.geometry_for(self.width(), self.height())
+
+        def point(x, y):
+            return QtCore.QPointF(center.x() + x * radius, center.y() + y * radius)
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.background)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # 轨迹：单位圆坐标的折线经坐标变换画到控件上，线宽用 cosmetic 画笔保持为像素宽度
+        painter.save()
+        painter.translate(center)
+        painter.scale(radius, radius)
+        for trail, color in ((tracker.satellite_trail, QColor(0, 0, 255, 102)),
+                             (tracker.tracker_trail, QColor(255, 0, 0, 128))):
+            if trail.count > 1:
+                pen = QPen(color, 1.0 * self.DPI_SCALE)
+                pen.setCosmetic(True)
+                painter.setPen(pen)
+                painter.drawPolyline(trail.polygon)
+        painter.restore()
+
+        # 方位线
+        painter.setPen(QPen(QColor(128, 128, 128, 102), 0.8 * self.DPI_SCALE, QtCore.Qt.DotLine))
+        for azimuth in (tracker.satellite_pos[0], tracker.tracker_angle[0]):
+            x, y = polar_point(azimuth, 90 * 0.03)
+            painter.drawLine(center, point(x, y))
+
+        # 卫星与追踪器标记
+        markers = ((tracker.satellite_pos, math.sqrt(120), QColor(0, 0, 255, 230), QColor(0, 0, 139, 230), 1.5),
+                   (tracker.tracker_angle, math.sqrt(80), QColor(255, 0, 0, 230), QColor(139, 0, 0, 230), 1.0))
+        for (azimuth, elevation), size, face, edge, edge_width in markers:
+            painter.setPen(QPen(edge, edge_width * self.DPI_SCALE))
+            painter.setBrush(face)
+            half = size * self.DPI_SCALE / 2
+            painter.drawEllipse(point(*polar_point(azimuth, elevation)), half, half)
+
+        painter.end()
+
+
+class ZenithTracker(ZenithTrackerBase):
+    # 与 zenith_tracker.ZenithTracker 接口相同的 QPainter 实现，不导入 matplotlib 与 NumPy
+    trail_class = PassTrail
+
+    def init_plot(self):
+        self.canvas = ZenithCanvas(self)
+        self.attach_canvas(self.canvas)
+        self.update_plot()
+
+    def update_plot(self):
+        # 只安排一次重绘，同一事件循环内的多次更新由 Qt 合并
+        self.canvas.update()